@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark de l'extraction des compétences, outils, secteur, niveau et
+mots-clés d'une offre d'emploi : parcours répétés du texte (un `in` / `count`
+par terme, comme l'ancienne analyse) contre l'automate Aho–Corasick en un
+seul passage (interviews/services/keyword_matcher.py).
+
+Usage: python benchmark_keyword_extraction.py [nombre_de_répétitions]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from interviews.services.keyword_matcher import (
+    TECHNICAL_SKILLS, DOMAIN_TOOLS, SECTORS, EXPERIENCE_LEVELS, ALL_KEYWORDS,
+    DEFAULT_SECTOR, DEFAULT_EXPERIENCE_LEVEL, extract_offer_profile, get_offer_matcher
+)
+
+TITLE = "Ingénieur Data Senior - Python / Big Data"
+PARAGRAPH = (
+    "Au sein de notre équipe informatique, vous serez chargé de concevoir des data pipeline "
+    "robustes en python et sql, de superviser la migration vers aws et docker, et de garantir "
+    "la qualité des données pour nos clients de la banque et de l'industrie. Vous travaillerez "
+    "avec kafka, airflow, apache spark et tableau, en collaboration avec le management et les "
+    "équipes produit. Une expérience en machine learning et une maîtrise de kubernetes sont "
+    "appréciées. Poste hybride, télétravail possible, environnement international. "
+)
+REQUIREMENTS = "python, sql, docker, kubernetes, excel, power bi, 5+ ans d'expérience"
+
+
+def legacy_profile(title: str, description: str, requirements: str) -> dict:
+    """Ancienne approche: un parcours du texte par terme et par dictionnaire."""
+    full_text = f"{title} {description} {requirements}".lower()
+    skills_text = f"{description} {requirements}".lower()
+    title_lower = title.lower()
+    requirements_lower = requirements.lower()
+
+    skills = [t for terms in TECHNICAL_SKILLS.values() for t in terms if t in skills_text]
+    tools = [t for terms in DOMAIN_TOOLS.values() for t in terms if t in full_text]
+    sector = next(
+        (name for name, terms in SECTORS.items() if any(t in full_text for t in terms)),
+        DEFAULT_SECTOR
+    )
+    level = next(
+        (name for name, terms in EXPERIENCE_LEVELS.items() if any(t in full_text for t in terms)),
+        DEFAULT_EXPERIENCE_LEVEL
+    )
+    scores = {}
+    for keyword in ALL_KEYWORDS:
+        if keyword in full_text:
+            frequency = full_text.count(keyword)
+            title_bonus = 2 if keyword in title_lower else 1
+            req_bonus = 1.5 if keyword in requirements_lower else 1
+            scores[keyword] = frequency * title_bonus * req_bonus
+    return {'skills': skills, 'tools': tools, 'industry_sector': sector,
+            'experience_level': level, 'keyword_scores': scores}
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("⏱️  BENCHMARK EXTRACTION DES MOTS-CLÉS D'OFFRE")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    matcher = get_offer_matcher()
+    print(f"Automate construit en {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({matcher.pattern_count} termes)")
+
+    for paragraphs in (1, 10, 50, 200):
+        description = PARAGRAPH * paragraphs
+        legacy = timed(lambda: legacy_profile(TITLE, description, REQUIREMENTS), repeat)
+        single = timed(lambda: extract_offer_profile(TITLE, description, REQUIREMENTS), repeat)
+
+        old, new = legacy_profile(TITLE, description, REQUIREMENTS), extract_offer_profile(TITLE, description, REQUIREMENTS)
+        same = (old['industry_sector'] == new['industry_sector']
+                and old['experience_level'] == new['experience_level'])
+
+        print(f"\n📄 {len(description):>7} caractères")
+        print(f"   Parcours répétés : {legacy * 1000:8.2f} ms")
+        print(f"   Passage unique   : {single * 1000:8.2f} ms  (x{legacy / single:.1f})")
+        print(f"   Secteur / niveau identiques: {'✅' if same else '❌'} "
+              f"({new['industry_sector']}, {new['experience_level']})")
+
+
+if __name__ == '__main__':
+    main()
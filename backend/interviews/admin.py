@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     JobOffer, InterviewCampaign, InterviewQuestion, CampaignLink, 
     InterviewAnswer, JobApplication, RecruiterEvaluation,
-    GlobalInterviewEvaluation, AiEvaluation
+    GlobalInterviewEvaluation, AiEvaluation, QuestionBankEntry, VideoUploadSession,
+    VideoDeletionOutbox, InterviewSessionProgress
 )
 class InterviewQuestionInline(admin.TabularInline):
     model = InterviewQuestion
@@ -151,7 +152,7 @@ class AiEvaluationAdmin(admin.ModelAdmin):
         'communication_score', 'relevance_score', 'confidence_score', 
         'processing_time', 'created_at'
     )
-    list_filter = ('status', 'ai_provider', 'created_at', 'overall_ai_score')
+    list_filter = ('status', 'ai_provider', 'scoring_prompt_version', 'parse_outcome', 'created_at', 'overall_ai_score')
     search_fields = (
         'interview_answer__candidate__username',
         'interview_answer__candidate__email',
@@ -161,6 +162,8 @@ class AiEvaluationAdmin(admin.ModelAdmin):
     )
     readonly_fields = (
         'created_at', 'updated_at', 'completed_at', 'processing_time',
+        'prompt_tokens', 'prompt_compacted', 'scoring_prompt_version', 'parse_outcome',
+        'transcription_engine', 'transcription_model', 'video_version',
         'transcription', 'transcription_language', 'transcription_confidence'
     )
     
@@ -169,7 +172,10 @@ class AiEvaluationAdmin(admin.ModelAdmin):
             'fields': ('interview_answer', 'ai_provider', 'status')
         }),
         ('Transcription', {
-            'fields': ('transcription', 'transcription_language', 'transcription_confidence'),
+            'fields': (
+                'transcription', 'transcription_language', 'transcription_confidence',
+                'transcription_engine', 'transcription_model'
+            ),
             'classes': ('collapse',)
         }),
         ('Scores IA (0-10)', {
@@ -182,7 +188,11 @@ class AiEvaluationAdmin(admin.ModelAdmin):
             'fields': ('ai_feedback', 'strengths', 'weaknesses')
         }),
         ('Métadonnées', {
-            'fields': ('processing_time', 'error_message', 'created_at', 'updated_at', 'completed_at'),
+            'fields': (
+                'processing_time', 'prompt_tokens', 'prompt_compacted',
+                'scoring_prompt_version', 'parse_outcome', 'video_version',
+                'error_message', 'created_at', 'updated_at', 'completed_at'
+            ),
             'classes': ('collapse',)
         })
     )
@@ -444,3 +454,32 @@ class GlobalInterviewEvaluationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{count} évaluation(s) marquée(s) pour révision finale.')
     mark_for_final_review.short_description = "Marquer pour révision finale"
 
+
+@admin.register(QuestionBankEntry)
+class QuestionBankEntryAdmin(admin.ModelAdmin):
+    list_display = ('text', 'question_type', 'difficulty', 'source', 'usage_count', 'created_at')
+    list_filter = ('question_type', 'difficulty', 'source')
+    search_fields = ('text',)
+    readonly_fields = ('content_hash', 'minhash_signature', 'usage_count', 'created_at', 'updated_at')
+
+
+@admin.register(VideoUploadSession)
+class VideoUploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'question', 'candidate', 'offset', 'upload_length', 'status', 'updated_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('candidate__email', 'link__token')
+    readonly_fields = ('id', 'offset', 'upload_length', 'answer', 'error_message', 'created_at', 'updated_at')
+
+
+@admin.register(VideoDeletionOutbox)
+class VideoDeletionOutboxAdmin(admin.ModelAdmin):
+    list_display = ('public_id', 'attempts', 'next_attempt_at', 'created_at')
+    search_fields = ('public_id',)
+    readonly_fields = ('attempts', 'last_error', 'created_at')
+
+
+@admin.register(InterviewSessionProgress)
+class InterviewSessionProgressAdmin(admin.ModelAdmin):
+    list_display = ('link', 'current_question_id', 'updated_at')
+    search_fields = ('link__token', 'link__candidate__email')
+    readonly_fields = ('updated_at',)
@@ -3,13 +3,26 @@ import json
 import logging
 import re
 import random
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Iterator, Optional
 from django.conf import settings
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from .services.llm_router import get_llm_router
+from .services.question_stream import IncrementalJSONArrayParser
 
 logger = logging.getLogger(__name__)
 
+# Configuration de génération transmise au fournisseur choisi par le routeur
+QUESTION_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 2048,
+}
+
+# Délai global (s) partagé par les générations comportementale et technique
+DEFAULT_GENERATION_TIMEOUT = 45
+
+# Pool partagé: les deux moitiés d'une génération s'exécutent en parallèle
+_generation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='question-gen')
+
 class AIInterviewQuestionGenerator:
     """
     Service de génération de questions d'entretien avec Google Gemini
@@ -25,55 +38,135 @@ class AIInterviewQuestionGenerator:
             os.getenv('GOOGLE_GEMINI_API_KEY')
         )
         self.use_gemini = getattr(settings, 'USE_GEMINI', True) or getattr(settings, 'USE_GOOGLE_GEMINI', True)
-        
-        
-        try:
-            # Configuration Gemini
-            if self.api_key:
-                genai.configure(api_key=self.api_key)
-            
-            # Configuration de génération
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 2048,
-            }
-            
-            # Configuration de sécurité (permissive pour questions d'entretien)
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            }
-            
-            self.model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash",
-                generation_config=generation_config,
-                safety_settings=safety_settings
-            )
-            
-            logger.info("✅ Google Gemini initialisé avec succès (gratuit)")
-            
-        except Exception as e:
-            logger.error(f"❌ Erreur initialisation Gemini: {e}")
-            self.model = None
+        self.generation_timeout = getattr(settings, 'AI_QUESTION_GENERATION_TIMEOUT', DEFAULT_GENERATION_TIMEOUT)
+        self.generation_mode = getattr(settings, 'AI_QUESTION_GENERATION_MODE', 'parallel')
+        # Erreurs de la dernière génération (résultat partiel si non vide)
+        self.last_generation_errors = []
+        # Fournisseurs ayant servi la dernière génération (une moitié chacun en mode parallèle)
+        self.last_generation_providers = []
+        self.last_stream_provider = None
+        # Routeur multi-fournisseurs (Gemini, OpenAI, Hugging Face, stub local)
+        self.router = get_llm_router()
+        # Gemini passe par le routeur (modèle du pool partagé, réglages de sécurité inclus)
+        self.gemini_available = any(provider.name == 'gemini' for provider in self.router.providers)
     
     def generate_questions(self, offer_title: str, offer_description: str, 
                           number_of_questions: int = 5, difficulty: str = 'medium',
                           requirements: str = '', behavioral_count: int = None, 
-                          technical_count: int = None, existing_questions_count: int = 0) -> List[Dict[str, Any]]:
+                          technical_count: int = None, existing_questions_count: int = 0,
+                          mode: str = None) -> List[Dict[str, Any]]:
         """
         Génère des questions d'entretien personnalisées avec Google Gemini
+        
+        Modes:
+        - 'parallel' (défaut): questions comportementales et techniques générées
+          en parallèle sous un délai global ; si une moitié échoue, l'autre est
+          renvoyée (erreurs dans self.last_generation_errors)
+        - 'single': un seul appel demandant les deux types dans une réponse structurée
         """
         logger.info(f"🤖 Génération de {number_of_questions} questions avec Gemini")
         logger.info(f"📋 Poste: {offer_title}")
         logger.info(f"🎯 Difficulté: {difficulty}")
         logger.info(f"📊 Questions existantes: {existing_questions_count}")
-        logger.info(f"🔧 Modèle initialisé: {self.model is not None}")
+        logger.info(f"🔧 Gemini disponible: {self.gemini_available}")
         logger.info(f"🔑 API Key présente: {self.api_key is not None}")
         
+        behavioral_count, technical_count = self._resolve_question_counts(
+            offer_title, offer_description, number_of_questions,
+            existing_questions_count, behavioral_count, technical_count
+        )
+        if behavioral_count + technical_count == 0:
+            return []
+        
+        self.last_generation_errors = []
+        self.last_generation_providers = []
+        mode = mode or self.generation_mode
+        
+        # Construire la liste finale des questions (sans question obligatoire car elle existe déjà)
+        if mode == 'single' and behavioral_count > 0 and technical_count > 0:
+            final_questions = self._generate_mixed_questions(
+                offer_title, offer_description, behavioral_count,
+                technical_count, difficulty, requirements
+            )
+        else:
+            final_questions = self._generate_in_parallel(
+                offer_title, offer_description, behavioral_count,
+                technical_count, difficulty, requirements
+            )
+        
+        logger.info(f"✅ {len(final_questions)} questions générées au total")
+        return final_questions
+    
+    @property
+    def last_generation_provider(self) -> Optional[str]:
+        """Fournisseur(s) de la dernière génération, ex: 'gemini' ou 'gemini,openai'."""
+        return ','.join(dict.fromkeys(self.last_generation_providers)) or None
+    
+    def stream_questions(self, offer_title: str, offer_description: str,
+                         number_of_questions: int = 5, difficulty: str = 'medium',
+                         requirements: str = '', behavioral_count: int = None,
+                         technical_count: int = None, existing_questions_count: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Génère les questions en streaming: chaque question est renvoyée dès que
+        son objet JSON est complet dans le flux de tokens du modèle.
+        
+        Le fournisseur utilisé est disponible dans self.last_stream_provider
+        une fois le flux démarré ; un flux incomplet est signalé dans
+        self.last_generation_errors.
+        """
+        self.last_generation_errors = []
+        behavioral_count, technical_count = self._resolve_question_counts(
+            offer_title, offer_description, number_of_questions,
+            existing_questions_count, behavioral_count, technical_count
+        )
+        if behavioral_count + technical_count == 0:
+            return
+        
+        if not self.use_gemini or not self.router.has_providers():
+            logger.error("❌ IA indisponible - impossible de générer des questions")
+            raise ValueError("Un fournisseur IA est requis pour générer des questions. Vérifiez votre configuration API.")
+        
+        prompt = self._build_mixed_prompt(
+            offer_title, offer_description, behavioral_count,
+            technical_count, difficulty, requirements
+        )
+        stream = self.router.stream(prompt, task='questions', generation_config=QUESTION_GENERATION_CONFIG)
+        self.last_stream_provider = stream.provider
+        logger.info(f"🔀 Flux de questions servi par '{stream.provider}' (1er fragment en {stream.first_chunk_latency:.2f}s)")
+        
+        parser = IncrementalJSONArrayParser()
+        remaining = {'comportementale': behavioral_count, 'technique': technical_count}
+        emitted = {'comportementale': 0, 'technique': 0}
+        for chunk in stream:
+            for q_data in parser.feed(chunk):
+                question_type = 'technique' if (q_data.get('type') or '').startswith('techn') else 'comportementale'
+                if emitted[question_type] >= remaining[question_type]:
+                    continue
+                emitted[question_type] += 1
+                if question_type == 'technique':
+                    order = 2 + technical_count + emitted[question_type] - 1
+                else:
+                    order = emitted[question_type]
+                yield self._format_question(q_data, question_type, order)
+        
+        for question_type, expected in remaining.items():
+            if emitted[question_type] < expected:
+                self.last_generation_errors.append(
+                    f"Questions {question_type}: {emitted[question_type]}/{expected} reçues dans le flux"
+                )
+        if self.last_generation_errors:
+            logger.warning(f"⚠️ Flux partiel: {'; '.join(self.last_generation_errors)}")
+    
+    def _resolve_question_counts(self, offer_title: str, offer_description: str, number_of_questions: int,
+                                 existing_questions_count: int, behavioral_count: Optional[int],
+                                 technical_count: Optional[int]) -> tuple:
+        """
+        Valide les paramètres et calcule le nombre de questions comportementales
+        et techniques à générer, compte tenu des questions existantes.
+        
+        Returns:
+            Tuple (behavioral_count, technical_count), (0, 0) si rien à générer
+        """
         # Calculer le nombre réel de questions à générer
         actual_questions_needed = max(0, number_of_questions - existing_questions_count)
         logger.info(f"🎯 Questions IA à générer: {actual_questions_needed} (demandé: {number_of_questions} - existantes: {existing_questions_count})")
@@ -81,7 +174,7 @@ class AIInterviewQuestionGenerator:
         # Si aucune question à générer, retourner une liste vide
         if actual_questions_needed == 0:
             logger.info("✅ Aucune question à générer, questions existantes suffisantes")
-            return []
+            return 0, 0
         
         # Validation des paramètres
         if not offer_title or len(offer_title.strip()) < 3:
@@ -106,7 +199,7 @@ class AIInterviewQuestionGenerator:
             
             if behavioral_count + technical_count == 0:
                 logger.info("⚠️ Aucune question IA demandée après ajustement")
-                return []
+                return 0, 0
             
             logger.info(f"🤖 Génération de {behavioral_count + technical_count} questions IA ajustées")
         else:
@@ -114,28 +207,88 @@ class AIInterviewQuestionGenerator:
             behavioral_count = max(1, actual_questions_needed // 2) if actual_questions_needed > 0 else 0
             technical_count = actual_questions_needed - behavioral_count
         
-        # Construire la liste finale des questions (sans question obligatoire car elle existe déjà)
-        final_questions = []
-        
-        # Générer les questions comportementales avec l'IA si demandées
+        return behavioral_count, technical_count
+    
+    def _generate_in_parallel(self, offer_title: str, offer_description: str, behavioral_count: int,
+                              technical_count: int, difficulty: str, requirements: str) -> List[Dict[str, Any]]:
+        """
+        Lance les générations comportementale et technique en parallèle.
+        Renvoie un résultat partiel si l'une échoue ou dépasse le délai global.
+        """
+        futures = {}
         if behavioral_count > 0:
-            behavioral_questions = self._generate_behavioral_questions(
-                offer_title, offer_description, behavioral_count, 
-                difficulty, requirements
+            futures['comportementales'] = _generation_executor.submit(
+                self._generate_behavioral_questions,
+                offer_title, offer_description, behavioral_count, difficulty, requirements
             )
-            final_questions.extend(behavioral_questions)
-        
-        # Générer les questions techniques avec l'IA si nécessaire
         if technical_count > 0:
-            technical_questions = self._generate_technical_questions(
-                offer_title, offer_description, technical_count, 
-                difficulty, requirements
+            futures['techniques'] = _generation_executor.submit(
+                self._generate_technical_questions,
+                offer_title, offer_description, technical_count, difficulty, requirements
             )
-            final_questions.extend(technical_questions)
+        if not futures:
+            return []
+        
+        wait(futures.values(), timeout=self.generation_timeout)
+        
+        final_questions = []
+        for kind in ('comportementales', 'techniques'):
+            future = futures.get(kind)
+            if future is None:
+                continue
+            if not future.done():
+                future.cancel()
+                self.last_generation_errors.append(f"Questions {kind}: délai de {self.generation_timeout}s dépassé")
+                continue
+            try:
+                final_questions.extend(future.result())
+            except Exception as e:
+                self.last_generation_errors.append(str(e))
+        
+        if self.last_generation_errors:
+            if not final_questions:
+                # Aucune moitié n'a abouti: même comportement qu'auparavant (IA obligatoire)
+                raise ValueError('; '.join(self.last_generation_errors))
+            logger.warning(f"⚠️ Résultat partiel: {'; '.join(self.last_generation_errors)}")
         
-        logger.info(f"✅ {len(final_questions)} questions générées au total")
         return final_questions
     
+    def _generate_mixed_questions(self, offer_title: str, offer_description: str, behavioral_count: int,
+                                  technical_count: int, difficulty: str, requirements: str) -> List[Dict[str, Any]]:
+        """Génère les deux types de questions en un seul appel (réponse structurée)"""
+        logger.info(f"🤖 Génération de {behavioral_count} + {technical_count} questions en un seul appel")
+        
+        if not self.use_gemini or not self.router.has_providers():
+            logger.error("❌ IA indisponible - impossible de générer des questions")
+            raise ValueError("Un fournisseur IA est requis pour générer des questions. Vérifiez votre configuration API.")
+        
+        prompt = self._build_mixed_prompt(
+            offer_title, offer_description, behavioral_count,
+            technical_count, difficulty, requirements
+        )
+        
+        try:
+            response = self.router.generate(
+                prompt,
+                task='questions',
+                generation_config=QUESTION_GENERATION_CONFIG,
+                validator=self._parse_json_response
+            )
+            logger.info(f"🔀 Questions mixtes servies par '{response.provider}' en {response.latency:.2f}s")
+            self.last_generation_providers.append(response.provider)
+            questions_data = self._parse_json_response(response.text)
+        except Exception as e:
+            logger.error(f"❌ Erreur génération questions mixtes: {e}")
+            raise ValueError(f"Impossible de générer des questions avec l'IA: {str(e)}")
+        
+        behavioral_data = [q for q in questions_data if (q.get('type') or '').startswith('comport')]
+        technical_data = [q for q in questions_data if (q.get('type') or '').startswith('techn')]
+        
+        return (
+            self._format_behavioral_questions(behavioral_data, behavioral_count) +
+            self._format_technical_questions(technical_data, technical_count)
+        )
+    
     
     def _generate_behavioral_questions(self, offer_title: str, offer_description: str, 
                                      count: int, difficulty: str, requirements: str) -> List[Dict[str, Any]]:
@@ -143,9 +296,9 @@ class AIInterviewQuestionGenerator:
         logger.info(f"🤖 Génération de {count} questions comportementales avec IA")
         
         # Vérifier si l'IA est disponible
-        if not self.use_gemini or not self.api_key or not self.model:
+        if not self.use_gemini or not self.router.has_providers():
             logger.error("❌ IA indisponible - impossible de générer des questions comportementales")
-            raise ValueError("L'IA Gemini est requise pour générer des questions comportementales. Vérifiez votre configuration API.")
+            raise ValueError("Un fournisseur IA est requis pour générer des questions comportementales. Vérifiez votre configuration API.")
         
         prompt = f"""Tu es un expert RH spécialisé dans les entretiens comportementaux.
 
@@ -173,29 +326,22 @@ EXIGENCES:
 """
         
         try:
-            logger.info("🔄 Génération questions comportementales avec Gemini...")
-            response = self.model.generate_content(prompt)
+            logger.info("🔄 Génération questions comportementales via le routeur IA...")
+            response = self.router.generate(
+                prompt,
+                task='questions',
+                generation_config=QUESTION_GENERATION_CONFIG,
+                validator=self._parse_json_response
+            )
+            logger.info(f"🔀 Questions comportementales servies par '{response.provider}' en {response.latency:.2f}s")
+            self.last_generation_providers.append(response.provider)
             
-            if not response or not response.text:
-                raise ValueError("Réponse vide de Gemini")
+            if not response.text:
+                raise ValueError(f"Réponse vide de {response.provider}")
             
             questions_data = self._parse_json_response(response.text)
             
-            behavioral_questions = []
-            for i, q_data in enumerate(questions_data[:count]):
-                question = {
-                    "question": q_data.get('question', ''),
-                    "type": "comportementale",
-                    "difficulty": "medium",
-                    "expected_duration": 120,
-                    "skills_assessed": ["communication", "leadership", "problem_solving"],
-                    "order": i + 1,
-                    "generated_by": "ai_behavioral"
-                }
-                behavioral_questions.append(question)
-                logger.info(f"✅ Question comportementale {i + 1}: {question['question'][:50]}...")
-            
-            return behavioral_questions
+            return self._format_behavioral_questions(questions_data, count)
             
         except Exception as e:
             logger.error(f"❌ Erreur génération questions comportementales: {e}")
@@ -208,9 +354,9 @@ EXIGENCES:
         logger.info(f"🤖 Génération de {count} questions techniques avec IA")
         
         # Vérifier si l'IA est disponible
-        if not self.use_gemini or not self.api_key or not self.model:
+        if not self.use_gemini or not self.router.has_providers():
             logger.error("❌ IA indisponible - impossible de générer des questions techniques")
-            raise ValueError("L'IA Gemini est requise pour générer des questions techniques. Vérifiez votre configuration API.")
+            raise ValueError("Un fournisseur IA est requis pour générer des questions techniques. Vérifiez votre configuration API.")
         
         # Prompt spécialisé pour questions techniques uniquement
         prompt = f"""Tu es un expert RH spécialisé dans les entretiens techniques.
@@ -238,39 +384,109 @@ EXIGENCES:
 """
         
         try:
-            logger.info("🔄 Génération questions techniques avec Gemini...")
-            response = self.model.generate_content(prompt)
+            logger.info("🔄 Génération questions techniques via le routeur IA...")
+            response = self.router.generate(
+                prompt,
+                task='questions',
+                generation_config=QUESTION_GENERATION_CONFIG,
+                validator=self._parse_json_response
+            )
+            logger.info(f"🔀 Questions techniques servies par '{response.provider}' en {response.latency:.2f}s")
+            self.last_generation_providers.append(response.provider)
             
-            if not response or not response.text:
-                raise ValueError("Réponse vide de Gemini")
+            if not response.text:
+                raise ValueError(f"Réponse vide de {response.provider}")
             
             # Parse JSON
             questions_data = self._parse_json_response(response.text)
             
-            # Formater les questions techniques
-            technical_questions = []
-            start_order = 2 + count  # After mandatory + behavioral questions
-            
-            for i, q_data in enumerate(questions_data[:count]):
-                question = {
-                    "question": q_data.get('question', ''),
-                    "type": "technique",
-                    "difficulty": "medium",
-                    "expected_duration": 180,
-                    "skills_assessed": ["technique"],
-                    "order": start_order + i,
-                    "generated_by": "ai_technical"
-                }
-                technical_questions.append(question)
-                logger.info(f"✅ Question technique {start_order + i}: {question['question'][:50]}...")
-            
-            return technical_questions
+            return self._format_technical_questions(questions_data, count)
             
         except Exception as e:
             logger.error(f"❌ Erreur génération questions techniques: {e}")
             # Relancer l'erreur sans fallback - IA obligatoire
             raise ValueError(f"Impossible de générer des questions techniques avec l'IA: {str(e)}")
     
+    def _build_mixed_prompt(self, offer_title: str, offer_description: str, behavioral_count: int,
+                            technical_count: int, difficulty: str, requirements: str) -> str:
+        """Prompt demandant les deux types de questions dans une seule liste JSON"""
+        parts = []
+        if behavioral_count > 0:
+            parts.append(f"{behavioral_count} QUESTIONS COMPORTEMENTALES")
+        if technical_count > 0:
+            parts.append(f"{technical_count} QUESTIONS TECHNIQUES")
+        requested = ' ET '.join(parts)
+        
+        prompt = f"""Tu es un expert RH spécialisé dans les entretiens d'embauche.
+
+POSTE: {offer_title}
+DESCRIPTION: {offer_description}
+EXIGENCES: {requirements}
+NIVEAU: {difficulty}
+
+GÉNÈRE EXACTEMENT {requested} COURTES (1-2 lignes max).
+
+FORMAT JSON STRICT (une seule liste, comportementales d'abord):
+[
+  {{
+    "question": "Question comportementale spécifique au poste",
+    "type": "comportementale"
+  }},
+  {{
+    "question": "Question technique spécifique au poste",
+    "type": "technique"
+  }}
+]
+
+EXIGENCES:
+- Comportementales: soft skills, expériences, situations
+- Techniques: programmation, outils, méthodologies du domaine
+- Courtes et précises
+- Niveau {difficulty}
+"""
+        return prompt
+    
+    def _format_question(self, q_data: Dict, question_type: str, order: int) -> Dict[str, Any]:
+        """Formate une question renvoyée par l'IA selon son type"""
+        if question_type == 'technique':
+            question = {
+                "question": q_data.get('question', ''),
+                "type": "technique",
+                "difficulty": "medium",
+                "expected_duration": 180,
+                "skills_assessed": ["technique"],
+                "order": order,
+                "generated_by": "ai_technical"
+            }
+            logger.info(f"✅ Question technique {order}: {question['question'][:50]}...")
+        else:
+            question = {
+                "question": q_data.get('question', ''),
+                "type": "comportementale",
+                "difficulty": "medium",
+                "expected_duration": 120,
+                "skills_assessed": ["communication", "leadership", "problem_solving"],
+                "order": order,
+                "generated_by": "ai_behavioral"
+            }
+            logger.info(f"✅ Question comportementale {order}: {question['question'][:50]}...")
+        return question
+    
+    def _format_behavioral_questions(self, questions_data: List[Dict], count: int) -> List[Dict[str, Any]]:
+        """Formate les questions comportementales renvoyées par l'IA"""
+        return [
+            self._format_question(q_data, 'comportementale', i + 1)
+            for i, q_data in enumerate(questions_data[:count])
+        ]
+    
+    def _format_technical_questions(self, questions_data: List[Dict], count: int) -> List[Dict[str, Any]]:
+        """Formate les questions techniques renvoyées par l'IA"""
+        start_order = 2 + count  # After mandatory + behavioral questions
+        return [
+            self._format_question(q_data, 'technique', start_order + i)
+            for i, q_data in enumerate(questions_data[:count])
+        ]
+    
     def _parse_json_response(self, response_text: str) -> List[Dict]:
         """Parse la réponse JSON de l'IA"""
         try:
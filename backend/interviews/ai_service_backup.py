@@ -8,6 +8,11 @@ from django.conf import settings
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
+from .services.keyword_matcher import (
+    extract_offer_profile, extract_phrases,
+    RESPONSIBILITY_PATTERN, REQUIRED_SKILL_PATTERN, SKILL_PHRASE_PATTERN
+)
+
 logger = logging.getLogger(__name__)
 
 class AIInterviewQuestionGenerator:
@@ -467,40 +472,29 @@ GÉNÉREZ {ai_questions_count} QUESTIONS COURTES:"""
     
     def _deep_analyze_job_offer(self, title: str, description: str, requirements: str = '') -> Dict[str, Any]:
         """Analyse approfondie et intelligente de l'offre d'emploi pour extraction complète du contexte"""
-        import re
-        
-        # Combinaison de tous les textes pour analyse
-        full_text = f"{title} {description} {requirements}".lower()
+        # Un seul parcours du texte pour tous les dictionnaires (compétences, outils, secteur, niveau, mots-clés)
+        profile = extract_offer_profile(title, description, requirements)
         
         # 1. Analyse du type de poste (existante améliorée)
         job_analysis = self._analyze_job_offer(title, requirements)
         
         # 2. Extraction intelligente des mots-clés avec scoring
-        keywords = self._extract_job_keywords(title, description, requirements)
+        keywords = self._extract_job_keywords(title, description, requirements, profile=profile)
         
         # 3. Extraction des responsabilités clés
         responsibilities = self._extract_responsibilities(description)
         
         # 4. Extraction des compétences requises
-        skills = self._extract_required_skills(description, requirements)
-        
-        # 5. Analyse du niveau d'expérience requis
-        experience_level = self._analyze_experience_level(full_text)
-        
-        # 6. Détection du secteur d'activité
-        industry_sector = self._detect_industry_sector(full_text)
-        
-        # 7. Extraction des outils/technologies spécifiques
-        tools_technologies = self._extract_tools_technologies(full_text)
+        skills = self._extract_required_skills(description, requirements, profile=profile)
         
         return {
             'analysis': job_analysis,
             'keywords': keywords,
             'responsibilities': responsibilities,
             'skills': skills,
-            'experience_level': experience_level,
-            'industry_sector': industry_sector,
-            'tools_technologies': tools_technologies
+            'experience_level': profile['experience_level'],
+            'industry_sector': profile['industry_sector'],
+            'tools_technologies': profile['tools']
         }
     
     def _extract_responsibilities(self, description: str) -> List[str]:
@@ -511,24 +505,8 @@ GÉNÉREZ {ai_questions_count} QUESTIONS COURTES:"""
         responsibilities = []
         desc_lower = description.lower()
         
-        # Patterns pour identifier les responsabilités
-        responsibility_patterns = [
-            r'vous serez chargé[e]? de ([^.]+)',
-            r'vos missions[^:]*:([^.]+)',
-            r'responsabilités[^:]*:([^.]+)',
-            r'vous devrez ([^.]+)',
-            r'en charge de ([^.]+)',
-            r'missions principales[^:]*:([^.]+)',
-            r'vous aurez pour mission de ([^.]+)',
-            r'votre rôle consistera à ([^.]+)'
-        ]
-        
-        for pattern in responsibility_patterns:
-            matches = re.findall(pattern, desc_lower, re.IGNORECASE)
-            for match in matches:
-                clean_resp = match.strip().replace('\n', ' ').replace('  ', ' ')
-                if len(clean_resp) > 10:
-                    responsibilities.append(clean_resp)
+        # Patterns pour identifier les responsabilités (une seule expression compilée)
+        responsibilities.extend(extract_phrases(RESPONSIBILITY_PATTERN, desc_lower, min_length=10))
         
         # Extraction par bullet points ou listes
         bullet_patterns = [
@@ -545,97 +523,32 @@ GÉNÉREZ {ai_questions_count} QUESTIONS COURTES:"""
         
         return list(set(responsibilities))[:5]  # Limiter à 5 responsabilités principales
     
-    def _extract_required_skills(self, description: str, requirements: str) -> List[str]:
+    def _extract_required_skills(self, description: str, requirements: str,
+                                 profile: Optional[Dict[str, Any]] = None) -> List[str]:
         """Extrait les compétences requises spécifiques"""
         full_text = f"{description} {requirements}".lower()
-        skills = []
-        
-        # Patterns pour identifier les compétences
-        skill_patterns = [
-            r'compétences requises[^:]*:([^.]+)',
-            r'profil recherché[^:]*:([^.]+)',
-            r'vous maîtrisez ([^.]+)',
-            r'connaissance[s]? de ([^.]+)',
-            r'expérience avec ([^.]+)',
-            r'maîtrise de ([^.]+)',
-            r'expertise en ([^.]+)',
-            r'formation en ([^.]+)'
-        ]
         
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                clean_skill = match.strip().replace('\n', ' ').replace('  ', ' ')
-                if len(clean_skill) > 5:
-                    skills.append(clean_skill)
+        # Patterns pour identifier les compétences (une seule expression compilée)
+        skills = extract_phrases(REQUIRED_SKILL_PATTERN, full_text, min_length=5)
         
         # Compétences techniques spécifiques par domaine
-        technical_skills = {
-            'ingénierie': ['autocad', 'solidworks', 'catia', 'matlab', 'ansys', 'revit'],
-            'développement': ['python', 'java', 'react', 'angular', 'docker', 'kubernetes'],
-            'économie': ['excel', 'sap', 'stata', 'r', 'spss', 'tableau'],
-            'finance': ['bloomberg', 'reuters', 'risk management', 'trading']
-        }
+        if profile is None:
+            profile = extract_offer_profile('', description, requirements)
+        skills.extend(profile['skills'])
         
-        for domain, tech_list in technical_skills.items():
-            for tech in tech_list:
-                if tech in full_text:
-                    skills.append(tech)
-        
-        return list(set(skills))[:8]  # Limiter à 8 compétences principales
+        return list(dict.fromkeys(skills))[:8]  # Limiter à 8 compétences principales
     
     def _analyze_experience_level(self, full_text: str) -> str:
         """Analyse le niveau d'expérience requis"""
-        if any(term in full_text for term in ['junior', 'débutant', '0-2 ans', 'récent diplômé']):
-            return "Junior (0-2 ans)"
-        elif any(term in full_text for term in ['senior', 'expérimenté', '5+ ans', 'plus de 5 ans']):
-            return "Senior (5+ ans)"
-        elif any(term in full_text for term in ['expert', 'lead', 'manager', '10+ ans', 'plus de 10 ans']):
-            return "Expert/Lead (10+ ans)"
-        else:
-            return "Intermédiaire (2-5 ans)"
+        return extract_offer_profile(description=full_text)['experience_level']
     
     def _detect_industry_sector(self, full_text: str) -> str:
         """Détecte le secteur d'activité"""
-        sectors = {
-            'BTP/Construction': ['btp', 'construction', 'bâtiment', 'travaux publics'],
-            'Industrie': ['industrie', 'industriel', 'production', 'manufacturing'],
-            'Technologie': ['tech', 'software', 'développement', 'informatique'],
-            'Finance/Banque': ['banque', 'finance', 'crédit', 'investissement'],
-            'Énergie': ['énergie', 'pétrole', 'gaz', 'électricité', 'renouvelable'],
-            'Télécommunications': ['télécom', 'télécommunications', 'réseaux', '5g'],
-            'Aéronautique': ['aéronautique', 'aérospatial', 'aviation', 'aérospatial'],
-            'Automobile': ['automobile', 'automotive', 'véhicule'],
-            'Santé': ['santé', 'médical', 'pharmaceutique', 'hôpital']
-        }
-        
-        for sector, keywords in sectors.items():
-            if any(keyword in full_text for keyword in keywords):
-                return sector
-        
-        return "Secteur général"
+        return extract_offer_profile(description=full_text)['industry_sector']
     
     def _extract_tools_technologies(self, full_text: str) -> List[str]:
         """Extrait les outils et technologies spécifiques mentionnés"""
-        tools = []
-        
-        # Outils par domaine
-        domain_tools = {
-            'CAO/Design': ['autocad', 'solidworks', 'catia', 'inventor', 'fusion 360', 'revit', 'sketchup'],
-            'Simulation': ['ansys', 'abaqus', 'comsol', 'matlab', 'simulink'],
-            'Programmation': ['python', 'java', 'c++', 'javascript', 'react', 'angular'],
-            'Base de données': ['sql', 'mysql', 'postgresql', 'mongodb', 'oracle'],
-            'Cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes'],
-            'Analyse': ['excel', 'tableau', 'power bi', 'sas', 'spss', 'r'],
-            'ERP': ['sap', 'oracle', 'sage', 'odoo']
-        }
-        
-        for category, tool_list in domain_tools.items():
-            for tool in tool_list:
-                if tool in full_text:
-                    tools.append(tool)
-        
-        return list(set(tools))[:10]  # Limiter à 10 outils principaux
+        return extract_offer_profile(description=full_text)['tools']
     
     def _enforce_question_types(self, questions_data: List[Dict], 
                                behavioral_count: int, technical_count: int) -> List[Dict]:
@@ -699,137 +612,18 @@ GÉNÉREZ {ai_questions_count} QUESTIONS COURTES:"""
         
         return validated_questions
     
-    def _extract_job_keywords(self, title: str, description: str, requirements: str = '') -> List[str]:
+    def _extract_job_keywords(self, title: str, description: str, requirements: str = '',
+                              profile: Optional[Dict[str, Any]] = None) -> List[str]:
         """Extraction intelligente et complète des mots-clés de l'offre d'emploi"""
-        import re
-        
         # Combinaison titre + description + prérequis pour analyse complète
         full_text = f"{title} {description} {requirements}".lower()
         
-        # Dictionnaire étendu de mots-clés par domaine
-        engineering_keywords = [
-            # Ingénierie Civile/BTP
-            'btp', 'construction', 'bâtiment', 'génie civil', 'travaux publics', 'chantier',
-            'béton', 'acier', 'structure', 'fondation', 'voirie', 'assainissement',
-            'autocad', 'revit', 'tekla', 'robot structural', 'etabs', 'sap2000',
-            'norme marocaine', 'nm', 'eurocode', 'cctp', 'dpgf', 'bpu',
-            
-            # Ingénierie Électrique/Électronique
-            'électrique', 'électronique', 'électrotechnique', 'automatisme', 'instrumentation',
-            'plc', 'scada', 'hmi', 'variateur', 'moteur', 'transformateur', 'disjoncteur',
-            'siemens', 'schneider', 'abb', 'allen bradley', 'omron', 'mitsubishi',
-            'matlab', 'simulink', 'proteus', 'altium', 'kicad', 'eagle',
-            
-            # Ingénierie Mécanique
-            'mécanique', 'maintenance', 'production', 'usinage', 'fabrication', 'assemblage',
-            'cao', 'cfao', 'solidworks', 'catia', 'inventor', 'fusion 360', 'creo',
-            'cnc', 'tournage', 'fraisage', 'soudage', 'métrologie', 'contrôle qualité',
-            'lean manufacturing', 'tpm', 'gmao', 'amdec', 'smed',
-            
-            # Ingénierie Industrielle
-            'génie industriel', 'processus', 'optimisation', 'lean', 'six sigma', 'kaizen',
-            'ergonomie', 'sécurité', 'qualité', 'iso 9001', 'iso 14001', 'ohsas 18001',
-            'planification', 'ordonnancement', 'supply chain', 'logistique',
-            
-            # Ingénierie Chimique
-            'génie chimique', 'procédés', 'chimie', 'pétrochimie', 'raffinage', 'catalyse',
-            'distillation', 'extraction', 'cristallisation', 'réacteur', 'colonne',
-            'aspen plus', 'hysys', 'chemcad', 'pro ii', 'unisim',
-            
-            # Ingénierie Aéronautique
-            'aéronautique', 'aérospatial', 'aviation', 'aérodynamique', 'spatial',
-            'catia v5', 'nx', 'ansys fluent', 'cfd', 'fem', 'easa', 'faa',
-            'composite', 'structure aéronautique', 'certification',
-            
-            # Ingénierie Télécommunications
-            'télécommunications', 'télécom', 'réseaux', '5g', '4g', '3g', 'lte',
-            'fibre optique', 'radio', 'antenne', 'gsm', 'umts', 'wifi', 'bluetooth',
-            'cisco', 'huawei', 'ericsson', 'nokia', 'juniper',
-            
-            # Ingénierie Environnementale
-            'environnement', 'développement durable', 'traitement eaux', 'pollution',
-            'déchets', 'recyclage', 'énergies renouvelables', 'éolien', 'solaire',
-            'impact environnemental', 'iso 14001', 'bilan carbone'
-        ]
-        
-        tech_keywords = [
-            # Développement Web/Mobile
-            'python', 'javascript', 'react', 'angular', 'vue', 'node', 'django', 'flask',
-            'java', 'spring', 'php', 'laravel', 'symfony', 'ruby', 'rails', 'go', 'rust',
-            'html', 'css', 'sass', 'typescript', 'jquery', 'bootstrap', 'tailwind',
-            
-            # Cybersécurité (AJOUTÉ)
-            'cybersécurité', 'cyber sécurité', 'sécurité informatique', 'sécurité réseau',
-            'pentesting', 'pentest', 'ethical hacking', 'hacking éthique', 'audit sécurité',
-            'vulnerability assessment', 'analyse vulnérabilités', 'soc', 'cert', 'csirt',
-            'firewall', 'pare-feu', 'ids', 'ips', 'siem', 'soar', 'xdr', 'edr',
-            'cryptographie', 'chiffrement', 'ssl', 'tls', 'pki', 'certificats',
-            'iso 27001', 'nist', 'owasp', 'cissp', 'ceh', 'oscp', 'sans',
-            'malware', 'ransomware', 'phishing', 'social engineering', 'ddos',
-            'forensic', 'investigation numérique', 'incident response', 'gestion incidents',
-            'burp suite', 'metasploit', 'nmap', 'wireshark', 'kali linux', 'nessus',
-            'splunk', 'qradar', 'fortinet', 'palo alto', 'checkpoint', 'cisco asa',
-            
-            # Base de données
-            'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
-            
-            # Cloud & DevOps
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
-            'terraform', 'ansible', 'linux', 'ubuntu', 'centos',
-            
-            # Data Engineering & Science (enrichi)
-            'data engineer', 'data scientist', 'data science', 'machine learning', 'ml', 'ia artificielle',
-            'etl', 'elt', 'data pipeline', 'data warehousing', 'data lake', 'big data',
-            'apache spark', 'hadoop', 'kafka', 'airflow', 'luigi', 'dbt',
-            'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
-            'sql', 'nosql', 'databricks', 'snowflake', 'redshift', 'bigquery',
-            'tableau', 'power bi', 'looker', 'mlops', 'mlflow'
-        ]
-        
-        economics_keywords = [
-            # Économie et Finance
-            'économie', 'finance', 'banque', 'comptabilité', 'audit', 'fiscalité',
-            'investissement', 'bourse', 'trading', 'risk management', 'crédit',
-            'excel', 'sap', 'sage', 'bloomberg', 'reuters', 'matlab', 'r', 'stata',
-            
-            # Commerce International
-            'export', 'import', 'douane', 'incoterms', 'logistique internationale',
-            'change', 'devise', 'lettre de crédit', 'amdp', 'portnet',
-            
-            # Développement Économique
-            'développement', 'coopération', 'ong', 'projets sociaux', 'microfinance',
-            'évaluation impact', 'indicateurs développement', 'pnud', 'banque mondiale'
-        ]
-        
-        business_keywords = [
-            'gestion', 'management', 'équipe', 'projet', 'client', 'commercial', 'vente',
-            'marketing', 'communication', 'design', 'ux', 'ui', 'créativité', 'innovation',
-            'startup', 'entreprise', 'pme', 'grand groupe', 'international', 'remote',
-            'télétravail', 'hybride', 'autonomie', 'leadership', 'collaboration'
-        ]
-        
-        # Combinaison de tous les mots-clés
-        all_keywords = engineering_keywords + tech_keywords + economics_keywords + business_keywords
-        
-        found_keywords = []
-        keyword_scores = {}
-        
-        # Recherche avec scoring basé sur la fréquence et la position
-        for keyword in all_keywords:
-            if keyword in full_text:
-                # Score basé sur la fréquence d'apparition
-                frequency = full_text.count(keyword)
-                
-                # Bonus si le mot-clé apparaît dans le titre (plus important)
-                title_bonus = 2 if keyword in title.lower() else 1
-                
-                # Bonus si le mot-clé apparaît dans les prérequis (très important)
-                req_bonus = 1.5 if requirements and keyword in requirements.lower() else 1
-                
-                # Score final
-                score = frequency * title_bonus * req_bonus
-                keyword_scores[keyword] = score
-                found_keywords.append(keyword)
+        # Dictionnaires de mots-clés par domaine: scoring (fréquence, titre, prérequis)
+        # calculé en un seul passage par l'automate partagé
+        if profile is None:
+            profile = extract_offer_profile(title, description, requirements)
+        keyword_scores = dict(profile['keyword_scores'])
+        found_keywords = list(keyword_scores)
         
         # Extraction de mots-clés supplémentaires par regex
         # Technologies en majuscules, acronymes, noms propres
@@ -850,21 +644,11 @@ GÉNÉREZ {ai_questions_count} QUESTIONS COURTES:"""
                     keyword_scores[match.lower()] = 1
         
         # Extraction de phrases importantes (compétences spécifiques)
-        skill_patterns = [
-            r'expérience en ([^,.]+)',
-            r'maîtrise de ([^,.]+)',
-            r'connaissance de ([^,.]+)',
-            r'compétence en ([^,.]+)',
-            r'expertise en ([^,.]+)'
-        ]
-        
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                clean_skill = match.strip().lower()
-                if len(clean_skill) > 3 and clean_skill not in found_keywords:
-                    found_keywords.append(clean_skill)
-                    keyword_scores[clean_skill] = 2  # Bonus pour les compétences explicites
+        for clean_skill in extract_phrases(SKILL_PHRASE_PATTERN, full_text):
+            clean_skill = clean_skill.lower()
+            if len(clean_skill) > 3 and clean_skill not in keyword_scores:
+                found_keywords.append(clean_skill)
+                keyword_scores[clean_skill] = 2  # Bonus pour les compétences explicites
         
         # Trier par score décroissant et limiter aux 15 mots-clés les plus pertinents
         sorted_keywords = sorted(found_keywords, key=lambda k: keyword_scores.get(k, 0), reverse=True)
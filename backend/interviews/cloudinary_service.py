@@ -1,14 +1,39 @@
 """
 Service pour la gestion des vidéos avec Cloudinary.
 """
+import time
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.utils
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rendus générés par Cloudinary dès l'upload (eager, asynchrone) pour que la
+# première lecture côté recruteur n'attende pas le calcul de la transformation
+VIDEO_RENDITIONS = {
+    # Échelle adaptative HLS (profil "hd": 240p à 1080p)
+    'hls_url': {'streaming_profile': 'hd', 'format': 'm3u8'},
+    # Aperçu basse résolution (listes, survol)
+    'preview_url': {'width': 480, 'crop': 'scale', 'quality': 'auto:low', 'format': 'mp4'},
+    # Image d'affiche (1re seconde)
+    'poster_url': {'start_offset': '1', 'format': 'jpg'},
+}
+
+
+def eager_upload_options():
+    """Options d'upload demandant les rendus VIDEO_RENDITIONS en asynchrone."""
+    options = {
+        'eager': [dict(transformation) for transformation in VIDEO_RENDITIONS.values()],
+        'eager_async': True,
+    }
+    notification_url = getattr(settings, 'CLOUDINARY_UPLOAD_NOTIFICATION_URL', None)
+    if notification_url:
+        options['eager_notification_url'] = notification_url
+    return options
+
 class CloudinaryVideoService:
     """
     Service pour gérer l'upload, la suppression et la récupération de vidéos sur Cloudinary.
@@ -63,7 +88,8 @@ class CloudinaryVideoService:
                 'folder': folder or 'jobgate/interviews',
                 'use_filename': True,
                 'unique_filename': True,
-                'overwrite': False
+                'overwrite': False,
+                **eager_upload_options()
             }
             
             if public_id:
@@ -78,6 +104,130 @@ class CloudinaryVideoService:
             logger.error(f"Erreur lors de l'upload sur Cloudinary: {str(e)}")
             return None
     
+    @staticmethod
+    def upload_large_video(file_path, public_id=None, folder=None, chunk_size=20 * 1024 * 1024):
+        """
+        Upload d'un fichier vidéo local volumineux, envoyé à Cloudinary par morceaux.
+        
+        Args:
+            file_path: Chemin du fichier sur le disque
+            public_id: ID public pour la vidéo (optionnel)
+            folder: Dossier de destination sur Cloudinary (optionnel)
+            chunk_size: Taille des morceaux envoyés (bytes)
+        
+        Returns:
+            dict: Résultat de l'upload avec URLs et métadonnées
+            (None si non configuré ; les erreurs d'upload sont propagées)
+        """
+        if not CloudinaryVideoService.is_configured():
+            logger.error("Cloudinary n'est pas configuré. Vérifiez les variables d'environnement.")
+            return None
+        
+        upload_options = {
+            'resource_type': 'video',
+            'quality': 'auto:best',
+            'video_codec': 'h264',
+            'audio_codec': 'aac',
+            'format': 'mp4',
+            'folder': folder or 'jobgate/interviews',
+            'overwrite': False,
+            'chunk_size': chunk_size,
+            **eager_upload_options()
+        }
+        if public_id:
+            upload_options['public_id'] = public_id
+        
+        result = cloudinary.uploader.upload_large(file_path, **upload_options)
+        logger.info(f"Vidéo volumineuse uploadée sur Cloudinary: {result.get('public_id')}")
+        return result
+    
+    @staticmethod
+    def get_signed_upload_params(public_id, folder=None, context=None, notification_url=None):
+        """
+        Paramètres signés permettant au navigateur d'uploader directement
+        sur Cloudinary (les octets de la vidéo ne transitent pas par Django).
+        
+        Args:
+            public_id: ID public imposé à la vidéo
+            folder: Dossier de destination sur Cloudinary (optionnel)
+            context: Métadonnées attachées à la vidéo, ex: {'question_id': 12}
+            notification_url: Webhook appelé par Cloudinary à la fin de l'upload
+        
+        Returns:
+            dict: URL d'upload et champs à envoyer tels quels, ou None si non configuré
+        """
+        if not CloudinaryVideoService.is_configured():
+            logger.error("Cloudinary n'est pas configuré correctement")
+            return None
+        
+        config = cloudinary.config()
+        params = {
+            'public_id': public_id,
+            'folder': folder or 'jobgate/interviews',
+            'timestamp': int(time.time()),
+            'overwrite': 'false',
+        }
+        if context:
+            params['context'] = '|'.join(f"{key}={value}" for key, value in context.items())
+        if notification_url:
+            params['notification_url'] = notification_url
+        eager_options = eager_upload_options()
+        params['eager'] = cloudinary.utils.build_eager(eager_options['eager'])
+        params['eager_async'] = 'true'
+        if eager_options.get('eager_notification_url'):
+            params['eager_notification_url'] = eager_options['eager_notification_url']
+        
+        params['signature'] = cloudinary.utils.api_sign_request(params, config.api_secret)
+        params['api_key'] = config.api_key
+        return {
+            'upload_url': f"https://api.cloudinary.com/v1_1/{config.cloud_name}/video/upload",
+            'fields': params,
+        }
+    
+    @staticmethod
+    def verify_upload_signature(public_id, version, signature):
+        """Vérifie la signature d'une réponse d'upload renvoyée par le navigateur."""
+        try:
+            return bool(signature) and cloudinary.utils.verify_api_response_signature(public_id, version, signature)
+        except Exception as e:
+            logger.error(f"Erreur vérification signature Cloudinary: {str(e)}")
+            return False
+    
+    @staticmethod
+    def verify_notification(body, timestamp, signature):
+        """Vérifie la signature (X-Cld-Signature) d'une notification Cloudinary."""
+        try:
+            return bool(signature) and cloudinary.utils.verify_notification_signature(body, int(timestamp), signature)
+        except Exception as e:
+            logger.error(f"Erreur vérification notification Cloudinary: {str(e)}")
+            return False
+    
+    @staticmethod
+    def build_video_urls(public_id, version=None, format='mp4'):
+        """URLs (http et https) d'une vidéo à partir de son public_id et de sa version."""
+        options = {'resource_type': 'video', 'format': format}
+        if version:
+            options['version'] = version
+        url = cloudinary.utils.cloudinary_url(public_id, secure=False, **options)[0]
+        secure_url = cloudinary.utils.cloudinary_url(public_id, secure=True, **options)[0]
+        return {'url': url, 'secure_url': secure_url}
+    
+    @staticmethod
+    def build_rendition_urls(public_id):
+        """
+        URLs des rendus eager (HLS, aperçu, affiche) d'une vidéo.
+        Elles correspondent exactement aux transformations demandées à l'upload,
+        donc servies depuis le cache Cloudinary dès que le rendu est prêt.
+        """
+        urls = {}
+        for field, transformation in VIDEO_RENDITIONS.items():
+            transformation = dict(transformation)
+            format = transformation.pop('format')
+            urls[field] = cloudinary.utils.cloudinary_url(
+                public_id, resource_type='video', secure=True, format=format, transformation=[transformation]
+            )[0]
+        return urls
+    
     @staticmethod
     def delete_video(public_id):
         """
@@ -108,6 +258,31 @@ class CloudinaryVideoService:
             logger.error(f"Erreur lors de la suppression sur Cloudinary: {str(e)}")
             return False
     
+    @staticmethod
+    def delete_videos(public_ids):
+        """
+        Supprime jusqu'à 100 vidéos en un appel Admin API.
+        
+        Args:
+            public_ids: IDs publics des vidéos à supprimer
+        
+        Returns:
+            dict: {public_id: 'deleted' | 'not_found' | ...}, ou None si erreur
+        """
+        if not CloudinaryVideoService.is_configured():
+            logger.error("Cloudinary n'est pas configuré correctement")
+            return None
+        
+        try:
+            result = cloudinary.api.delete_resources(list(public_ids), resource_type='video')
+            deleted = result.get('deleted', {})
+            logger.info(f"{sum(1 for state in deleted.values() if state == 'deleted')} vidéo(s) supprimée(s) de Cloudinary")
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression en lot sur Cloudinary: {str(e)}")
+            return None
+    
     @staticmethod
     def get_video_info(public_id):
         """
@@ -131,6 +306,60 @@ class CloudinaryVideoService:
             logger.error(f"Erreur lors de la récupération des infos vidéo: {str(e)}")
             return None
     
+    @staticmethod
+    def get_videos_info(public_ids):
+        """
+        Informations de plusieurs vidéos en un appel Admin API (100 au maximum).
+        
+        Args:
+            public_ids: IDs publics des vidéos
+        
+        Returns:
+            dict: {public_id: ressource} des vidéos trouvées, ou None si erreur
+        """
+        if not CloudinaryVideoService.is_configured():
+            logger.error("Cloudinary n'est pas configuré correctement")
+            return None
+        
+        try:
+            result = cloudinary.api.resources_by_ids(
+                list(public_ids), resource_type='video', max_results=len(public_ids)
+            )
+            return {resource['public_id']: resource for resource in result.get('resources', [])}
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des infos vidéo en lot: {str(e)}")
+            return None
+    
+    @staticmethod
+    def iter_video_resources(prefix, page_size=500):
+        """
+        Parcourt toutes les vidéos d'un dossier, page par page (next_cursor).
+        Les erreurs de l'API sont propagées : un listing incomplet ne doit pas
+        être interprété comme des vidéos supprimées.
+        
+        Args:
+            prefix: Préfixe des public_id (ex: 'jobgate/interviews/')
+            page_size: Ressources par page (500 au maximum)
+        
+        Yields:
+            dict: Ressource Cloudinary (public_id, bytes, format, created_at...)
+        """
+        if not CloudinaryVideoService.is_configured():
+            raise RuntimeError("Cloudinary n'est pas configuré correctement")
+        
+        next_cursor = None
+        while True:
+            options = {'resource_type': 'video', 'type': 'upload', 'prefix': prefix, 'max_results': page_size}
+            if next_cursor:
+                options['next_cursor'] = next_cursor
+            result = cloudinary.api.resources(**options)
+            for resource in result.get('resources', []):
+                yield resource
+            next_cursor = result.get('next_cursor')
+            if not next_cursor:
+                break
+    
     @staticmethod
     def get_streaming_url(public_id, quality='auto:best'):
         """
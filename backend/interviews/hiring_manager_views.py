@@ -136,6 +136,11 @@ class HiringManagerAccessView(APIView):
                         'order': answer.question.order
                     },
                     'video_url': answer.cloudinary_secure_url or answer.cloudinary_url,
+                    'hls_url': answer.hls_url,
+                    'poster_url': answer.poster_url,
+                    'thumbnail_url': answer.thumbnail_url,
+                    'sprite_url': answer.sprite_url,
+                    'sprite_interval': answer.sprite_interval,
                     'duration': answer.duration,
                     'status': answer.status,
                     'created_at': answer.created_at,
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from interviews.models import InterviewQuestion
+from interviews.ai_service import AIInterviewQuestionGenerator
+from interviews.services.question_bank import ingest_question, extract_role_keywords
+
+# Domaines des questions techniques statiques du générateur
+STATIC_DOMAINS = ['développeur', 'frontend', 'backend', 'data', 'devops', 'sécurité', 'générique']
+
+
+class Command(BaseCommand):
+    help = 'Alimenter la bibliothèque de questions avec les questions existantes et statiques'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-static',
+            action='store_true',
+            help='Ne pas importer les questions techniques statiques',
+        )
+
+    def handle(self, *args, **options):
+        created_count = 0
+        duplicate_count = 0
+
+        questions = InterviewQuestion.objects.select_related('campaign__job_offer').iterator()
+        for question in questions:
+            job_offer = question.campaign.job_offer
+            _, created = ingest_question(
+                question.text,
+                question_type=question.question_type,
+                role_keywords=extract_role_keywords(job_offer.title, job_offer.prerequisites or ''),
+                source='saved',
+                source_question=question
+            )
+            if created:
+                created_count += 1
+            else:
+                duplicate_count += 1
+
+        if not options.get('skip_static'):
+            generator = AIInterviewQuestionGenerator()
+            seen_static = set()
+            for domain in STATIC_DOMAINS:
+                for static_question in generator._get_static_technical_questions(50, domain):
+                    # Les questions génériques complètent chaque domaine: ne les compter qu'une fois
+                    if static_question['question'] in seen_static:
+                        continue
+                    seen_static.add(static_question['question'])
+                    _, created = ingest_question(
+                        static_question['question'],
+                        question_type='technique',
+                        role_keywords=extract_role_keywords(domain),
+                        source='static'
+                    )
+                    if created:
+                        created_count += 1
+                    else:
+                        duplicate_count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Bibliothèque mise à jour: {created_count} questions ajoutées, '
+                f'{duplicate_count} doublons fusionnés'
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from interviews.services.resumable_upload import cleanup_sessions
+
+
+class Command(BaseCommand):
+    help = 'Supprimer les sessions d\'upload vidéo abandonnées et leurs fichiers de transit'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=None,
+            help='Inactivité (heures) au-delà de laquelle une session est abandonnée '
+                 '(VIDEO_UPLOAD_SESSION_TTL_HOURS par défaut)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Afficher ce qui serait supprimé sans rien supprimer',
+        )
+
+    def handle(self, *args, **options):
+        stats = cleanup_sessions(ttl_hours=options.get('hours'), dry_run=options.get('dry_run'))
+        prefix = '[dry-run] ' if options.get('dry_run') else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{stats['sessions']} session(s) et {stats['files']} fichier(s) de transit supprimés "
+            f"({stats['bytes'] / (1024 * 1024):.1f} Mo libérés)"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from interviews.services.video_deletion import BATCH_SIZE, drain_deletion_outbox
+
+
+class Command(BaseCommand):
+    help = 'Supprimer du stockage les vidéos en attente dans l\'outbox (par lots, avec reprise)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Nombre maximum de vidéos à traiter',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Vidéos par appel au stockage (max {BATCH_SIZE} pour Cloudinary)',
+        )
+
+    def handle(self, *args, **options):
+        stats = drain_deletion_outbox(
+            batch_size=min(options['batch_size'], BATCH_SIZE), limit=options.get('limit')
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['deleted']} vidéo(s) supprimée(s), {stats['skipped']} encore utilisée(s), "
+            f"{stats['failed']} reprogrammée(s)"
+        ))
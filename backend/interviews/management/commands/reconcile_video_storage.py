@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from interviews.services.video_index import reconcile_storage
+from interviews.services.video_uploads import VIDEO_FOLDER
+
+
+class Command(BaseCommand):
+    help = 'Synchroniser les vidéos du stockage avec les réponses d\'entretien et lister les orphelines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--folder',
+            type=str,
+            default=VIDEO_FOLDER,
+            help=f'Dossier des vidéos (défaut: {VIDEO_FOLDER})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Afficher le diff sans modifier la base',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Appliquer même si le stockage ne renvoie aucune vidéo',
+        )
+        parser.add_argument(
+            '--show-orphans',
+            action='store_true',
+            help='Lister les public_id des vidéos sans réponse',
+        )
+
+    def handle(self, *args, **options):
+        report = reconcile_storage(
+            folder=options['folder'], dry_run=options.get('dry_run'), force=options.get('force')
+        )
+
+        prefix = '[dry-run] ' if options.get('dry_run') else ''
+        self.stdout.write(
+            f"{prefix}{report['stored']} vidéo(s) stockée(s), {report['answers']} réponse(s) avec vidéo"
+        )
+        self.stdout.write(f"{prefix}{report['present']} présente(s), {report['missing']} absente(s) du stockage")
+        self.stdout.write(f"{prefix}{len(report['orphans'])} vidéo(s) orpheline(s) sans réponse")
+        if options.get('show_orphans'):
+            for public_id in report['orphans']:
+                self.stdout.write(f"  - {public_id}")
+
+        if report['applied']:
+            self.stdout.write(self.style.SUCCESS('Réconciliation appliquée'))
+        elif not options.get('dry_run'):
+            self.stdout.write(self.style.WARNING('Aucune modification appliquée (listing vide, utilisez --force)'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from interviews.models import InterviewAnswer
+from interviews.services.video_index import BATCH_SIZE, refresh_video_index, stale_answers
+
+
+class Command(BaseCommand):
+    help = 'Vérifier par lots l\'existence des vidéos des réponses et mettre à jour l\'index local'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=int,
+            help='Limiter aux réponses d\'une campagne',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Revérifier toutes les réponses, pas seulement celles périmées',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Nombre de vidéos par appel au stockage (max {BATCH_SIZE} pour Cloudinary)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = InterviewAnswer.objects.all()
+        if options.get('campaign'):
+            queryset = queryset.filter(question__campaign_id=options['campaign'])
+        if options.get('all'):
+            queryset = queryset.filter(cloudinary_public_id__isnull=False)
+        else:
+            queryset = stale_answers(queryset)
+
+        answers = list(queryset.order_by('id'))
+        self.stdout.write(f"{len(answers)} réponse(s) à vérifier")
+        stats = refresh_video_index(answers, batch_size=min(options['batch_size'], BATCH_SIZE))
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['verified']} vidéo(s) vérifiée(s), {stats['missing']} absente(s), "
+            f"{stats['errors']} non vérifiée(s) (erreur du stockage)"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from interviews.services.background_upload import pending_staged_answers, upload_staged_answer
+
+
+class Command(BaseCommand):
+    help = 'Relancer l\'envoi vers Cloudinary des vidéos restées en zone de transit (mode asynchrone)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Lister les réponses en attente sans les envoyer',
+        )
+
+    def handle(self, *args, **options):
+        pending = pending_staged_answers()
+        if not pending:
+            self.stdout.write('Aucune vidéo en attente d\'envoi')
+            return
+
+        for answer_id, candidate_token, staged_upload_id in pending:
+            if options.get('dry_run'):
+                self.stdout.write(f"[dry-run] Réponse {answer_id} en attente d'envoi")
+                continue
+            # Envoi synchrone: la commande se termine une fois tous les envois tentés
+            upload_staged_answer(answer_id, candidate_token, staged_upload_id)
+
+        prefix = '[dry-run] ' if options.get('dry_run') else ''
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{len(pending)} vidéo(s) traitée(s)"))
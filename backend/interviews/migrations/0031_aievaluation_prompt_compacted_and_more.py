@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0030_add_interview_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aievaluation',
+            name='prompt_compacted',
+            field=models.BooleanField(default=False, help_text='La transcription a été compressée pour respecter le budget de tokens', verbose_name='Prompt compacté'),
+        ),
+        migrations.AddField(
+            model_name='aievaluation',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, help_text='Nombre estimé de tokens du prompt envoyé au modèle', null=True, verbose_name='Tokens envoyés'),
+        ),
+    ]
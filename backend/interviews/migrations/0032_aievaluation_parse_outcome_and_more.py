@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0031_aievaluation_prompt_compacted_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aievaluation',
+            name='parse_outcome',
+            field=models.CharField(blank=True, choices=[('valid', 'Sortie valide'), ('repaired', 'Sortie réparée'), ('failed', 'Sortie invalide')], help_text='Validation de la sortie JSON du modèle (après réparation éventuelle)', max_length=20, null=True, verbose_name='Résultat du parsing'),
+        ),
+        migrations.AddField(
+            model_name='aievaluation',
+            name='scoring_prompt_version',
+            field=models.CharField(blank=True, help_text='Version du prompt et du schéma JSON utilisés pour le scoring', max_length=20, null=True, verbose_name='Version du prompt de scoring'),
+        ),
+        migrations.AddIndex(
+            model_name='aievaluation',
+            index=models.Index(fields=['scoring_prompt_version', 'parse_outcome'], name='interviews__scoring_d27941_idx'),
+        ),
+    ]
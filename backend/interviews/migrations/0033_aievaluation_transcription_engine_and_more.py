@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0032_aievaluation_parse_outcome_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aievaluation',
+            name='transcription_engine',
+            field=models.CharField(blank=True, max_length=30, null=True, verbose_name='Moteur de transcription'),
+        ),
+        migrations.AddField(
+            model_name='aievaluation',
+            name='transcription_model',
+            field=models.CharField(blank=True, help_text='Ex: taille du modèle Whisper (base, small...)', max_length=50, null=True, verbose_name='Modèle de transcription'),
+        ),
+        migrations.AddField(
+            model_name='aievaluation',
+            name='video_version',
+            field=models.CharField(blank=True, help_text='Version Cloudinary de la vidéo évaluée', max_length=64, null=True, verbose_name='Version de la vidéo'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0033_aievaluation_transcription_engine_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Texte de la question')),
+                ('question_type', models.CharField(choices=[('technique', 'Technique'), ('comportementale', 'Comportementale'), ('generale', 'Générale')], default='generale', max_length=20, verbose_name='Type de question')),
+                ('difficulty', models.CharField(choices=[('easy', 'Facile'), ('medium', 'Moyen'), ('hard', 'Difficile')], default='medium', max_length=10, verbose_name='Difficulté')),
+                ('role_keywords', models.JSONField(blank=True, default=list, help_text="Mots-clés issus du titre et des prérequis de l'offre", verbose_name='Mots-clés du poste')),
+                ('source', models.CharField(choices=[('generated', "Générée par l'IA"), ('static', 'Question statique'), ('saved', 'Enregistrée dans une campagne')], default='generated', max_length=20, verbose_name='Origine')),
+                ('content_hash', models.CharField(max_length=64, unique=True, verbose_name='Empreinte du texte normalisé')),
+                ('minhash_signature', models.JSONField(blank=True, default=list, verbose_name='Signature MinHash')),
+                ('usage_count', models.PositiveIntegerField(default=1, help_text='Nombre de fois où la question (ou un quasi-doublon) a été ingérée', verbose_name='Occurrences')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+                ('source_question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_entries', to='interviews.interviewquestion', verbose_name="Question d'origine")),
+            ],
+            options={
+                'verbose_name': 'Question de la bibliothèque',
+                'verbose_name_plural': 'Bibliothèque de questions',
+                'ordering': ['-usage_count', '-created_at'],
+                'indexes': [models.Index(fields=['question_type', 'difficulty'], name='interviews__questio_940dfb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0034_questionbankentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewcampaign',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='Version'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0035_interviewcampaign_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoUploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('upload_length', models.BigIntegerField(verbose_name='Taille totale (bytes)')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Octets reçus')),
+                ('status', models.CharField(choices=[('active', 'En cours'), ('uploading', 'Envoi vers le stockage'), ('completed', 'Terminé'), ('failed', 'Échec')], default='active', max_length=20, verbose_name='Statut')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='Erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière activité')),
+                ('answer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='interviews.interviewanswer', verbose_name='Réponse créée')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Candidat')),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='interviews.campaignlink', verbose_name='Lien de campagne')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='interviews.interviewquestion', verbose_name='Question')),
+            ],
+            options={
+                'verbose_name': "Session d'upload vidéo",
+                'verbose_name_plural': "Sessions d'upload vidéo",
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='interviews__status_2718c4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0036_videouploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='hls_url',
+            field=models.URLField(blank=True, max_length=512, null=True, verbose_name='URL HLS (débit adaptatif)'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='poster_url',
+            field=models.URLField(blank=True, max_length=512, null=True, verbose_name="URL de l'image d'affiche"),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='preview_url',
+            field=models.URLField(blank=True, max_length=512, null=True, verbose_name="URL de l'aperçu basse résolution"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0037_interviewanswer_hls_url_interviewanswer_poster_url_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='content_sha256',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='SHA-256 du fichier vidéo'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='upload_idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name="Clé d'idempotence de l'upload"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0038_interviewanswer_content_sha256_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='storage_verified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Existence vérifiée le'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='video_format',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='Format vidéo'),
+        ),
+    ]
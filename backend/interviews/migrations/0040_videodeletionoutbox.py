@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0039_interviewanswer_storage_verified_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoDeletionOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('public_id', models.CharField(max_length=255, unique=True, verbose_name='Public ID')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Dernière erreur')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Prochaine tentative')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Date d'ajout")),
+            ],
+            options={
+                'verbose_name': 'Vidéo à supprimer',
+                'verbose_name_plural': 'Vidéos à supprimer',
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['next_attempt_at'], name='interviews__next_at_8465b2_idx')],
+            },
+        ),
+    ]
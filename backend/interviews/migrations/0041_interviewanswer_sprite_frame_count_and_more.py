@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0040_videodeletionoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='sprite_frame_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name="Nombre d'images du sprite"),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='sprite_frame_height',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name="Hauteur d'une image du sprite"),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='sprite_frame_width',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name="Largeur d'une image du sprite"),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='sprite_interval',
+            field=models.FloatField(blank=True, null=True, verbose_name='Intervalle entre images du sprite (s)'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='sprite_url',
+            field=models.CharField(blank=True, max_length=512, null=True, verbose_name='URL du sprite de prévisualisation'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='thumbnail_height',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Hauteur de la vignette'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='thumbnail_url',
+            field=models.CharField(blank=True, max_length=512, null=True, verbose_name='URL de la vignette'),
+        ),
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='thumbnail_width',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Largeur de la vignette'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0041_interviewanswer_sprite_frame_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewSessionProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_question_ids', models.JSONField(blank=True, default=list, verbose_name='Questions terminées')),
+                ('upload_states', models.JSONField(blank=True, default=dict, verbose_name="États d'envoi par question")),
+                ('current_question_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Question en cours')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+                ('link', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='session_progress', to='interviews.campaignlink', verbose_name='Lien de campagne')),
+            ],
+            options={
+                'verbose_name': 'Avancement de session',
+                'verbose_name_plural': 'Avancements de session',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0042_interviewsessionprogress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aievaluation',
+            name='parse_outcome',
+            field=models.CharField(blank=True, choices=[('valid', 'Sortie valide'), ('repaired', 'Sortie réparée'), ('failed', 'Sortie invalide'), ('no_audio', 'Aucun contenu audio')], help_text='Validation de la sortie JSON du modèle (après réparation éventuelle)', max_length=20, null=True, verbose_name='Résultat du parsing'),
+        ),
+    ]
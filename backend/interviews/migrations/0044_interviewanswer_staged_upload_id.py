@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0043_alter_aievaluation_parse_outcome'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewanswer',
+            name='staged_upload_id',
+            field=models.CharField(blank=True, max_length=32, null=True, verbose_name='Envoi différé en attente'),
+        ),
+    ]
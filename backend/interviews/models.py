@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 import secrets
+import uuid
 from users.models import CustomUser
 from django.conf import settings
 from django.db.models import Q, UniqueConstraint
@@ -53,6 +54,9 @@ class InterviewCampaign(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
     active = models.BooleanField(default=True, verbose_name="Active")
     
+    # Verrou optimiste: incrémenté à chaque modification de la liste des questions
+    version = models.PositiveIntegerField(default=1, verbose_name="Version")
+    
     class Meta:
         verbose_name = "Campagne d'entretiens"
         verbose_name_plural = "Campagnes d'entretiens"
@@ -61,6 +65,12 @@ class InterviewCampaign(models.Model):
     def __str__(self):
         return self.title
     
+    @classmethod
+    def bump_version(cls, campaign_id) -> int:
+        """Incrémente la version (à appeler dans la transaction qui modifie les questions)."""
+        cls.objects.filter(pk=campaign_id).update(version=models.F('version') + 1)
+        return cls.objects.filter(pk=campaign_id).values_list('version', flat=True).first()
+    
     def is_active(self):
         """Vérifie si la campagne est active selon les dates et le statut"""
         if not self.active:
@@ -148,6 +158,70 @@ class InterviewAnswer(models.Model):
         null=True, 
         verbose_name="Cloudinary Secure URL"
     )
+    # Vignette et sprite de survol générés à l'upload (voir services/video_thumbnails.py)
+    thumbnail_url = models.CharField(max_length=512, blank=True, null=True, verbose_name="URL de la vignette")
+    thumbnail_width = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Largeur de la vignette")
+    thumbnail_height = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Hauteur de la vignette")
+    sprite_url = models.CharField(max_length=512, blank=True, null=True, verbose_name="URL du sprite de prévisualisation")
+    sprite_frame_width = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Largeur d'une image du sprite")
+    sprite_frame_height = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Hauteur d'une image du sprite")
+    sprite_frame_count = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Nombre d'images du sprite")
+    sprite_interval = models.FloatField(null=True, blank=True, verbose_name="Intervalle entre images du sprite (s)")
+    
+    # Index local du stockage (rafraîchi par lots, voir services/video_index.py)
+    video_format = models.CharField(
+        max_length=20,
+        blank=True,
+        null=True,
+        verbose_name="Format vidéo"
+    )
+    storage_verified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Existence vérifiée le"
+    )
+    
+    # Empreinte du fichier envoyé et clé d'idempotence du client (renvois)
+    content_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name="SHA-256 du fichier vidéo"
+    )
+    upload_idempotency_key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name="Clé d'idempotence de l'upload"
+    )
+    # Tentative d'envoi différé en cours (mode asynchrone) : seul l'envoi
+    # correspondant peut encore enregistrer sa vidéo sur la réponse
+    staged_upload_id = models.CharField(
+        max_length=32,
+        blank=True,
+        null=True,
+        verbose_name="Envoi différé en attente"
+    )
+    
+    # Rendus de lecture générés à l'upload (eager)
+    hls_url = models.URLField(
+        max_length=512,
+        blank=True,
+        null=True,
+        verbose_name="URL HLS (débit adaptatif)"
+    )
+    preview_url = models.URLField(
+        max_length=512,
+        blank=True,
+        null=True,
+        verbose_name="URL de l'aperçu basse résolution"
+    )
+    poster_url = models.URLField(
+        max_length=512,
+        blank=True,
+        null=True,
+        verbose_name="URL de l'image d'affiche"
+    )
     
     # Métadonnées de l'enregistrement
     duration = models.PositiveIntegerField(
@@ -879,7 +953,61 @@ class AiEvaluation(models.Model):
         verbose_name="Temps de traitement",
         help_text="Durée totale du traitement en secondes"
     )
-    
+    prompt_tokens = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Tokens envoyés",
+        help_text="Nombre estimé de tokens du prompt envoyé au modèle"
+    )
+    prompt_compacted = models.BooleanField(
+        default=False,
+        verbose_name="Prompt compacté",
+        help_text="La transcription a été compressée pour respecter le budget de tokens"
+    )
+    scoring_prompt_version = models.CharField(
+        max_length=20,
+        blank=True,
+        null=True,
+        verbose_name="Version du prompt de scoring",
+        help_text="Version du prompt et du schéma JSON utilisés pour le scoring"
+    )
+    PARSE_OUTCOME_CHOICES = [
+        ('valid', 'Sortie valide'),
+        ('repaired', 'Sortie réparée'),
+        ('failed', 'Sortie invalide'),
+        ('no_audio', 'Aucun contenu audio'),
+    ]
+    parse_outcome = models.CharField(
+        max_length=20,
+        choices=PARSE_OUTCOME_CHOICES,
+        blank=True,
+        null=True,
+        verbose_name="Résultat du parsing",
+        help_text="Validation de la sortie JSON du modèle (après réparation éventuelle)"
+    )
+
+    # Empreinte de la configuration ayant produit le résultat (re-run sélectif)
+    transcription_engine = models.CharField(
+        max_length=30,
+        blank=True,
+        null=True,
+        verbose_name="Moteur de transcription"
+    )
+    transcription_model = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name="Modèle de transcription",
+        help_text="Ex: taille du modèle Whisper (base, small...)"
+    )
+    video_version = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name="Version de la vidéo",
+        help_text="Version Cloudinary de la vidéo évaluée"
+    )
+
     # Statut du traitement
     STATUS_CHOICES = [
         ('pending', 'En attente'),
@@ -916,6 +1044,7 @@ class AiEvaluation(models.Model):
         indexes = [
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['ai_provider', 'status']),
+            models.Index(fields=['scoring_prompt_version', 'parse_outcome']),
         ]
     
     def __str__(self):
@@ -987,5 +1116,204 @@ class AiEvaluation(models.Model):
         self.save(update_fields=['status', 'error_message'])
 
 
+class QuestionBankEntry(models.Model):
+    """
+    Bibliothèque de questions réutilisables (générées, statiques ou enregistrées).
+    Les quasi-doublons sont écartés par MinHash à l'ingestion.
+    """
+    SOURCE_CHOICES = [
+        ('generated', 'Générée par l\'IA'),
+        ('static', 'Question statique'),
+        ('saved', 'Enregistrée dans une campagne'),
+    ]
+    DIFFICULTY_CHOICES = [
+        ('easy', 'Facile'),
+        ('medium', 'Moyen'),
+        ('hard', 'Difficile'),
+    ]
+
+    text = models.TextField(verbose_name="Texte de la question")
+    question_type = models.CharField(
+        max_length=20,
+        choices=InterviewQuestion.QUESTION_TYPES,
+        default='generale',
+        verbose_name="Type de question"
+    )
+    difficulty = models.CharField(
+        max_length=10,
+        choices=DIFFICULTY_CHOICES,
+        default='medium',
+        verbose_name="Difficulté"
+    )
+    role_keywords = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Mots-clés du poste",
+        help_text="Mots-clés issus du titre et des prérequis de l'offre"
+    )
+    source = models.CharField(
+        max_length=20,
+        choices=SOURCE_CHOICES,
+        default='generated',
+        verbose_name="Origine"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="Empreinte du texte normalisé"
+    )
+    minhash_signature = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Signature MinHash"
+    )
+    source_question = models.ForeignKey(
+        InterviewQuestion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bank_entries",
+        verbose_name="Question d'origine"
+    )
+    usage_count = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Occurrences",
+        help_text="Nombre de fois où la question (ou un quasi-doublon) a été ingérée"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Dernière mise à jour")
+
+    class Meta:
+        verbose_name = "Question de la bibliothèque"
+        verbose_name_plural = "Bibliothèque de questions"
+        ordering = ['-usage_count', '-created_at']
+        indexes = [
+            models.Index(fields=['question_type', 'difficulty']),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_question_type_display()}] {self.text[:60]}"
+
+
+
+class VideoUploadSession(models.Model):
+    """
+    Upload vidéo reprenable (protocole de type tus).
+    Les fragments sont écrits dans un fichier de transit local jusqu'à ce que
+    `offset` atteigne `upload_length`, puis le fichier est envoyé à Cloudinary.
+    """
+    STATUS_CHOICES = [
+        ('active', 'En cours'),
+        ('uploading', 'Envoi vers le stockage'),
+        ('completed', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    link = models.ForeignKey(
+        CampaignLink,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        verbose_name="Lien de campagne"
+    )
+    question = models.ForeignKey(
+        InterviewQuestion,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        verbose_name="Question"
+    )
+    candidate = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="video_upload_sessions",
+        verbose_name="Candidat"
+    )
+    upload_length = models.BigIntegerField(verbose_name="Taille totale (bytes)")
+    offset = models.BigIntegerField(default=0, verbose_name="Octets reçus")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active', verbose_name="Statut")
+    error_message = models.TextField(blank=True, null=True, verbose_name="Erreur")
+    answer = models.ForeignKey(
+        InterviewAnswer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_sessions",
+        verbose_name="Réponse créée"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Dernière activité")
+
+    class Meta:
+        verbose_name = "Session d'upload vidéo"
+        verbose_name_plural = "Sessions d'upload vidéo"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.id} - Question {self.question_id} ({self.offset}/{self.upload_length})"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.offset >= self.upload_length
+
+
+class VideoDeletionOutbox(models.Model):
+    """
+    Vidéo à supprimer du stockage (réponse supprimée ou vidéo remplacée).
+    Les entrées sont traitées par lots (delete_resources, 100 par appel) et
+    supprimées une fois la vidéo effacée ; en cas d'échec elles sont
+    reprogrammées avec un délai croissant.
+    """
+    public_id = models.CharField(max_length=255, unique=True, verbose_name="Public ID")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Dernière erreur")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Prochaine tentative")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date d'ajout")
+
+    class Meta:
+        verbose_name = "Vidéo à supprimer"
+        verbose_name_plural = "Vidéos à supprimer"
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.public_id} ({self.attempts} tentative(s))"
+
+
+
+class InterviewSessionProgress(models.Model):
+    """
+    Avancement d'une session d'entretien, une ligne par lien de campagne.
+    Permet au navigateur de reprendre à la bonne question après un crash
+    sans renvoyer les réponses déjà stockées.
+
+    `upload_states` est un dictionnaire compact {question_id: état} :
+    états serveur (completed, processing, failed) déduits des réponses,
+    états signalés par le navigateur (recording, uploading) sinon.
+    """
+    link = models.OneToOneField(
+        CampaignLink,
+        on_delete=models.CASCADE,
+        related_name="session_progress",
+        verbose_name="Lien de campagne"
+    )
+    completed_question_ids = models.JSONField(default=list, blank=True, verbose_name="Questions terminées")
+    upload_states = models.JSONField(default=dict, blank=True, verbose_name="États d'envoi par question")
+    current_question_id = models.PositiveIntegerField(null=True, blank=True, verbose_name="Question en cours")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Dernière mise à jour")
+
+    class Meta:
+        verbose_name = "Avancement de session"
+        verbose_name_plural = "Avancements de session"
+
+    def __str__(self):
+        return f"Session {self.link.token}: {len(self.completed_question_ids)} question(s) terminée(s)"
+
 # Import du modèle Notification
 from .notification_models import Notification
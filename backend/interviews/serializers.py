@@ -5,6 +5,7 @@ from .models import (
 )
 from users.models import CustomUser
 from users.serializers import UserSerializer
+from .services.campaign_bulk import create_campaigns_for_offers, normalize_questions
 
 class JobOfferSerializer(serializers.ModelSerializer):
     """Serializer pour les offres d'emploi"""
@@ -34,8 +35,8 @@ class InterviewCampaignSerializer(serializers.ModelSerializer):
     class Meta:
         model = InterviewCampaign
         fields = ['id', 'title', 'description', 'job_offer', 'job_offer_title',
-                  'start_date', 'end_date', 'active', 'created_at', 'questions']
-        read_only_fields = ['id', 'created_at', 'job_offer_title']
+                  'start_date', 'end_date', 'active', 'created_at', 'version', 'questions']
+        read_only_fields = ['id', 'created_at', 'job_offer_title', 'version']
 
 class InterviewCampaignCreateSerializer(serializers.ModelSerializer):
     """Serializer pour la création de campagnes d'entretiens avec des questions"""
@@ -48,24 +49,57 @@ class InterviewCampaignCreateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def create(self, validated_data):
-        """Création d'une campagne avec ses questions"""
+        """Création d'une campagne avec ses questions (insertion en lot)"""
         questions_data = validated_data.pop('questions', [])
-        campaign = InterviewCampaign.objects.create(**validated_data)
-        
-        for i, question_data in enumerate(questions_data):
-            question_data['order'] = i + 1
-            # Mapper le type de question de l'IA vers le modèle
-            if 'type' in question_data:
-                ai_type = question_data.pop('type')
-                if ai_type == 'technique':
-                    question_data['question_type'] = 'technique'
-                elif ai_type == 'comportementale':
-                    question_data['question_type'] = 'comportementale'
-                else:
-                    question_data['question_type'] = 'generale'
-            InterviewQuestion.objects.create(campaign=campaign, **question_data)
-        
-        return campaign
+        job_offer = validated_data.pop('job_offer')
+        return create_campaigns_for_offers(
+            validated_data, normalize_questions(questions_data), [job_offer]
+        )[0]
+
+
+class CampaignBulkCreateSerializer(serializers.Serializer):
+    """Serializer pour créer la même campagne sur plusieurs offres"""
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    start_date = serializers.DateField(required=False, allow_null=True)
+    end_date = serializers.DateField(required=False, allow_null=True)
+    active = serializers.BooleanField(default=True)
+    questions = InterviewQuestionSerializer(many=True, required=False)
+    job_offer_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        help_text="IDs des offres qui recevront chacune une copie de la campagne"
+    )
+
+
+class CampaignCloneSerializer(serializers.Serializer):
+    """Serializer pour cloner une campagne vers une ou plusieurs offres"""
+    job_offer_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        help_text="IDs des offres cibles"
+    )
+    title = serializers.CharField(max_length=255, required=False, help_text="Titre des copies (celui de la source par défaut)")
+    active = serializers.BooleanField(required=False)
+
+
+class QuestionBulkItemSerializer(serializers.Serializer):
+    """Une question dans la liste ordonnée (texte et durée optionnels)"""
+    id = serializers.IntegerField()
+    text = serializers.CharField(required=False)
+    time_limit = serializers.IntegerField(required=False, min_value=1)
+
+
+class CampaignQuestionsBulkUpdateSerializer(serializers.Serializer):
+    """Serializer pour réordonner/modifier toutes les questions d'une campagne"""
+    version = serializers.IntegerField(help_text="Version de la campagne lue par le client")
+    questions = QuestionBulkItemSerializer(many=True, help_text="Liste complète, dans le nouvel ordre")
+    
+    def validate_questions(self, value):
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Une question apparaît plusieurs fois.")
+        return value
 
 
 class CampaignLinkSerializer(serializers.ModelSerializer):
@@ -168,11 +202,17 @@ class InterviewAnswerSerializer(serializers.ModelSerializer):
             'candidate_name', 'question_text', 'campaign_title', 
             'duration_formatted', 'file_size_formatted', 'video_url',
             'cloudinary_public_id', 'cloudinary_url', 'cloudinary_secure_url',
+            'hls_url', 'preview_url', 'poster_url', 'video_format', 'storage_verified_at',
+            'thumbnail_url', 'thumbnail_width', 'thumbnail_height',
+            'sprite_url', 'sprite_frame_width', 'sprite_frame_height', 'sprite_frame_count', 'sprite_interval',
         ]
         read_only_fields = [
             'id', 'created_at', 'updated_at', 'candidate_name', 
             'question_text', 'campaign_title', 'duration_formatted', 
-            'file_size_formatted', 'video_url'
+            'file_size_formatted', 'video_url', 'hls_url', 'preview_url', 'poster_url',
+            'video_format', 'storage_verified_at',
+            'thumbnail_url', 'thumbnail_width', 'thumbnail_height',
+            'sprite_url', 'sprite_frame_width', 'sprite_frame_height', 'sprite_frame_count', 'sprite_interval'
         ]
     
     def get_candidate_name(self, obj):
@@ -396,8 +436,10 @@ class AiEvaluationSerializer(serializers.ModelSerializer):
             'id', 'interview_answer', 'transcription', 'transcription_language',
             'transcription_confidence', 'communication_score', 'relevance_score',
             'confidence_score', 'overall_ai_score', 'ai_feedback', 'strengths',
-            'weaknesses', 'ai_provider', 'processing_time', 'status',
-            'error_message', 'created_at', 'updated_at', 'completed_at',
+            'weaknesses', 'ai_provider', 'processing_time', 'prompt_tokens',
+            'prompt_compacted', 'scoring_prompt_version', 'parse_outcome',
+            'transcription_engine', 'transcription_model', 'video_version',
+            'status', 'error_message', 'created_at', 'updated_at', 'completed_at',
             # Champs calculés pour l'affichage
             'candidate_name', 'question_text', 'question_order', 'campaign_title',
             'video_url', 'communication_grade', 'relevance_grade', 'confidence_grade',
@@ -407,6 +449,8 @@ class AiEvaluationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             'id', 'created_at', 'updated_at', 'completed_at', 'processing_time',
+            'prompt_tokens', 'prompt_compacted', 'scoring_prompt_version',
+            'parse_outcome', 'transcription_engine', 'transcription_model', 'video_version',
             'candidate_name', 'question_text', 'question_order', 'campaign_title',
             'video_url', 'overall_ai_score'
         ]
@@ -508,6 +552,26 @@ class AiEvaluationBulkSerializer(serializers.Serializer):
         help_text="IDs des candidats à évaluer (tous si vide)"
     )
     force_reevaluation = serializers.BooleanField(default=False)
+    RERUN_MODE_CHOICES = [
+        ('missing', 'Réponses sans évaluation uniquement'),
+        ('stale', 'Évaluations périmées (moteur, modèle, prompt ou vidéo modifiés)'),
+        ('all', 'Toutes les réponses'),
+    ]
+    rerun_mode = serializers.ChoiceField(
+        choices=RERUN_MODE_CHOICES,
+        required=False,
+        help_text="Par défaut 'missing', ou 'all' si force_reevaluation est vrai"
+    )
+    dry_run = serializers.BooleanField(
+        default=False,
+        help_text="Compter les réponses à (re)calculer sans lancer l'évaluation"
+    )
+    
+    def validate(self, attrs):
+        """Compatibilité: force_reevaluation équivaut au mode 'all'"""
+        if 'rerun_mode' not in attrs:
+            attrs['rerun_mode'] = 'all' if attrs.get('force_reevaluation') else 'missing'
+        return attrs
     
     def validate_campaign_id(self, value):
         """Validation de l'ID de la campagne"""
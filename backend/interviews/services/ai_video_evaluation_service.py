@@ -5,6 +5,7 @@ Pipeline complet : Cloudinary → Whisper → Gemini → Stockage
 
 import os
 import time
+import shutil
 import tempfile
 import requests
 import logging
@@ -12,11 +13,23 @@ from typing import Dict, Any, Optional, Tuple
 from django.conf import settings
 from django.utils import timezone
 import whisper
-import google.generativeai as genai
 from ..models import AiEvaluation, InterviewAnswer
+from .llm_client_pool import get_client_pool
+from .llm_router import get_llm_router
+from .evaluation_versioning import NO_AUDIO_PARSE_OUTCOME, current_stamp, get_transcription_model
+from .video_storage import COPY_BUFFER_SIZE, get_video_storage
+from .prompt_budget import compact_transcription, estimate_tokens, get_prompt_token_budget
+from .evaluation_schema import (
+    EvaluationSchemaError, EVALUATION_SCHEMA_DESCRIPTION, SCORING_PROMPT_VERSION,
+    parse_evaluation_json
+)
 
 logger = logging.getLogger(__name__)
 
+# Sortie déterministe pour le scoring, et réparation volontairement courte
+SCORING_GENERATION_CONFIG = {"temperature": 0.2, "max_output_tokens": 512}
+REPAIR_GENERATION_CONFIG = {"temperature": 0.0, "max_output_tokens": 512}
+
 
 class AIVideoEvaluationService:
     """
@@ -34,57 +47,63 @@ class AIVideoEvaluationService:
         self._setup_gemini()
     
     def _setup_gemini(self):
-        """Configuration de Google Gemini"""
+        """Configuration de Google Gemini (une seule fois par processus, via le pool)"""
         api_key = getattr(settings, 'GOOGLE_GEMINI_API_KEY', None)
-        if api_key:
-            genai.configure(api_key=api_key)
-            logger.info("Gemini configuré avec succès")
-        else:
+        if not get_client_pool().configure(api_key):
             logger.warning("GOOGLE_GEMINI_API_KEY non configurée")
     
-    def _load_whisper_model(self, model_size: str = "base") -> whisper.Whisper:
+    def _load_whisper_model(self, model_size: Optional[str] = None) -> whisper.Whisper:
         """
         Charge le modèle Whisper (lazy loading pour économiser la mémoire)
         
         Args:
-            model_size: Taille du modèle ("tiny", "base", "small", "medium", "large")
+            model_size: Taille du modèle ("tiny", "base", "small", "medium", "large"),
+                AI_WHISPER_MODEL par défaut
         """
         if self.whisper_model is None:
+            model_size = model_size or get_transcription_model()
             logger.info(f"Chargement du modèle Whisper '{model_size}'...")
             self.whisper_model = whisper.load_model(model_size)
             logger.info("Modèle Whisper chargé avec succès")
         return self.whisper_model
     
-    def download_video_from_cloudinary(self, cloudinary_url: str) -> str:
+    def download_video_from_cloudinary(self, cloudinary_url: str, public_id: Optional[str] = None) -> str:
         """
-        Télécharge une vidéo depuis Cloudinary vers un fichier temporaire.
+        Télécharge une vidéo vers un fichier temporaire.
+        
+        Avec un public_id, la vidéo est lue via le stockage configuré
+        (fichier local direct en stockage 'local', sans passer par HTTP).
         
         Args:
-            cloudinary_url: URL sécurisée Cloudinary
+            cloudinary_url: URL sécurisée Cloudinary (repli sans public_id)
+            public_id: Identifiant de la vidéo dans le stockage
             
         Returns:
             Chemin vers le fichier temporaire téléchargé
         """
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
         try:
-            logger.info(f"Téléchargement vidéo depuis Cloudinary: {cloudinary_url[:50]}...")
-            
-            response = requests.get(cloudinary_url, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            # Créer un fichier temporaire
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-            
-            # Télécharger par chunks pour économiser la mémoire
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    temp_file.write(chunk)
+            if public_id:
+                logger.info(f"Lecture de la vidéo depuis le stockage: {public_id}")
+                with get_video_storage().open(public_id) as source:
+                    shutil.copyfileobj(source, temp_file, COPY_BUFFER_SIZE)
+            else:
+                logger.info(f"Téléchargement vidéo depuis Cloudinary: {cloudinary_url[:50]}...")
+                response = requests.get(cloudinary_url, stream=True, timeout=60)
+                response.raise_for_status()
+                # Télécharger par chunks pour économiser la mémoire
+                for chunk in response.iter_content(chunk_size=8192):
+                    if chunk:
+                        temp_file.write(chunk)
             
             temp_file.close()
             logger.info(f"Vidéo téléchargée: {temp_file.name}")
             return temp_file.name
             
         except Exception as e:
-            logger.error(f"Erreur téléchargement Cloudinary: {e}")
+            logger.error(f"Erreur téléchargement vidéo: {e}")
+            temp_file.close()
+            os.unlink(temp_file.name)
             raise
     
     def transcribe_video_with_whisper(self, video_path: str) -> Dict[str, Any]:
@@ -158,6 +177,13 @@ class AIVideoEvaluationService:
         """
         Évalue la transcription avec Gemini pour obtenir scores et feedback.
         
+        L'appel passe par le routeur multi-fournisseurs : le fournisseur
+        effectivement utilisé est renvoyé dans 'ai_provider'.
+        
+        La sortie JSON est validée contre le schéma d'évaluation. En cas
+        d'échec, une seule requête de réparation (courte, sans la
+        transcription) est envoyée avec l'erreur de validation.
+        
         Args:
             transcription: Texte transcrit de la vidéo
             question_text: Question posée au candidat
@@ -166,26 +192,77 @@ class AIVideoEvaluationService:
         Returns:
             Dict contenant scores et feedback détaillé
         """
+        logger.info("Début évaluation Gemini...")
+        
+        # Construction du prompt contextuel dans le budget de tokens
+        prompt, budget_info = self._build_budgeted_prompt(transcription, question_text, question_context)
+        parse_info = {'scoring_prompt_version': SCORING_PROMPT_VERSION, 'parse_outcome': None}
+        
         try:
-            logger.info("Début évaluation Gemini...")
-            
-            # Construction du prompt contextuel
-            prompt = self._build_evaluation_prompt(transcription, question_text, question_context)
-            
-            # Appel à Gemini
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(prompt)
-            
-            # Parsing de la réponse
-            evaluation_result = self._parse_gemini_response(response.text)
+            # Appel au fournisseur le plus sain (Gemini, OpenAI, Hugging Face...)
+            router = get_llm_router()
+            response = router.generate(
+                prompt,
+                task='scoring',
+                generation_config=SCORING_GENERATION_CONFIG,
+                validator=self._parse_gemini_response
+            )
+            parse_info['ai_provider'] = response.provider
+
+            try:
+                evaluation_result = self._parse_gemini_response(response.text)
+                parse_info['parse_outcome'] = 'valid'
+            except EvaluationSchemaError as e:
+                logger.warning(f"Sortie {response.provider} hors schéma ({SCORING_PROMPT_VERSION}): {e} - tentative de réparation")
+                parse_info['parse_outcome'] = 'failed'
+                # La réparation reste sur le fournisseur qui a produit la sortie
+                repair_response = router.generate(
+                    self._build_repair_prompt(response.text, str(e)),
+                    task='scoring',
+                    generation_config=REPAIR_GENERATION_CONFIG,
+                    provider_name=response.provider
+                )
+                try:
+                    evaluation_result = self._parse_gemini_response(repair_response.text)
+                    parse_info['parse_outcome'] = 'repaired'
+                except EvaluationSchemaError as repair_error:
+                    logger.error(f"Réparation échouée ({SCORING_PROMPT_VERSION}): {repair_error}")
+                    evaluation_result = self._fallback_evaluation(transcription, question_text)
             
             logger.info("Évaluation Gemini terminée avec succès")
-            return evaluation_result
             
         except Exception as e:
             logger.error(f"Erreur évaluation Gemini: {e}")
             # Fallback avec scores par défaut
-            return self._fallback_evaluation(transcription, question_text)
+            evaluation_result = self._fallback_evaluation(transcription, question_text)
+        
+        evaluation_result.update(budget_info)
+        evaluation_result.update(parse_info)
+        return evaluation_result
+    
+    def _build_budgeted_prompt(self, transcription: str, question_text: str, context: str = "") -> Tuple[str, Dict[str, Any]]:
+        """
+        Construit le prompt d'évaluation en compactant la transcription si le
+        budget de tokens (AI_EVALUATION_PROMPT_TOKEN_BUDGET) est dépassé.
+        
+        Returns:
+            Tuple (prompt, infos budget: prompt_tokens, prompt_compacted)
+        """
+        template_tokens = estimate_tokens(self._build_evaluation_prompt("", question_text, context))
+        transcription_budget = max(50, get_prompt_token_budget() - template_tokens)
+        
+        compaction = compact_transcription(transcription, question_text, transcription_budget)
+        prompt = self._build_evaluation_prompt(compaction['text'], question_text, context)
+        prompt_tokens = estimate_tokens(prompt)
+        
+        logger.info(
+            f"Prompt d'évaluation: {prompt_tokens} tokens estimés "
+            f"(transcription {compaction['original_tokens']} → {compaction['tokens']})"
+        )
+        return prompt, {
+            'prompt_tokens': prompt_tokens,
+            'prompt_compacted': compaction['compacted'],
+        }
     
     def _build_evaluation_prompt(self, transcription: str, question_text: str, context: str = "") -> str:
         """
@@ -197,51 +274,37 @@ class AIVideoEvaluationService:
 QUESTION: {question_text}
 RÉPONSE: {transcription}
 
-Format JSON requis:
-{{
-    "communication_score": X,
-    "relevance_score": X,
-    "confidence_score": X,
-    "overall_score": X,
-    "feedback": "Communication: X/10 (Raison courte)\nPertinence: X/10 (Raison courte)\nConfiance: X/10 (Raison courte)"
-}}
+Réponds UNIQUEMENT avec un objet JSON valide, sans texte ni balise autour, au format:
+{EVALUATION_SCHEMA_DESCRIPTION}
 
 Sois concis et précis.
         """
         return prompt.strip()
     
-    def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
+    def _build_repair_prompt(self, invalid_output: str, validation_error: str) -> str:
+        """
+        Construit la requête de réparation d'une sortie hors schéma.
+        Ne renvoie que la sortie fautive (tronquée), pas la transcription.
+        """
+        prompt = f"""
+La sortie JSON suivante ne respecte pas le schéma attendu.
+
+ERREUR: {validation_error}
+SORTIE: {invalid_output[:2000]}
+
+Corrige-la et réponds UNIQUEMENT avec l'objet JSON valide au format:
+{EVALUATION_SCHEMA_DESCRIPTION}
         """
-        Parse la réponse JSON de Gemini.
+        return prompt.strip()
+    
+    def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
         """
-        import json
-        import re
+        Parse et valide la réponse JSON de Gemini.
         
-        try:
-            # Extraire le JSON de la réponse
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                result = json.loads(json_str)
-                
-                # Validation et nettoyage
-                feedback_text = result.get('feedback', '')
-                
-                return {
-                    'communication_score': result.get('communication_score', 5.0),
-                    'relevance_score': result.get('relevance_score', 5.0),
-                    'confidence_score': result.get('confidence_score', 5.0),
-                    'overall_score': result.get('overall_score', 5.0),
-                    'strengths': "Réponse structurée avec des éléments pertinents.",
-                    'weaknesses': "Évaluation automatique - révision manuelle recommandée.",
-                    'feedback': feedback_text
-                }
-            else:
-                raise ValueError("Pas de JSON trouvé dans la réponse")
-                
-        except Exception as e:
-            logger.error(f"Erreur parsing Gemini: {e}")
-            return self._fallback_evaluation_scores()
+        Raises:
+            EvaluationSchemaError: si la réponse ne respecte pas le schéma
+        """
+        return parse_evaluation_json(response_text)
     
     def _fallback_evaluation(self, transcription: str, question_text: str) -> Dict[str, Any]:
         """
@@ -269,18 +332,6 @@ Sois concis et précis.
             'feedback': f"Réponse de {word_count} mots analysée automatiquement."
         }
     
-    def _fallback_evaluation_scores(self) -> Dict[str, Any]:
-        """Scores par défaut en cas d'erreur"""
-        return {
-            'communication_score': 5.0,
-            'relevance_score': 5.0,
-            'confidence_score': 5.0,
-            'overall_score': 5.0,
-            'strengths': "Évaluation en cours...",
-            'weaknesses': "Analyse détaillée à venir...",
-            'feedback': "Évaluation automatique temporairement indisponible."
-        }
-    
     def cleanup_temp_file(self, file_path: str):
         """Supprime un fichier temporaire"""
         try:
@@ -330,7 +381,7 @@ Sois concis et précis.
             ai_evaluation.save()
             
             # 4. Téléchargement de la vidéo
-            temp_video_path = self.download_video_from_cloudinary(video_url)
+            temp_video_path = self.download_video_from_cloudinary(video_url, interview_answer.cloudinary_public_id)
             
             # 5. Transcription avec Whisper
             transcription_data = self.transcribe_video_with_whisper(temp_video_path)
@@ -356,7 +407,8 @@ Sois concis et précis.
                     'overall_score': 0,
                     'feedback': 'Aucun contenu audio détecté dans la vidéo. Veuillez enregistrer une nouvelle réponse avec du son.',
                     'strengths': 'Aucune force identifiée - vidéo sans contenu audio.',
-                    'weaknesses': 'Vidéo silencieuse ou problème technique lors de l\'enregistrement.'
+                    'weaknesses': 'Vidéo silencieuse ou problème technique lors de l\'enregistrement.',
+                    'parse_outcome': NO_AUDIO_PARSE_OUTCOME,
                 }
             else:
                 # 6. Évaluation avec Gemini pour transcription valide
@@ -383,6 +435,16 @@ Sois concis et précis.
             ai_evaluation.strengths = evaluation_data['strengths']
             ai_evaluation.weaknesses = evaluation_data['weaknesses']
             
+            ai_evaluation.prompt_tokens = evaluation_data.get('prompt_tokens')
+            ai_evaluation.prompt_compacted = evaluation_data.get('prompt_compacted', False)
+            stamp = current_stamp(interview_answer)
+            ai_evaluation.scoring_prompt_version = evaluation_data.get('scoring_prompt_version', stamp['scoring_prompt_version'])
+            ai_evaluation.transcription_engine = stamp['transcription_engine']
+            ai_evaluation.transcription_model = stamp['transcription_model']
+            ai_evaluation.video_version = stamp['video_version']
+            ai_evaluation.parse_outcome = evaluation_data.get('parse_outcome')
+            ai_evaluation.ai_provider = evaluation_data.get('ai_provider', ai_evaluation.ai_provider)
+            
             ai_evaluation.processing_time = time.time() - start_time
             ai_evaluation.mark_completed()
             ai_evaluation.save()  # Sauvegarder tous les scores en base de données
@@ -452,7 +514,7 @@ Sois concis et précis.
             start_time = datetime.now()
             
             # 1. Télécharger la vidéo
-            temp_video_path = self.download_video_from_cloudinary(video_url)
+            temp_video_path = self.download_video_from_cloudinary(video_url, interview_answer.cloudinary_public_id)
             
             # 2. Transcrire avec Whisper
             transcription_result = self.transcribe_video_with_whisper(temp_video_path)
@@ -478,6 +540,15 @@ Sois concis et précis.
             ai_evaluation.strengths = evaluation_result['strengths']
             ai_evaluation.weaknesses = evaluation_result['weaknesses']
             ai_evaluation.ai_feedback = evaluation_result['feedback']
+            ai_evaluation.prompt_tokens = evaluation_result.get('prompt_tokens')
+            ai_evaluation.prompt_compacted = evaluation_result.get('prompt_compacted', False)
+            stamp = current_stamp(interview_answer)
+            ai_evaluation.scoring_prompt_version = evaluation_result.get('scoring_prompt_version', stamp['scoring_prompt_version'])
+            ai_evaluation.transcription_engine = stamp['transcription_engine']
+            ai_evaluation.transcription_model = stamp['transcription_model']
+            ai_evaluation.video_version = stamp['video_version']
+            ai_evaluation.parse_outcome = evaluation_result.get('parse_outcome')
+            ai_evaluation.ai_provider = evaluation_result.get('ai_provider', ai_evaluation.ai_provider)
             ai_evaluation.processing_time = processing_time
             ai_evaluation.status = 'completed'
             ai_evaluation.completed_at = datetime.now()
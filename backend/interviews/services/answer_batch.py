@@ -0,0 +1,266 @@
+"""
+Soumission groupée des réponses d'une session d'entretien.
+
+Une seule requête pour plusieurs réponses : le token est validé une fois,
+les questions sont chargées en une requête, puis toutes les réponses sont
+écrites avec un seul `bulk_create(update_conflicts=True)` sur
+(question, candidate), dans la même transaction que le marquage du lien.
+
+Chaque entrée est soit :
+- un fichier vidéo envoyé avec la requête (`file` = nom du champ multipart)
+- une référence à une vidéo déjà envoyée (`public_id`, upload direct),
+  dont l'existence est vérifiée par lot auprès du stockage
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import CustomUser
+from ..models import CampaignLink, InterviewQuestion, InterviewAnswer
+from .video_deletion import enqueue_video_deletions
+from .video_storage import get_video_storage
+from .video_thumbnails import schedule_uploaded_file_thumbnails
+from .video_uploads import (
+    VIDEO_FOLDER, VideoUploadError, build_public_id, compute_content_sha256,
+    get_link_candidate, get_valid_link, parse_duration, parse_public_id
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ANSWERS = 50
+
+# Champs réécrits quand la réponse existe déjà
+UPSERT_FIELDS = [
+    'cloudinary_public_id', 'cloudinary_url', 'cloudinary_secure_url',
+    'hls_url', 'preview_url', 'poster_url',
+    'thumbnail_url', 'thumbnail_width', 'thumbnail_height', 'sprite_url',
+    'sprite_frame_width', 'sprite_frame_height', 'sprite_frame_count', 'sprite_interval',
+    'duration', 'file_size', 'video_format', 'content_sha256', 'upload_idempotency_key',
+    'storage_verified_at', 'status', 'updated_at',
+]
+
+
+def _question_ids(entries: Any) -> List[int]:
+    if not isinstance(entries, list):
+        return []
+    return [
+        int(entry['question_id']) for entry in entries
+        if isinstance(entry, dict) and str(entry.get('question_id', '')).isdigit()
+    ]
+
+
+def _validate_entries(entries: Any, questions: Dict[int, InterviewQuestion], files, token: str) -> List[Dict[str, Any]]:
+    """Contrôle toutes les entrées avant tout upload ; lève VideoUploadError avec le détail."""
+    if not isinstance(entries, list) or not entries:
+        raise VideoUploadError("La liste 'answers' est obligatoire.", 400)
+    if len(entries) > MAX_BATCH_ANSWERS:
+        raise VideoUploadError(f"{MAX_BATCH_ANSWERS} réponses maximum par envoi.", 400)
+
+    validated, errors, seen = [], {}, set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors[index] = "Entrée invalide."
+            continue
+        try:
+            question = questions.get(int(entry.get('question_id')))
+        except (TypeError, ValueError):
+            question = None
+        if question is None:
+            errors[index] = "Question introuvable pour cette campagne."
+            continue
+        if question.id in seen:
+            errors[index] = "Question présente plusieurs fois."
+            continue
+        seen.add(question.id)
+
+        file_field, public_id = entry.get('file'), entry.get('public_id')
+        if not isinstance(file_field, (str, type(None))) or not isinstance(public_id, (str, type(None))):
+            errors[index] = "'file' et 'public_id' doivent être des chaînes."
+            continue
+        try:
+            duration = parse_duration(entry.get('duration'))
+        except (TypeError, ValueError, OverflowError):
+            errors[index] = "Durée invalide."
+            continue
+
+        video_file = files.get(file_field) if file_field else None
+        if file_field and video_file is None:
+            errors[index] = f"Fichier '{file_field}' absent de la requête."
+        elif video_file is None and not public_id:
+            errors[index] = "Fichier vidéo ou public_id requis."
+        elif video_file is None and parse_public_id(public_id) != (question.id, token):
+            errors[index] = "Cette vidéo ne correspond pas à la question ou au token."
+        else:
+            validated.append({
+                'question': question,
+                'file': video_file,
+                'public_id': public_id if video_file is None else None,
+                'duration': duration,
+                'idempotency_key': entry.get('idempotency_key'),
+            })
+
+    if errors:
+        raise VideoUploadError("Certaines réponses sont invalides.", 400, errors=errors)
+    return validated
+
+
+def _store_entries(entries: List[Dict[str, Any]], existing: Dict[int, InterviewAnswer], token: str) -> List[str]:
+    """
+    Envoie les fichiers au stockage et vérifie les références par lot.
+    Renvoie les public_id envoyés par cet appel (à supprimer en cas d'échec).
+    """
+    storage = get_video_storage()
+    uploaded = []
+    try:
+        for entry in entries:
+            video_file = entry['file']
+            if video_file is None:
+                continue
+            entry['content_sha256'] = compute_content_sha256(video_file)
+            previous = existing.get(entry['question'].id)
+            if previous and previous.status == 'completed' and previous.content_sha256 == entry['content_sha256']:
+                # Vidéo déjà enregistrée à l'identique: pas de nouvel upload
+                entry['result'] = None
+                continue
+            result = storage.put(video_file, build_public_id(entry['question'].id, token), VIDEO_FOLDER)
+            uploaded.append(result['public_id'])
+            entry['result'] = result
+    except Exception as e:
+        enqueue_video_deletions(uploaded)
+        raise VideoUploadError(f"Erreur lors de l'upload de la vidéo: {e}", 502)
+
+    references = [entry['public_id'] for entry in entries if entry['public_id']]
+    if references:
+        found = storage.describe_many(references)
+        if found is None:
+            enqueue_video_deletions(uploaded)
+            raise VideoUploadError("Le stockage vidéo ne répond pas, réessayez plus tard.", 503)
+        missing = [public_id for public_id in references if public_id not in found]
+        if missing:
+            enqueue_video_deletions(uploaded)
+            raise VideoUploadError(f"Vidéo(s) introuvable(s) dans le stockage: {', '.join(missing)}", 400)
+        for entry in entries:
+            if entry['public_id']:
+                info = found[entry['public_id']]
+                entry['result'] = {
+                    'public_id': entry['public_id'],
+                    'url': storage.url(entry['public_id']),
+                    'secure_url': storage.url(entry['public_id']),
+                    'duration': info.get('duration'),
+                    'bytes': info.get('bytes'),
+                    'format': info.get('format'),
+                }
+    return uploaded
+
+
+def _build_answer(entry: Dict[str, Any], candidate: CustomUser, now) -> InterviewAnswer:
+    result = entry['result']
+    public_id = result['public_id']
+    renditions = get_video_storage().rendition_urls(public_id)
+    try:
+        duration = parse_duration(result.get('duration'))
+    except (TypeError, ValueError, OverflowError):
+        duration = None
+    size = entry['file'].size if entry['file'] is not None else result.get('bytes')
+    return InterviewAnswer(
+        question=entry['question'],
+        candidate=candidate,
+        cloudinary_public_id=public_id,
+        cloudinary_url=result.get('url'),
+        cloudinary_secure_url=result.get('secure_url'),
+        hls_url=renditions.get('hls_url'),
+        preview_url=renditions.get('preview_url'),
+        poster_url=renditions.get('poster_url'),
+        duration=duration or entry['duration'] or 0,
+        file_size=size,
+        video_format=result.get('format'),
+        content_sha256=entry.get('content_sha256'),
+        upload_idempotency_key=entry['idempotency_key'],
+        storage_verified_at=now,
+        status='completed',
+    )
+
+
+def submit_answer_batch(candidate_token: Optional[str], entries: Any, files=None) -> Dict[str, Any]:
+    """
+    Enregistre plusieurs réponses d'un candidat en une fois.
+
+    Args:
+        candidate_token: Token du lien de campagne
+        entries: [{"question_id", "file" | "public_id", "duration", "idempotency_key"}]
+        files: Fichiers de la requête (request.FILES)
+
+    Returns:
+        dict: réponses enregistrées (answer_id par question) et nombre d'uploads
+
+    Raises:
+        VideoUploadError: token, entrées ou stockage invalides (rien n'est enregistré)
+    """
+    link = get_valid_link(candidate_token)
+    candidate = get_link_candidate(link)
+    if candidate is None:
+        raise VideoUploadError("Aucun compte candidat n'est associé à ce lien.", 400)
+
+    questions = InterviewQuestion.objects.filter(campaign_id=link.campaign_id).in_bulk(_question_ids(entries))
+    entries = _validate_entries(entries, questions, files or {}, link.token)
+
+    existing = {
+        answer.question_id: answer
+        for answer in InterviewAnswer.objects.filter(
+            candidate=candidate, question_id__in=[entry['question'].id for entry in entries]
+        ).only('id', 'question_id', 'status', 'content_sha256', 'cloudinary_public_id')
+    }
+    uploaded = _store_entries(entries, existing, link.token)
+
+    now = timezone.now()
+    to_save = [entry for entry in entries if entry['result'] is not None]
+    replaced = [
+        existing[entry['question'].id].cloudinary_public_id for entry in to_save
+        if entry['question'].id in existing
+        and existing[entry['question'].id].cloudinary_public_id != entry['result']['public_id']
+    ]
+
+    # Toute erreur après les uploads renvoie les vidéos envoyées à la suppression
+    try:
+        answers = [_build_answer(entry, candidate, now) for entry in to_save]
+        with transaction.atomic():
+            InterviewAnswer.objects.bulk_create(
+                answers,
+                update_conflicts=True,
+                unique_fields=['question', 'candidate'],
+                update_fields=UPSERT_FIELDS,
+            )
+            # Premier passage: le lien est marqué utilisé une seule fois, sans course
+            CampaignLink.objects.filter(pk=link.pk, used_at__isnull=True).update(
+                used_at=now, uses_count=F('uses_count') + 1
+            )
+            enqueue_video_deletions(replaced)
+    except Exception:
+        enqueue_video_deletions(uploaded)
+        raise
+
+    answer_ids = dict(
+        InterviewAnswer.objects.filter(
+            candidate=candidate, question_id__in=[entry['question'].id for entry in entries]
+        ).values_list('question_id', 'id')
+    )
+    for entry in to_save:
+        if entry['file'] is not None:
+            schedule_uploaded_file_thumbnails(answer_ids[entry['question'].id], entry['file'])
+
+    logger.info(
+        f"📦 Lot de {len(entries)} réponse(s) enregistré pour le lien {link.token} "
+        f"({len(uploaded)} upload(s), {len(entries) - len(to_save)} inchangée(s))"
+    )
+    return {
+        'answers': [
+            {'question_id': entry['question'].id, 'answer_id': answer_ids[entry['question'].id],
+             'unchanged': entry['result'] is None}
+            for entry in entries
+        ],
+        'uploaded': len(uploaded),
+    }
@@ -0,0 +1,156 @@
+"""
+Envoi des vidéos vers le stockage (Cloudinary par défaut) en arrière-plan.
+
+Mode asynchrone de `videos/upload/` : la vidéo reçue est écrite dans la
+zone de transit locale, la réponse est créée avec le statut 'processing'
+et le candidat reçoit immédiatement un 202. Un worker envoie ensuite le
+fichier au stockage vidéo (avec plusieurs tentatives) puis passe la réponse
+à 'completed', ou 'failed' si toutes les tentatives échouent.
+
+Le fichier de transit porte l'ID de la réponse, le token candidat et
+l'identifiant de la tentative (InterviewAnswer.staged_upload_id) : après
+un redémarrage, la commande `resume_video_uploads` relance les envois
+interrompus. Une tentative remplacée (nouvel envoi différé) ou devenue
+inutile (réponse terminée par un autre mode d'upload) est abandonnée et
+son fichier supprimé, sans toucher à la vidéo en place.
+"""
+
+import os
+import re
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from ..models import InterviewAnswer
+from .resumable_upload import get_staging_dir
+from .video_storage import get_video_storage
+from .video_thumbnails import generate_answer_thumbnails
+from .video_deletion import enqueue_video_deletions
+from .video_uploads import VIDEO_FOLDER, build_public_id, save_answer_video
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2  # secondes, doublées à chaque tentative
+_STAGED_FILE_PATTERN = re.compile(r'^answer_(\d+)_([0-9A-Za-z-]+)_([0-9a-f]{32})\.upload$')
+
+_upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='video-upload')
+
+
+def is_async_upload_enabled() -> bool:
+    return getattr(settings, 'VIDEO_UPLOAD_MODE', 'sync') == 'async'
+
+
+def new_staged_upload_id() -> str:
+    """Identifiant d'une tentative d'envoi différé (nom du fichier de transit)."""
+    return uuid.uuid4().hex
+
+
+def staged_answer_path(answer_id: int, candidate_token: str, staged_upload_id: str) -> str:
+    return os.path.join(get_staging_dir(), f"answer_{answer_id}_{candidate_token}_{staged_upload_id}.upload")
+
+
+def stage_answer_upload(answer: InterviewAnswer, candidate_token: str, video_file) -> str:
+    """Écrit la vidéo reçue dans le fichier de transit propre à la tentative (par blocs)."""
+    path = staged_answer_path(answer.id, candidate_token, answer.staged_upload_id)
+    with open(path, 'wb') as staged:
+        for chunk in video_file.chunks():
+            staged.write(chunk)
+    return path
+
+
+def schedule_answer_upload(answer_id: int, candidate_token: str, staged_upload_id: str):
+    """Planifie l'envoi vers le stockage après le commit de la réponse."""
+    transaction.on_commit(
+        lambda: _upload_executor.submit(upload_staged_answer, answer_id, candidate_token, staged_upload_id)
+    )
+
+
+def _discard_staged_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _save_if_current(answer: InterviewAnswer, staged_upload_id: str, result, file_size: int) -> bool:
+    """
+    Enregistre la vidéo envoyée si la tentative est toujours celle attendue
+    par la réponse (ligne verrouillée) ; sinon la vidéo envoyée est supprimée.
+    """
+    with transaction.atomic():
+        current = InterviewAnswer.objects.select_for_update().filter(
+            pk=answer.pk, staged_upload_id=staged_upload_id, status='processing'
+        ).exists()
+        if current:
+            save_answer_video(
+                answer.question, answer.candidate, result, file_size=file_size,
+                content_sha256=answer.content_sha256, idempotency_key=answer.upload_idempotency_key
+            )
+            InterviewAnswer.objects.filter(pk=answer.pk).update(staged_upload_id=None)
+            return True
+    enqueue_video_deletions([result['public_id']])
+    return False
+
+
+def upload_staged_answer(answer_id: int, candidate_token: str, staged_upload_id: str):
+    """
+    Envoie le fichier de transit de la réponse au stockage vidéo, avec
+    `VIDEO_UPLOAD_MAX_ATTEMPTS` tentatives et un délai croissant entre elles.
+
+    La réponse est d'abord réclamée : si elle est déjà terminée ou si un
+    envoi plus récent l'a remplacée, le fichier de transit est supprimé.
+    """
+    path = staged_answer_path(answer_id, candidate_token, staged_upload_id)
+    max_attempts = getattr(settings, 'VIDEO_UPLOAD_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    try:
+        if not os.path.exists(path):
+            logger.warning(f"Envoi différé ignoré: fichier de transit introuvable pour la réponse {answer_id}")
+            return
+        claimed = InterviewAnswer.objects.filter(
+            pk=answer_id, staged_upload_id=staged_upload_id, status__in=['processing', 'failed']
+        ).update(status='processing')
+        if not claimed:
+            logger.info(f"Envoi différé {staged_upload_id} de la réponse {answer_id} obsolète, fichier supprimé")
+            _discard_staged_file(path)
+            return
+        answer = InterviewAnswer.objects.select_related('question', 'candidate').get(pk=answer_id)
+
+        public_id = build_public_id(answer.question_id, candidate_token)
+        last_error = None
+        for attempt in range(1, max_attempts + 1):
+            try:
+                result = get_video_storage().put(path, public_id, VIDEO_FOLDER)
+                if not _save_if_current(answer, staged_upload_id, result, os.path.getsize(path)):
+                    logger.info(f"Réponse {answer_id} modifiée pendant l'envoi {staged_upload_id}, vidéo écartée")
+                    _discard_staged_file(path)
+                    return
+                generate_answer_thumbnails(answer_id, path, cleanup=True)
+                logger.info(f"✅ Vidéo de la réponse {answer_id} envoyée (tentative {attempt})")
+                return
+            except Exception as e:
+                last_error = e
+                logger.warning(f"⚠️ Envoi de la réponse {answer_id}, tentative {attempt}/{max_attempts} échouée: {e}")
+                if attempt < max_attempts:
+                    time.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+        # Le fichier est conservé pour une relance manuelle (resume_video_uploads)
+        InterviewAnswer.objects.filter(
+            pk=answer_id, staged_upload_id=staged_upload_id, status='processing'
+        ).update(status='failed')
+        logger.error(f"❌ Envoi de la réponse {answer_id} abandonné: {last_error}")
+    finally:
+        close_old_connections()
+
+
+def pending_staged_answers() -> List[Tuple[int, str, str]]:
+    """(answer_id, token, staged_upload_id) des fichiers qui attendent encore d'être envoyés."""
+    pending = []
+    for name in sorted(os.listdir(get_staging_dir())):
+        match = _STAGED_FILE_PATTERN.match(name)
+        if match:
+            pending.append((int(match.group(1)), match.group(2), match.group(3)))
+    return pending
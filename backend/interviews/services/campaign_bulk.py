@@ -0,0 +1,90 @@
+"""
+Création et clonage de campagnes en lot.
+
+Les campagnes puis toutes leurs questions sont insérées avec `bulk_create`
+dans une seule transaction : créer une campagne de 10 questions pour 50
+offres coûte une poignée de requêtes au lieu de plus de 500.
+"""
+
+import logging
+from typing import Dict, Any, Iterable, List, Optional
+
+from django.db import transaction
+
+from ..models import InterviewCampaign, InterviewQuestion
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_FIELDS = ['title', 'description', 'start_date', 'end_date', 'active']
+QUESTION_FIELDS = ['text', 'question_type', 'time_limit', 'order']
+
+# Types renvoyés par le générateur IA -> types du modèle
+AI_QUESTION_TYPES = {
+    'technique': 'technique',
+    'comportementale': 'comportementale',
+}
+
+
+def normalize_questions(questions_data: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Questions prêtes à insérer, numérotées 1..N dans l'ordre reçu.
+    Le champ 'type' de l'IA est converti en 'question_type'.
+    """
+    questions = []
+    for index, question_data in enumerate(questions_data):
+        question = {key: value for key, value in question_data.items() if key in QUESTION_FIELDS}
+        if 'type' in question_data:
+            question['question_type'] = AI_QUESTION_TYPES.get(question_data['type'], 'generale')
+        question['order'] = index + 1
+        questions.append(question)
+    return questions
+
+
+def create_campaigns_for_offers(campaign_data: Dict[str, Any], questions_data: List[Dict[str, Any]],
+                                job_offers: Iterable, ingest: bool = True) -> List[InterviewCampaign]:
+    """
+    Crée la même campagne (et ses questions) pour chaque offre.
+
+    Args:
+        campaign_data: Champs de la campagne (titre, description, dates, active)
+        questions_data: Questions déjà normalisées (voir normalize_questions)
+        job_offers: Offres cibles
+        ingest: Ajouter les questions à la bibliothèque (une fois par texte)
+
+    Returns:
+        Les campagnes créées, dans l'ordre des offres
+    """
+    job_offers = list(job_offers)
+    campaign_fields = {key: value for key, value in campaign_data.items() if key in CAMPAIGN_FIELDS}
+
+    with transaction.atomic():
+        campaigns = InterviewCampaign.objects.bulk_create([
+            InterviewCampaign(job_offer=job_offer, **campaign_fields) for job_offer in job_offers
+        ])
+        # PostgreSQL renvoie les pk des campagnes insérées (RETURNING)
+        questions = InterviewQuestion.objects.bulk_create([
+            InterviewQuestion(campaign=campaign, **question)
+            for campaign in campaigns
+            for question in questions_data
+        ])
+
+    logger.info(f"📋 {len(campaigns)} campagne(s) créée(s) avec {len(questions)} question(s) en lot")
+
+    # bulk_create n'émet pas post_save: alimenter la bibliothèque explicitement
+    if ingest and campaigns and questions_data:
+        from .question_bank import ingest_saved_questions
+        ingest_saved_questions(questions[:len(questions_data)], campaigns[0].job_offer)
+
+    return campaigns
+
+
+def clone_campaign(source: InterviewCampaign, job_offers: Iterable,
+                   overrides: Optional[Dict[str, Any]] = None) -> List[InterviewCampaign]:
+    """
+    Copie une campagne et ses questions vers une ou plusieurs offres.
+    Les questions clonées sont déjà dans la bibliothèque (celles de la source).
+    """
+    campaign_data = {field: getattr(source, field) for field in CAMPAIGN_FIELDS}
+    campaign_data.update(overrides or {})
+    questions_data = list(source.questions.order_by('order', 'id').values(*QUESTION_FIELDS))
+    return create_campaigns_for_offers(campaign_data, questions_data, job_offers, ingest=False)
@@ -0,0 +1,102 @@
+"""
+Schéma de la sortie JSON attendue pour l'évaluation IA d'une réponse vidéo.
+
+Valide les types et les bornes (0-10) avant tout enregistrement, au lieu
+d'accepter silencieusement une réponse mal formée.
+"""
+
+import json
+import re
+from typing import Dict, Any
+
+# Version du prompt de scoring : à incrémenter à chaque modification du prompt
+# ou du schéma, pour suivre les taux d'échec de parsing par version.
+SCORING_PROMPT_VERSION = 'v2'
+
+SCORE_FIELDS = ['communication_score', 'relevance_score', 'confidence_score', 'overall_score']
+TEXT_FIELDS = ['feedback', 'strengths', 'weaknesses']
+
+SCORE_MIN = 0
+SCORE_MAX = 10
+
+# Décrit dans le prompt et dans la requête de réparation
+EVALUATION_SCHEMA_DESCRIPTION = """{
+    "communication_score": nombre entre 0 et 10,
+    "relevance_score": nombre entre 0 et 10,
+    "confidence_score": nombre entre 0 et 10,
+    "overall_score": nombre entre 0 et 10,
+    "feedback": "Communication: X/10 (Raison courte)\\nPertinence: X/10 (Raison courte)\\nConfiance: X/10 (Raison courte)",
+    "strengths": "Points forts en une phrase",
+    "weaknesses": "Axes d'amélioration en une phrase"
+}"""
+
+_CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+class EvaluationSchemaError(ValueError):
+    """Sortie du modèle non conforme au schéma d'évaluation."""
+    pass
+
+
+def parse_evaluation_json(response_text: str) -> Dict[str, Any]:
+    """
+    Parse et valide la sortie JSON du modèle.
+
+    Args:
+        response_text: Texte brut renvoyé par le modèle
+
+    Returns:
+        Dict normalisé (scores en float, textes nettoyés)
+
+    Raises:
+        EvaluationSchemaError: si le JSON est invalide ou hors schéma
+    """
+    if not response_text or not response_text.strip():
+        raise EvaluationSchemaError("Réponse vide")
+
+    cleaned = _CODE_FENCE_PATTERN.sub('', response_text.strip())
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        raise EvaluationSchemaError(f"JSON invalide: {e.msg} (position {e.pos})")
+
+    return validate_evaluation(data)
+
+
+def validate_evaluation(data: Any) -> Dict[str, Any]:
+    """
+    Valide un objet d'évaluation déjà décodé.
+
+    Raises:
+        EvaluationSchemaError: liste de toutes les violations détectées
+    """
+    if not isinstance(data, dict):
+        raise EvaluationSchemaError(f"Objet JSON attendu, reçu {type(data).__name__}")
+
+    errors = []
+    validated = {}
+
+    for field in SCORE_FIELDS:
+        value = data.get(field)
+        if value is None:
+            errors.append(f"'{field}' manquant")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"'{field}' doit être un nombre, reçu {type(value).__name__}")
+        elif not SCORE_MIN <= value <= SCORE_MAX:
+            errors.append(f"'{field}' doit être entre {SCORE_MIN} et {SCORE_MAX}, reçu {value}")
+        else:
+            validated[field] = float(value)
+
+    for field in TEXT_FIELDS:
+        value = data.get(field)
+        if value is None:
+            errors.append(f"'{field}' manquant")
+        elif not isinstance(value, str):
+            errors.append(f"'{field}' doit être une chaîne, reçu {type(value).__name__}")
+        else:
+            validated[field] = value.strip()
+
+    if errors:
+        raise EvaluationSchemaError('; '.join(errors))
+
+    return validated
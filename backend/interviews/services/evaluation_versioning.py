@@ -0,0 +1,83 @@
+"""
+Empreinte (stamp) de la configuration ayant produit une évaluation IA.
+
+Une évaluation est « périmée » si le moteur ou le modèle de transcription,
+la version du prompt de scoring ou la version de la vidéo ont changé depuis
+son calcul, ou si elle est dégradée (scores de repli après une sortie
+invalide ou un fournisseur indisponible). Les re-runs en lot ne
+recalculent que ces évaluations.
+"""
+
+import re
+import hashlib
+from typing import Dict, Optional
+from django.conf import settings
+
+from .evaluation_schema import SCORING_PROMPT_VERSION
+
+TRANSCRIPTION_ENGINE = 'whisper'
+DEFAULT_WHISPER_MODEL = 'base'
+
+STAMP_FIELDS = ['transcription_engine', 'transcription_model', 'scoring_prompt_version', 'video_version']
+# Sorties du modèle effectivement utilisées pour les scores ; sinon scores de repli
+SCORED_PARSE_OUTCOMES = ('valid', 'repaired')
+# Vidéo sans audio exploitable: scores nuls définitifs, rien à recalculer
+NO_AUDIO_PARSE_OUTCOME = 'no_audio'
+
+# Segment de version des URLs Cloudinary: .../upload/v1712345678/jobgate/...
+_CLOUDINARY_VERSION_PATTERN = re.compile(r'/v(\d+)/')
+
+
+def get_transcription_model() -> str:
+    """Taille du modèle Whisper utilisée pour les transcriptions."""
+    return getattr(settings, 'AI_WHISPER_MODEL', DEFAULT_WHISPER_MODEL)
+
+
+def get_video_version(interview_answer) -> Optional[str]:
+    """
+    Version de la vidéo d'une réponse.
+
+    Utilise la version Cloudinary présente dans l'URL ; à défaut, une
+    empreinte courte de l'URL (un nouvel upload change l'URL).
+    """
+    video_url = interview_answer.cloudinary_secure_url or interview_answer.cloudinary_url
+    if not video_url:
+        return None
+    match = _CLOUDINARY_VERSION_PATTERN.search(video_url)
+    if match:
+        return match.group(1)
+    return hashlib.sha1(video_url.encode('utf-8')).hexdigest()[:16]
+
+
+def current_stamp(interview_answer) -> Dict[str, Optional[str]]:
+    """Empreinte que produirait une évaluation lancée maintenant."""
+    return {
+        'transcription_engine': TRANSCRIPTION_ENGINE,
+        'transcription_model': get_transcription_model(),
+        'scoring_prompt_version': SCORING_PROMPT_VERSION,
+        'video_version': get_video_version(interview_answer),
+    }
+
+
+def is_degraded(ai_evaluation) -> bool:
+    """Scores de repli (parsing échoué, fournisseur indisponible) malgré le statut 'completed'."""
+    return ai_evaluation.parse_outcome not in SCORED_PARSE_OUTCOMES + (NO_AUDIO_PARSE_OUTCOME,)
+
+
+def stale_fields(ai_evaluation, interview_answer) -> list:
+    """
+    Champs de l'empreinte qui diffèrent de la configuration courante,
+    plus 'parse_outcome' pour une évaluation dégradée.
+    """
+    stamp = current_stamp(interview_answer)
+    fields = [field for field in STAMP_FIELDS if getattr(ai_evaluation, field) != stamp[field]]
+    if is_degraded(ai_evaluation):
+        fields.append('parse_outcome')
+    return fields
+
+
+def is_stale(ai_evaluation, interview_answer) -> bool:
+    """Une évaluation non terminée, dégradée ou à l'empreinte différente doit être recalculée."""
+    if ai_evaluation.status != 'completed':
+        return True
+    return bool(stale_fields(ai_evaluation, interview_answer))
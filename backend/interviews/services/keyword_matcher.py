@@ -0,0 +1,410 @@
+"""
+Extraction en un seul passage des compétences, outils, secteur, niveau
+d'expérience et mots-clés d'une offre d'emploi.
+
+Tous les dictionnaires sont compilés une seule fois dans un automate
+Aho–Corasick : le texte de l'offre n'est parcouru qu'une fois, quel que
+soit le nombre de termes recherchés (au lieu d'un `in` / `count` par terme).
+Les termes de deux caractères ou moins (r, go, ml, ux, 5g...) ne sont
+reconnus que comme mots entiers.
+"""
+
+import re
+import logging
+from collections import deque
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_SKILLS = 8
+MAX_TOOLS = 10
+MAX_KEYWORDS = 15
+# Termes trop courts pour une recherche de sous-chaîne
+WHOLE_WORD_MAX_LENGTH = 2
+
+DEFAULT_SECTOR = "Secteur général"
+DEFAULT_EXPERIENCE_LEVEL = "Intermédiaire (2-5 ans)"
+
+# Compétences techniques spécifiques par domaine
+TECHNICAL_SKILLS = {
+    'ingénierie': ['autocad', 'solidworks', 'catia', 'matlab', 'ansys', 'revit'],
+    'développement': ['python', 'java', 'react', 'angular', 'docker', 'kubernetes'],
+    'économie': ['excel', 'sap', 'stata', 'r', 'spss', 'tableau'],
+    'finance': ['bloomberg', 'reuters', 'risk management', 'trading'],
+}
+
+# Outils par domaine
+DOMAIN_TOOLS = {
+    'CAO/Design': ['autocad', 'solidworks', 'catia', 'inventor', 'fusion 360', 'revit', 'sketchup'],
+    'Simulation': ['ansys', 'abaqus', 'comsol', 'matlab', 'simulink'],
+    'Programmation': ['python', 'java', 'c++', 'javascript', 'react', 'angular'],
+    'Base de données': ['sql', 'mysql', 'postgresql', 'mongodb', 'oracle'],
+    'Cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes'],
+    'Analyse': ['excel', 'tableau', 'power bi', 'sas', 'spss', 'r'],
+    'ERP': ['sap', 'oracle', 'sage', 'odoo'],
+}
+
+# Secteurs d'activité, par ordre de priorité (le premier trouvé l'emporte)
+SECTORS = {
+    'BTP/Construction': ['btp', 'construction', 'bâtiment', 'travaux publics'],
+    'Industrie': ['industrie', 'industriel', 'production', 'manufacturing'],
+    'Technologie': ['tech', 'software', 'développement', 'informatique'],
+    'Finance/Banque': ['banque', 'finance', 'crédit', 'investissement'],
+    'Énergie': ['énergie', 'pétrole', 'gaz', 'électricité', 'renouvelable'],
+    'Télécommunications': ['télécom', 'télécommunications', 'réseaux', '5g'],
+    'Aéronautique': ['aéronautique', 'aérospatial', 'aviation'],
+    'Automobile': ['automobile', 'automotive', 'véhicule'],
+    'Santé': ['santé', 'médical', 'pharmaceutique', 'hôpital'],
+}
+
+# Niveaux d'expérience, par ordre de priorité
+EXPERIENCE_LEVELS = {
+    "Junior (0-2 ans)": ['junior', 'débutant', '0-2 ans', 'récent diplômé'],
+    "Senior (5+ ans)": ['senior', 'expérimenté', '5+ ans', 'plus de 5 ans'],
+    "Expert/Lead (10+ ans)": ['expert', 'lead', 'manager', '10+ ans', 'plus de 10 ans'],
+}
+
+# Dictionnaire étendu de mots-clés par domaine
+ENGINEERING_KEYWORDS = [
+    # Ingénierie Civile/BTP
+    'btp', 'construction', 'bâtiment', 'génie civil', 'travaux publics', 'chantier',
+    'béton', 'acier', 'structure', 'fondation', 'voirie', 'assainissement',
+    'autocad', 'revit', 'tekla', 'robot structural', 'etabs', 'sap2000',
+    'norme marocaine', 'nm', 'eurocode', 'cctp', 'dpgf', 'bpu',
+
+    # Ingénierie Électrique/Électronique
+    'électrique', 'électronique', 'électrotechnique', 'automatisme', 'instrumentation',
+    'plc', 'scada', 'hmi', 'variateur', 'moteur', 'transformateur', 'disjoncteur',
+    'siemens', 'schneider', 'abb', 'allen bradley', 'omron', 'mitsubishi',
+    'matlab', 'simulink', 'proteus', 'altium', 'kicad', 'eagle',
+
+    # Ingénierie Mécanique
+    'mécanique', 'maintenance', 'production', 'usinage', 'fabrication', 'assemblage',
+    'cao', 'cfao', 'solidworks', 'catia', 'inventor', 'fusion 360', 'creo',
+    'cnc', 'tournage', 'fraisage', 'soudage', 'métrologie', 'contrôle qualité',
+    'lean manufacturing', 'tpm', 'gmao', 'amdec', 'smed',
+
+    # Ingénierie Industrielle
+    'génie industriel', 'processus', 'optimisation', 'lean', 'six sigma', 'kaizen',
+    'ergonomie', 'sécurité', 'qualité', 'iso 9001', 'iso 14001', 'ohsas 18001',
+    'planification', 'ordonnancement', 'supply chain', 'logistique',
+
+    # Ingénierie Chimique
+    'génie chimique', 'procédés', 'chimie', 'pétrochimie', 'raffinage', 'catalyse',
+    'distillation', 'extraction', 'cristallisation', 'réacteur', 'colonne',
+    'aspen plus', 'hysys', 'chemcad', 'pro ii', 'unisim',
+
+    # Ingénierie Aéronautique
+    'aéronautique', 'aérospatial', 'aviation', 'aérodynamique', 'spatial',
+    'catia v5', 'nx', 'ansys fluent', 'cfd', 'fem', 'easa', 'faa',
+    'composite', 'structure aéronautique', 'certification',
+
+    # Ingénierie Télécommunications
+    'télécommunications', 'télécom', 'réseaux', '5g', '4g', '3g', 'lte',
+    'fibre optique', 'radio', 'antenne', 'gsm', 'umts', 'wifi', 'bluetooth',
+    'cisco', 'huawei', 'ericsson', 'nokia', 'juniper',
+
+    # Ingénierie Environnementale
+    'environnement', 'développement durable', 'traitement eaux', 'pollution',
+    'déchets', 'recyclage', 'énergies renouvelables', 'éolien', 'solaire',
+    'impact environnemental', 'bilan carbone',
+]
+
+TECH_KEYWORDS = [
+    # Développement Web/Mobile
+    'python', 'javascript', 'react', 'angular', 'vue', 'node', 'django', 'flask',
+    'java', 'spring', 'php', 'laravel', 'symfony', 'ruby', 'rails', 'go', 'rust',
+    'html', 'css', 'sass', 'typescript', 'jquery', 'bootstrap', 'tailwind',
+
+    # Cybersécurité
+    'cybersécurité', 'cyber sécurité', 'sécurité informatique', 'sécurité réseau',
+    'pentesting', 'pentest', 'ethical hacking', 'hacking éthique', 'audit sécurité',
+    'vulnerability assessment', 'analyse vulnérabilités', 'soc', 'cert', 'csirt',
+    'firewall', 'pare-feu', 'ids', 'ips', 'siem', 'soar', 'xdr', 'edr',
+    'cryptographie', 'chiffrement', 'ssl', 'tls', 'pki', 'certificats',
+    'iso 27001', 'nist', 'owasp', 'cissp', 'ceh', 'oscp', 'sans',
+    'malware', 'ransomware', 'phishing', 'social engineering', 'ddos',
+    'forensic', 'investigation numérique', 'incident response', 'gestion incidents',
+    'burp suite', 'metasploit', 'nmap', 'wireshark', 'kali linux', 'nessus',
+    'splunk', 'qradar', 'fortinet', 'palo alto', 'checkpoint', 'cisco asa',
+
+    # Base de données
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
+
+    # Cloud & DevOps
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
+    'terraform', 'ansible', 'linux', 'ubuntu', 'centos',
+
+    # Data Engineering & Science
+    'data engineer', 'data scientist', 'data science', 'machine learning', 'ml', 'ia artificielle',
+    'etl', 'elt', 'data pipeline', 'data warehousing', 'data lake', 'big data',
+    'apache spark', 'hadoop', 'kafka', 'airflow', 'luigi', 'dbt',
+    'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
+    'nosql', 'databricks', 'snowflake', 'redshift', 'bigquery',
+    'tableau', 'power bi', 'looker', 'mlops', 'mlflow',
+]
+
+ECONOMICS_KEYWORDS = [
+    # Économie et Finance
+    'économie', 'finance', 'banque', 'comptabilité', 'audit', 'fiscalité',
+    'investissement', 'bourse', 'trading', 'risk management', 'crédit',
+    'excel', 'sap', 'sage', 'bloomberg', 'reuters', 'r', 'stata',
+
+    # Commerce International
+    'export', 'import', 'douane', 'incoterms', 'logistique internationale',
+    'change', 'devise', 'lettre de crédit', 'amdp', 'portnet',
+
+    # Développement Économique
+    'développement', 'coopération', 'ong', 'projets sociaux', 'microfinance',
+    'évaluation impact', 'indicateurs développement', 'pnud', 'banque mondiale',
+]
+
+BUSINESS_KEYWORDS = [
+    'gestion', 'management', 'équipe', 'projet', 'client', 'commercial', 'vente',
+    'marketing', 'communication', 'design', 'ux', 'ui', 'créativité', 'innovation',
+    'startup', 'entreprise', 'pme', 'grand groupe', 'international', 'remote',
+    'télétravail', 'hybride', 'autonomie', 'leadership', 'collaboration',
+]
+
+ALL_KEYWORDS = list(dict.fromkeys(
+    ENGINEERING_KEYWORDS + TECH_KEYWORDS + ECONOMICS_KEYWORDS + BUSINESS_KEYWORDS
+))
+
+# Phrases introduisant une responsabilité ou une compétence : une seule
+# expression compilée par famille, parcourue en un passage
+RESPONSIBILITY_PATTERN = re.compile(
+    r'vous serez chargée? de ([^.]+)'
+    r'|vos missions[^:]*:([^.]+)'
+    r'|responsabilités[^:]*:([^.]+)'
+    r'|vous devrez ([^.]+)'
+    r'|en charge de ([^.]+)'
+    r'|missions principales[^:]*:([^.]+)'
+    r'|vous aurez pour mission de ([^.]+)'
+    r'|votre rôle consistera à ([^.]+)',
+    re.IGNORECASE
+)
+REQUIRED_SKILL_PATTERN = re.compile(
+    r'compétences requises[^:]*:([^.]+)'
+    r'|profil recherché[^:]*:([^.]+)'
+    r'|vous maîtrisez ([^.]+)'
+    r'|connaissances? de ([^.]+)'
+    r'|expérience avec ([^.]+)'
+    r'|maîtrise de ([^.]+)'
+    r'|expertise en ([^.]+)'
+    r'|formation en ([^.]+)',
+    re.IGNORECASE
+)
+SKILL_PHRASE_PATTERN = re.compile(
+    r'(?:expérience en|maîtrise de|connaissance de|compétence en|expertise en) ([^,.]+)',
+    re.IGNORECASE
+)
+
+
+def extract_phrases(pattern: 're.Pattern', text: str, min_length: int = 0) -> List[str]:
+    """Groupes capturés par une expression à alternatives, dans l'ordre du texte."""
+    phrases = []
+    for match in pattern.finditer(text or ''):
+        captured = next((group for group in match.groups() if group is not None), '')
+        clean = ' '.join(captured.split())
+        if len(clean) > min_length:
+            phrases.append(clean)
+    return phrases
+
+
+class AhoCorasickMatcher:
+    """
+    Automate Aho–Corasick construit une fois pour un ensemble de termes.
+
+    Chaque terme porte une ou plusieurs étiquettes (catégorie, libellé) ;
+    `find_all` parcourt le texte en un seul passage et renvoie toutes les
+    occurrences, chevauchantes comprises.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[str] = []
+        self._labels: List[List[Tuple[str, str]]] = []
+        self._pattern_ids: Dict[str, int] = {}
+        self._built = False
+
+    def add(self, pattern: str, category: str, label: str = ''):
+        """Ajoute un terme (en minuscules) avec son étiquette."""
+        pattern = pattern.lower()
+        if not pattern:
+            return
+        pattern_id = self._pattern_ids.get(pattern)
+        if pattern_id is None:
+            pattern_id = len(self._patterns)
+            self._pattern_ids[pattern] = pattern_id
+            self._patterns.append(pattern)
+            self._labels.append([])
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(pattern_id)
+            self._built = False
+        if (category, label) not in self._labels[pattern_id]:
+            self._labels[pattern_id].append((category, label))
+
+    def build(self) -> 'AhoCorasickMatcher':
+        """Calcule les liens d'échec (parcours en largeur du trie)."""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        logger.debug(f"Automate Aho–Corasick: {len(self._patterns)} termes, {len(self._goto)} états")
+        return self
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._patterns)
+
+    def labels(self, pattern: str) -> List[Tuple[str, str]]:
+        pattern_id = self._pattern_ids.get(pattern.lower())
+        return list(self._labels[pattern_id]) if pattern_id is not None else []
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str, List[Tuple[str, str]]]]:
+        """
+        Occurrences des termes dans `text` (déjà en minuscules).
+
+        Yields:
+            (début, fin, terme, étiquettes)
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        patterns, labels = self._patterns, self._labels
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                pattern = patterns[pattern_id]
+                start = index - len(pattern) + 1
+                if len(pattern) <= WHOLE_WORD_MAX_LENGTH and not _is_whole_word(text, start, index + 1):
+                    continue
+                yield start, index + 1, pattern, labels[pattern_id]
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not before.isalnum() and not after.isalnum()
+
+
+def build_offer_matcher() -> AhoCorasickMatcher:
+    """Automate regroupant tous les dictionnaires de l'analyse d'offre."""
+    matcher = AhoCorasickMatcher()
+    for domain, terms in TECHNICAL_SKILLS.items():
+        for term in terms:
+            matcher.add(term, 'skill', domain)
+    for category, terms in DOMAIN_TOOLS.items():
+        for term in terms:
+            matcher.add(term, 'tool', category)
+    for sector, terms in SECTORS.items():
+        for term in terms:
+            matcher.add(term, 'sector', sector)
+    for level, terms in EXPERIENCE_LEVELS.items():
+        for term in terms:
+            matcher.add(term, 'experience', level)
+    for term in ALL_KEYWORDS:
+        matcher.add(term, 'keyword')
+    return matcher.build()
+
+
+_offer_matcher: Optional[AhoCorasickMatcher] = None
+
+
+def get_offer_matcher() -> AhoCorasickMatcher:
+    """Automate partagé, construit au premier appel."""
+    global _offer_matcher
+    if _offer_matcher is None:
+        _offer_matcher = build_offer_matcher()
+    return _offer_matcher
+
+
+def extract_offer_profile(title: str = '', description: str = '', requirements: str = '') -> Dict[str, Any]:
+    """
+    Compétences, outils, secteur, niveau d'expérience et mots-clés pondérés
+    de l'offre, en un seul parcours du texte.
+
+    Les compétences ne sont cherchées que dans la description et les
+    prérequis ; le score d'un mot-clé est sa fréquence, doublée s'il figure
+    dans le titre et multipliée par 1,5 s'il figure dans les prérequis.
+
+    Returns:
+        Dict avec skills, tools, industry_sector, experience_level,
+        keywords (triés par score) et keyword_scores
+    """
+    title = title or ''
+    description = description or ''
+    requirements = requirements or ''
+    full_text = f"{title} {description} {requirements}".lower()
+    title_end = len(title)
+    requirements_start = len(title) + len(description) + 2
+
+    skills = {}
+    tools = {}
+    sectors_found = set()
+    levels_found = set()
+    frequencies = {}
+    in_title = set()
+    in_requirements = set()
+
+    for start, end, pattern, labels in get_offer_matcher().find_all(full_text):
+        for category, label in labels:
+            if category == 'skill':
+                if start > title_end:
+                    skills.setdefault(pattern, None)
+            elif category == 'tool':
+                tools.setdefault(pattern, None)
+            elif category == 'sector':
+                sectors_found.add(label)
+            elif category == 'experience':
+                levels_found.add(label)
+            elif category == 'keyword':
+                frequencies[pattern] = frequencies.get(pattern, 0) + 1
+                if end <= title_end:
+                    in_title.add(pattern)
+                elif start >= requirements_start:
+                    in_requirements.add(pattern)
+
+    industry_sector = next((sector for sector in SECTORS if sector in sectors_found), DEFAULT_SECTOR)
+    experience_level = next((level for level in EXPERIENCE_LEVELS if level in levels_found), DEFAULT_EXPERIENCE_LEVEL)
+
+    keyword_scores = {
+        keyword: frequency
+        * (2 if keyword in in_title else 1)
+        * (1.5 if keyword in in_requirements else 1)
+        for keyword, frequency in frequencies.items()
+    }
+    keywords = sorted(keyword_scores, key=lambda k: keyword_scores[k], reverse=True)
+
+    return {
+        'skills': list(skills)[:MAX_SKILLS],
+        'tools': list(tools)[:MAX_TOOLS],
+        'industry_sector': industry_sector,
+        'experience_level': experience_level,
+        'keywords': keywords[:MAX_KEYWORDS],
+        'keyword_scores': keyword_scores,
+    }
@@ -0,0 +1,128 @@
+"""
+Pool de clients LLM partagé par le processus.
+
+- `genai.configure` n'est appelé qu'une fois par clé API (le client gRPC
+  sous-jacent de google-generativeai est alors conservé entre les appels)
+- Les instances `GenerativeModel` sont mises en cache par configuration
+- Une `requests.Session` unique (keep-alive) sert les fournisseurs HTTP
+- Statistiques: modèles réutilisés, temps d'initialisation économisé,
+  connexions HTTP réutilisées
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+
+class LLMClientPool:
+    """Modèles Gemini et session HTTP réutilisés entre les requêtes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._configured_key = None
+        self._models = {}
+        self._session = None
+        self._stats = {
+            'configure_calls': 0,
+            'models_created': 0,
+            'models_reused': 0,
+            'setup_time_total': 0.0,
+        }
+
+    def configure(self, api_key: Optional[str]) -> bool:
+        """Configure google-generativeai une seule fois par clé API."""
+        if not api_key:
+            return False
+        with self._lock:
+            if self._configured_key != api_key:
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+                self._models.clear()
+                self._stats['configure_calls'] += 1
+                logger.info("Gemini configuré (pool de clients)")
+        return True
+
+    @staticmethod
+    def _model_key(model_name: str, generation_config, safety_settings) -> str:
+        return repr((model_name, sorted((generation_config or {}).items()),
+                     sorted((safety_settings or {}).items(), key=repr)))
+
+    def get_model(self, model_name: str = 'gemini-1.5-flash',
+                  generation_config: Optional[Dict[str, Any]] = None,
+                  safety_settings=None) -> 'genai.GenerativeModel':
+        """Renvoie un GenerativeModel partagé pour cette configuration."""
+        key = self._model_key(model_name, generation_config, safety_settings)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._stats['models_reused'] += 1
+                return model
+
+            start = time.monotonic()
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=generation_config,
+                safety_settings=safety_settings
+            )
+            self._stats['setup_time_total'] += time.monotonic() - start
+            self._stats['models_created'] += 1
+            self._models[key] = model
+            return model
+
+    def get_http_session(self) -> requests.Session:
+        """Session HTTP partagée (connexions keep-alive réutilisées)."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def _http_stats(self) -> Dict[str, int]:
+        """Connexions ouvertes vs requêtes servies, d'après les pools urllib3."""
+        if self._session is None:
+            return {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+        total_requests = 0
+        total_connections = 0
+        for adapter in set(self._session.adapters.values()):
+            for pool_key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                total_requests += pool.num_requests
+                total_connections += pool.num_connections
+        return {
+            'requests': total_requests,
+            'connections_opened': total_connections,
+            'connections_reused': max(0, total_requests - total_connections),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        created = stats['models_created']
+        average_setup = stats['setup_time_total'] / created if created else 0.0
+        stats['setup_time_total'] = round(stats['setup_time_total'], 4)
+        stats['setup_time_saved'] = round(average_setup * stats['models_reused'], 4)
+        stats['http'] = self._http_stats()
+        return stats
+
+
+_pool = LLMClientPool()
+
+
+def get_client_pool() -> LLMClientPool:
+    """Pool unique du processus."""
+    return _pool
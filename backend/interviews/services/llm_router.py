@@ -0,0 +1,557 @@
+"""
+Routeur multi-fournisseurs pour les appels LLM (scoring et génération de questions).
+
+- Suit la latence p95 et le taux d'erreur glissants de chaque fournisseur ;
+  les erreurs expirent après AI_PROVIDER_ERROR_WINDOW_SECONDS, si bien qu'un
+  fournisseur écarté est de nouveau essayé et peut se rétablir
+- Route chaque appel vers le fournisseur le plus sain, avec bascule en cas d'erreur
+- Requêtes « hedged » optionnelles : si le premier fournisseur dépasse un seuil
+  de latence, un second est sollicité et la première réponse valide est retenue
+- Streaming des fragments de réponse (bascule possible avant le premier fragment)
+- Fournisseur local (stub) pour tester le routeur hors ligne
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+from django.conf import settings
+from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+from .llm_client_pool import get_client_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_ORDER = 'gemini,openai,huggingface'
+DEFAULT_STATS_WINDOW = 50
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_ERROR_WINDOW_SECONDS = 300
+
+# Configuration de sécurité Gemini (permissive pour questions d'entretien)
+GEMINI_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+}
+
+# Pool partagé pour les requêtes hedged
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-hedge')
+# Appels au SDK Gemini (0.3.2 n'accepte pas de délai) : le délai est imposé
+# via future.result ; un appel expiré termine en arrière-plan
+_gemini_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-gemini')
+
+
+class LLMProviderError(Exception):
+    """Erreur d'appel à un fournisseur LLM (ou aucun fournisseur disponible)."""
+    pass
+
+
+class LLMResponse:
+    """Réponse d'un fournisseur : texte brut, fournisseur utilisé et latence."""
+
+    def __init__(self, text: str, provider: str, latency: float, valid: bool = True):
+        self.text = text
+        self.provider = provider
+        self.latency = latency
+        self.valid = valid
+
+
+class LLMStream:
+    """
+    Flux de fragments d'un fournisseur. La latence totale (ou l'échec) est
+    enregistrée dans les statistiques du fournisseur à la fin du flux.
+    """
+
+    def __init__(self, stats: 'ProviderStats', provider: str, start: float, first_chunk: str, chunks: Iterator[str]):
+        self.provider = provider
+        self.first_chunk_latency = time.monotonic() - start
+        self._stats = stats
+        self._start = start
+        self._first_chunk = first_chunk
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            if self._first_chunk:
+                yield self._first_chunk
+            for chunk in self._chunks:
+                yield chunk
+        except Exception:
+            self._stats.record(time.monotonic() - self._start, success=False)
+            raise
+        self._stats.record(time.monotonic() - self._start, success=True)
+
+
+class ProviderStats:
+    """
+    Fenêtre glissante des derniers appels d'un fournisseur (latence, succès).
+    Le taux d'erreur ne compte que les appels des `error_window` dernières secondes.
+    """
+
+    def __init__(self, window: int = DEFAULT_STATS_WINDOW, error_window: float = DEFAULT_ERROR_WINDOW_SECONDS):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.error_window = error_window
+
+    def record(self, latency: float, success: bool):
+        with self._lock:
+            self._samples.append((latency, success, time.monotonic()))
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    def _recent(self) -> List[bool]:
+        cutoff = time.monotonic() - self.error_window
+        with self._lock:
+            return [ok for _, ok, recorded_at in self._samples if recorded_at >= cutoff]
+
+    @property
+    def is_stale(self) -> bool:
+        """Appels connus mais tous plus anciens que la fenêtre d'erreurs."""
+        return self.count > 0 and not self._recent()
+
+    @property
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for ok in samples if not ok) / len(samples)
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(latency for latency, ok, _ in self._samples if ok)
+        if not latencies:
+            return None
+        index = max(0, math.ceil(0.95 * len(latencies)) - 1)
+        return latencies[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        p95 = self.p95_latency
+        return {
+            'calls': self.count,
+            'error_rate': round(self.error_rate, 4),
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+        }
+
+
+class BaseLLMProvider:
+    """Interface commune des fournisseurs LLM."""
+    name = ''
+
+    def is_available(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, task: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, task: str, generation_config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Fragments de texte au fil de la génération (par défaut: la réponse complète)."""
+        yield self.generate(prompt, task, generation_config)
+
+
+class GeminiProvider(BaseLLMProvider):
+    """Google Gemini via le SDK google-generativeai."""
+    name = 'gemini'
+
+    def __init__(self, api_key: Optional[str], model_name: str = 'gemini-1.5-flash', safety_settings=None,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.safety_settings = safety_settings
+        self.timeout = timeout
+        get_client_pool().configure(api_key)
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    def _with_timeout(self, func, *args, deadline: Optional[float] = None, **kwargs):
+        """Exécute un appel bloquant du SDK en le limitant au délai du fournisseur."""
+        remaining = (deadline - time.monotonic()) if deadline is not None else self.timeout
+        future = _gemini_executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=max(remaining, 0))
+        except FutureTimeoutError:
+            future.cancel()
+            raise LLMProviderError(f"Gemini: délai de {self.timeout}s dépassé")
+
+    def generate(self, prompt, task, generation_config=None):
+        model = get_client_pool().get_model(self.model_name, safety_settings=self.safety_settings)
+        response = self._with_timeout(model.generate_content, prompt, generation_config=generation_config)
+        if not response or not response.text:
+            raise LLMProviderError("Réponse vide de Gemini")
+        return response.text
+
+    def stream(self, prompt, task, generation_config=None):
+        model = get_client_pool().get_model(self.model_name, safety_settings=self.safety_settings)
+        # Délai global pour l'ensemble du flux, vérifié à chaque fragment
+        deadline = time.monotonic() + self.timeout
+        response = self._with_timeout(
+            model.generate_content, prompt, generation_config=generation_config, stream=True, deadline=deadline
+        )
+        chunks = iter(response)
+        while True:
+            chunk = self._with_timeout(next, chunks, None, deadline=deadline)
+            if chunk is None:
+                return
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAIProvider(BaseLLMProvider):
+    """OpenAI Chat Completions via HTTP."""
+    name = 'openai'
+    API_URL = 'https://api.openai.com/v1/chat/completions'
+
+    def __init__(self, api_key: Optional[str], model_name: str = 'gpt-4o-mini', timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    def generate(self, prompt, task, generation_config=None):
+        config = generation_config or {}
+        payload = {
+            'model': self.model_name,
+            'messages': [{'role': 'user', 'content': prompt}],
+        }
+        if 'temperature' in config:
+            payload['temperature'] = config['temperature']
+        if 'max_output_tokens' in config:
+            payload['max_tokens'] = config['max_output_tokens']
+
+        response = get_client_pool().get_http_session().post(
+            self.API_URL,
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            json=payload,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
+
+
+class HuggingFaceProvider(BaseLLMProvider):
+    """Hugging Face Inference API via HTTP."""
+    name = 'huggingface'
+    API_URL = 'https://api-inference.huggingface.co/models/{model}'
+
+    def __init__(self, api_token: Optional[str], model_name: str = 'gpt2', timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.api_token = api_token
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        return bool(self.api_token)
+
+    def generate(self, prompt, task, generation_config=None):
+        config = generation_config or {}
+        parameters = {'return_full_text': False}
+        if 'temperature' in config:
+            # L'API refuse une température nulle
+            parameters['temperature'] = max(0.01, config['temperature'])
+        if 'max_output_tokens' in config:
+            parameters['max_new_tokens'] = config['max_output_tokens']
+
+        response = get_client_pool().get_http_session().post(
+            self.API_URL.format(model=self.model_name),
+            headers={'Authorization': f'Bearer {self.api_token}'},
+            json={'inputs': prompt, 'parameters': parameters},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, list) and data:
+            return data[0].get('generated_text', '')
+        raise LLMProviderError(f"Réponse Hugging Face inattendue: {str(data)[:200]}")
+
+
+class LocalStubProvider(BaseLLMProvider):
+    """
+    Fournisseur local déterministe, sans réseau.
+    Permet de tester le routeur (latence et erreurs simulées) hors ligne.
+    """
+    name = 'local'
+
+    def __init__(self, latency: float = 0.0, fail: bool = False, responses: Optional[Dict[str, str]] = None):
+        self.latency = latency
+        self.fail = fail
+        self.responses = responses or {}
+
+    STREAM_CHUNK_SIZE = 24
+
+    def generate(self, prompt, task, generation_config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response_for(prompt, task)
+
+    def stream(self, prompt, task, generation_config=None):
+        text = self._response_for(prompt, task)
+        chunks = [text[i:i + self.STREAM_CHUNK_SIZE] for i in range(0, len(text), self.STREAM_CHUNK_SIZE)]
+        for chunk in chunks:
+            # Latence répartie sur les fragments, comme un vrai flux de tokens
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield chunk
+
+    def _response_for(self, prompt, task):
+        if self.fail:
+            raise LLMProviderError("Échec simulé du fournisseur local")
+        if task in self.responses:
+            return self.responses[task]
+        if task == 'scoring':
+            return json.dumps({
+                'communication_score': 6.0,
+                'relevance_score': 6.0,
+                'confidence_score': 6.0,
+                'overall_score': 6.0,
+                'feedback': "Communication: 6/10 (Évaluation locale)\nPertinence: 6/10 (Évaluation locale)\nConfiance: 6/10 (Évaluation locale)",
+                'strengths': "Évaluation locale (stub)",
+                'weaknesses': "Évaluation locale (stub)",
+            }, ensure_ascii=False)
+        if task == 'questions':
+            requested = re.findall(r'(\d+)\s+QUESTIONS\s+(COMPORTEMENTALES|TECHNIQUES)', prompt) or [('3', 'COMPORTEMENTALES')]
+            questions = []
+            for count, kind in requested:
+                question_type = 'technique' if kind == 'TECHNIQUES' else 'comportementale'
+                questions.extend(
+                    {'question': f"Question {question_type} locale n°{i + 1}", 'type': question_type}
+                    for i in range(int(count))
+                )
+            return json.dumps(questions, ensure_ascii=False)
+        return ''
+
+
+class LLMRouter:
+    """
+    Sélectionne le fournisseur le plus sain pour chaque appel.
+
+    Classement : taux d'erreur récent (arrondi), puis latence p95 (inconnue en
+    dernier), puis ordre de configuration. Un fournisseur sans appel récent
+    (par exemple écarté après des erreurs) passe en tête pour un appel de test :
+    s'il échoue de nouveau, il est écarté pour une nouvelle fenêtre.
+    """
+
+    def __init__(self, providers: List[BaseLLMProvider], hedge_after: Optional[float] = None,
+                 window: int = DEFAULT_STATS_WINDOW, error_window: float = DEFAULT_ERROR_WINDOW_SECONDS):
+        self.providers = [provider for provider in providers if provider.is_available()]
+        self.hedge_after = hedge_after
+        self.stats = {provider.name: ProviderStats(window, error_window) for provider in self.providers}
+
+    def has_providers(self) -> bool:
+        return bool(self.providers)
+
+    def ranked_providers(self) -> List[BaseLLMProvider]:
+        """Fournisseurs triés du plus sain au moins sain."""
+        def health_key(item):
+            order, provider = item
+            stats = self.stats[provider.name]
+            if stats.is_stale:
+                return (0.0, 0.0, order)
+            p95 = stats.p95_latency
+            return (round(stats.error_rate, 1), p95 if p95 is not None else float('inf'), order)
+
+        return [provider for _, provider in sorted(enumerate(self.providers), key=health_key)]
+
+    def _call(self, provider: BaseLLMProvider, prompt: str, task: str,
+              generation_config: Optional[Dict[str, Any]], validator: Optional[Callable]) -> LLMResponse:
+        """Appelle un fournisseur en enregistrant latence et succès."""
+        start = time.monotonic()
+        try:
+            text = provider.generate(prompt, task, generation_config)
+        except Exception:
+            self.stats[provider.name].record(time.monotonic() - start, success=False)
+            raise
+        latency = time.monotonic() - start
+        self.stats[provider.name].record(latency, success=True)
+
+        valid = True
+        if validator:
+            try:
+                validator(text)
+            except Exception:
+                valid = False
+        return LLMResponse(text, provider.name, latency, valid)
+
+    def generate(self, prompt: str, task: str, generation_config: Optional[Dict[str, Any]] = None,
+                 validator: Optional[Callable] = None, hedge: Optional[bool] = None,
+                 provider_name: Optional[str] = None) -> LLMResponse:
+        """
+        Exécute un appel LLM sur le fournisseur le plus sain.
+
+        Args:
+            prompt: Prompt à envoyer
+            task: 'scoring' ou 'questions' (utilisé par le stub local)
+            generation_config: temperature / max_output_tokens
+            validator: Callable levant une exception si le texte est invalide ;
+                sert à choisir la première réponse valide en mode hedged
+            hedge: Forcer/désactiver le hedging (par défaut: selon hedge_after)
+            provider_name: Forcer un fournisseur précis (ex: requête de réparation)
+
+        Returns:
+            LLMResponse (une réponse invalide n'est renvoyée que si aucune
+            réponse valide n'a été obtenue)
+
+        Raises:
+            LLMProviderError: si aucun fournisseur n'a répondu
+        """
+        if provider_name:
+            candidates = [p for p in self.providers if p.name == provider_name]
+        else:
+            candidates = self.ranked_providers()
+        if not candidates:
+            raise LLMProviderError("Aucun fournisseur IA disponible. Vérifiez votre configuration API.")
+
+        use_hedge = (self.hedge_after is not None) if hedge is None else hedge
+        fallback_response = None
+        errors = []
+
+        if use_hedge and self.hedge_after is not None and len(candidates) > 1:
+            response = self._hedged_call(candidates[:2], prompt, task, generation_config, validator, errors)
+            if response and response.valid:
+                return response
+            fallback_response = response
+            candidates = candidates[2:]
+
+        for provider in candidates:
+            try:
+                response = self._call(provider, prompt, task, generation_config, validator)
+            except Exception as e:
+                logger.warning(f"Fournisseur IA '{provider.name}' en échec: {e}")
+                errors.append(f"{provider.name}: {e}")
+                continue
+            if response.valid or not validator:
+                return response
+            fallback_response = fallback_response or response
+            # Sortie invalide : le réparer relève de l'appelant, pas d'une bascule
+            break
+
+        if fallback_response:
+            return fallback_response
+        raise LLMProviderError("Tous les fournisseurs IA ont échoué: " + '; '.join(errors))
+
+    def _hedged_call(self, providers: List[BaseLLMProvider], prompt, task, generation_config,
+                     validator, errors: List[str]) -> Optional[LLMResponse]:
+        """Lance le premier fournisseur, puis le second après `hedge_after` secondes."""
+        primary, secondary = providers
+        futures = {_hedge_executor.submit(self._call, primary, prompt, task, generation_config, validator): primary}
+        done, _ = wait(futures, timeout=self.hedge_after)
+        if not done:
+            logger.info(f"Hedging: '{primary.name}' > {self.hedge_after}s, sollicitation de '{secondary.name}'")
+            futures[_hedge_executor.submit(self._call, secondary, prompt, task, generation_config, validator)] = secondary
+        elif self._result_or_none(next(iter(done)), futures, errors) is None:
+            # Échec rapide du premier fournisseur : bascule immédiate
+            futures[_hedge_executor.submit(self._call, secondary, prompt, task, generation_config, validator)] = secondary
+
+        first_invalid = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                response = self._result_or_none(future, futures, errors)
+                if response is None:
+                    continue
+                if response.valid:
+                    return response
+                first_invalid = first_invalid or response
+        return first_invalid
+
+    @staticmethod
+    def _result_or_none(future, futures, errors: List[str]) -> Optional[LLMResponse]:
+        try:
+            return future.result()
+        except Exception as e:
+            message = f"{futures[future].name}: {e}"
+            if message not in errors:
+                errors.append(message)
+            return None
+
+    def stream(self, prompt: str, task: str,
+               generation_config: Optional[Dict[str, Any]] = None) -> 'LLMStream':
+        """
+        Appel en streaming sur le fournisseur le plus sain.
+
+        La bascule vers le fournisseur suivant n'est possible que tant qu'aucun
+        fragment n'a été reçu ; ensuite, une erreur est propagée à l'appelant.
+
+        Raises:
+            LLMProviderError: si aucun fournisseur n'a pu démarrer le flux
+        """
+        errors = []
+        for provider in self.ranked_providers():
+            start = time.monotonic()
+            try:
+                chunks = iter(provider.stream(prompt, task, generation_config))
+                first_chunk = next(chunks, '')
+            except Exception as e:
+                self.stats[provider.name].record(time.monotonic() - start, success=False)
+                logger.warning(f"Flux IA '{provider.name}' en échec: {e}")
+                errors.append(f"{provider.name}: {e}")
+                continue
+            return LLMStream(self.stats[provider.name], provider.name, start, first_chunk, chunks)
+        raise LLMProviderError("Aucun fournisseur IA n'a pu démarrer le flux: " + '; '.join(errors))
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques glissantes par fournisseur, dans l'ordre de préférence courant."""
+        return {provider.name: self.stats[provider.name].as_dict() for provider in self.ranked_providers()}
+
+
+def build_provider(name: str) -> Optional[BaseLLMProvider]:
+    """Instancie un fournisseur à partir des réglages Django."""
+    timeout = float(getattr(settings, 'AI_PROVIDER_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS))
+    if name == 'gemini':
+        api_key = (
+            getattr(settings, 'GOOGLE_API_KEY', None) or
+            getattr(settings, 'GOOGLE_GEMINI_API_KEY', None) or
+            os.getenv('GOOGLE_API_KEY') or
+            os.getenv('GOOGLE_GEMINI_API_KEY')
+        )
+        return GeminiProvider(api_key, safety_settings=GEMINI_SAFETY_SETTINGS, timeout=timeout)
+    if name == 'openai':
+        return OpenAIProvider(
+            getattr(settings, 'OPENAI_API_KEY', None),
+            getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini'),
+            timeout
+        )
+    if name == 'huggingface':
+        return HuggingFaceProvider(
+            getattr(settings, 'HUGGINGFACE_API_TOKEN', None),
+            getattr(settings, 'HUGGINGFACE_MODEL', 'gpt2'),
+            timeout
+        )
+    if name == 'local':
+        return LocalStubProvider()
+    logger.warning(f"Fournisseur IA inconnu ignoré: {name}")
+    return None
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> LLMRouter:
+    """Routeur partagé par le processus (les statistiques persistent entre requêtes)."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                order = getattr(settings, 'AI_PROVIDER_ORDER', DEFAULT_PROVIDER_ORDER)
+                providers = [build_provider(name.strip()) for name in order.split(',') if name.strip()]
+                hedge_after = getattr(settings, 'AI_HEDGE_AFTER_SECONDS', None)
+                _router = LLMRouter(
+                    [provider for provider in providers if provider],
+                    hedge_after=float(hedge_after) if hedge_after else None,
+                    error_window=float(getattr(settings, 'AI_PROVIDER_ERROR_WINDOW_SECONDS', DEFAULT_ERROR_WINDOW_SECONDS))
+                )
+                logger.info(f"Routeur IA initialisé: {[p.name for p in _router.providers]}")
+    return _router
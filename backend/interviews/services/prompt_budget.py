@@ -0,0 +1,193 @@
+"""
+Budget de tokens pour les prompts d'évaluation IA.
+
+Estime la taille d'un prompt avant l'envoi et compresse de façon déterministe
+les transcriptions trop longues :
+1. Suppression des mots de remplissage et des répétitions
+2. Conservation des N premières et N dernières phrases
+3. Ajout des phrases clés classées par recouvrement avec la question
+"""
+
+import math
+import re
+import logging
+from typing import Dict, Any, List, Set
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Approximation du tokenizer Gemini (~4 caractères par token en français/anglais)
+CHARS_PER_TOKEN = 4
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 1500
+DEFAULT_KEEP_HEAD_SENTENCES = 2
+DEFAULT_KEEP_TAIL_SENTENCES = 2
+
+OMISSION_MARKER = "[...]"
+
+# Mots et expressions de remplissage fréquents à l'oral (FR/EN)
+FILLER_EXPRESSIONS = [
+    'en fait', 'du coup', 'tu vois', 'vous voyez', 'on va dire', 'you know', 'i mean',
+]
+FILLER_WORDS = [
+    'euh', 'euhh', 'heu', 'hum', 'hmm', 'bah', 'ben', 'voilà', 'um', 'uh', 'uhm', 'erm',
+]
+
+_FILLER_PATTERN = re.compile(
+    r"(?<!\w)(?:" + "|".join(
+        re.escape(expr) for expr in sorted(FILLER_EXPRESSIONS + FILLER_WORDS, key=len, reverse=True)
+    ) + r")(?!\w)\s*,?",
+    re.IGNORECASE
+)
+# Mot répété consécutivement ("je je je", "the the"), hors pronoms réfléchis
+_REPEATED_WORD_PATTERN = re.compile(r"\b(?!nous\b|vous\b)(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+_SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?…])\s+")
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Mots vides ignorés lors du calcul du recouvrement avec la question
+STOPWORDS = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'ou', 'à', 'au', 'aux',
+    'en', 'dans', 'pour', 'par', 'sur', 'avec', 'que', 'qui', 'quoi', 'est', 'sont',
+    'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles', 'on', 'ce', 'cet',
+    'cette', 'ces', 'mon', 'ma', 'mes', 'votre', 'vos', 'notre', 'nos', 'son', 'sa',
+    'ses', 'leur', 'leurs', 'pas', 'ne', 'plus', 'comment', 'quel', 'quelle',
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'is',
+    'are', 'you', 'your', 'i', 'my', 'we', 'it', 'this', 'that', 'how', 'what',
+}
+
+
+def get_prompt_token_budget() -> int:
+    """Budget maximal (en tokens) d'un prompt d'évaluation."""
+    return int(getattr(settings, 'AI_EVALUATION_PROMPT_TOKEN_BUDGET', DEFAULT_PROMPT_TOKEN_BUDGET))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estime le nombre de tokens d'un texte sans appel réseau.
+
+    Args:
+        text: Texte à estimer
+
+    Returns:
+        Nombre approximatif de tokens
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Découpe un texte en phrases non vides."""
+    return [s.strip() for s in _SENTENCE_SPLIT_PATTERN.split(text.strip()) if s.strip()]
+
+
+def _content_words(text: str) -> Set[str]:
+    """Ensemble des mots significatifs (minuscules, sans mots vides)."""
+    return {
+        word for word in _WORD_PATTERN.findall(text.lower())
+        if len(word) > 2 and word not in STOPWORDS
+    }
+
+
+def remove_fillers(text: str) -> str:
+    """Supprime les mots de remplissage et les répétitions immédiates."""
+    cleaned = _FILLER_PATTERN.sub('', text)
+    cleaned = _REPEATED_WORD_PATTERN.sub(r"\1", cleaned)
+    cleaned = re.sub(r"\s+([,.!?])", r"\1", cleaned)
+    cleaned = re.sub(r",+([.!?])", r"\1", cleaned)
+    cleaned = re.sub(r"\s{2,}", ' ', cleaned)
+    return cleaned.strip()
+
+
+def _dedupe_sentences(sentences: List[str]) -> List[str]:
+    """Retire les phrases répétées (comparaison insensible à la casse et à la ponctuation)."""
+    seen = set()
+    unique = []
+    for sentence in sentences:
+        key = ' '.join(_WORD_PATTERN.findall(sentence.lower()))
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        unique.append(sentence)
+    return unique
+
+
+def compact_transcription(transcription: str, question_text: str, max_tokens: int,
+                          keep_head: int = DEFAULT_KEEP_HEAD_SENTENCES,
+                          keep_tail: int = DEFAULT_KEEP_TAIL_SENTENCES) -> Dict[str, Any]:
+    """
+    Compresse une transcription pour qu'elle tienne dans `max_tokens`.
+
+    La sortie est déterministe : même entrée, même résultat.
+
+    Args:
+        transcription: Texte transcrit complet
+        question_text: Question posée (sert au classement des phrases clés)
+        max_tokens: Nombre maximal de tokens alloués à la transcription
+        keep_head: Nombre de phrases conservées en début de réponse
+        keep_tail: Nombre de phrases conservées en fin de réponse
+
+    Returns:
+        Dict contenant le texte compacté et les statistiques de compression
+    """
+    original_tokens = estimate_tokens(transcription)
+    result = {
+        'text': transcription,
+        'original_tokens': original_tokens,
+        'tokens': original_tokens,
+        'compacted': False,
+    }
+
+    if original_tokens <= max_tokens:
+        return result
+
+    # 1. Nettoyage : remplissage et répétitions
+    sentences = _dedupe_sentences(split_sentences(remove_fillers(transcription)))
+    cleaned = ' '.join(sentences)
+    if estimate_tokens(cleaned) <= max_tokens:
+        result.update(text=cleaned, tokens=estimate_tokens(cleaned), compacted=True)
+        return result
+
+    # 2. Début et fin de réponse toujours conservés
+    head_count = min(keep_head, len(sentences))
+    tail_count = min(keep_tail, len(sentences) - head_count)
+    selected = set(range(head_count)) | set(range(len(sentences) - tail_count, len(sentences)))
+    used_tokens = sum(estimate_tokens(sentences[i]) + 1 for i in selected)
+
+    # 3. Phrases clés du milieu, classées par recouvrement avec la question
+    question_words = _content_words(question_text)
+    middle = [i for i in range(len(sentences)) if i not in selected]
+    ranked = sorted(
+        middle,
+        key=lambda i: (-len(_content_words(sentences[i]) & question_words), i)
+    )
+    for index in ranked:
+        cost = estimate_tokens(sentences[index]) + 1
+        if used_tokens + cost > max_tokens:
+            continue
+        selected.add(index)
+        used_tokens += cost
+
+    # Recomposer dans l'ordre d'origine en signalant les coupures
+    parts = []
+    previous = -1
+    for index in sorted(selected):
+        if index != previous + 1:
+            parts.append(OMISSION_MARKER)
+        parts.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(OMISSION_MARKER)
+
+    compacted_text = ' '.join(parts)
+    # Garde-fou : une phrase de tête/queue trop longue peut encore dépasser
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(compacted_text) > max_chars:
+        compacted_text = compacted_text[:max_chars - len(OMISSION_MARKER) - 1].rstrip() + ' ' + OMISSION_MARKER
+
+    result.update(text=compacted_text, tokens=estimate_tokens(compacted_text), compacted=True)
+    logger.info(
+        f"Transcription compactée: {original_tokens} → {result['tokens']} tokens "
+        f"({len(selected)}/{len(sentences)} phrases conservées)"
+    )
+    return result
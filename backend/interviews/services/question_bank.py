@@ -0,0 +1,316 @@
+"""
+Bibliothèque de questions dédupliquée et indexée.
+
+- Ingestion de toutes les questions (générées, statiques, enregistrées)
+- Quasi-doublons écartés par MinHash sur des shingles de 3 mots, avec un
+  index LSH (bandes) pour ne comparer qu'une poignée de candidats
+- Index en mémoire par mots-clés du poste, type et difficulté : les
+  modèles et suggestions sont servis sans appel au LLM
+"""
+
+import re
+import random
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import defaultdict, Counter
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Count
+
+from ..models import QuestionBankEntry
+from .prompt_budget import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+# Similarité de Jaccard estimée au-delà de laquelle deux questions sont des doublons
+DUPLICATE_THRESHOLD = 0.8
+MAX_ROLE_KEYWORDS = 20
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240917)  # graine fixe: signatures stables entre processus
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    return ' '.join(_WORD_PATTERN.findall(text))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Ensemble des n-grammes de mots du texte normalisé."""
+    words = normalize_text(text).split()
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Signature MinHash (NUM_PERMUTATIONS valeurs) des shingles du texte."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in shingles(text)
+    ]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimated_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Similarité de Jaccard estimée à partir de deux signatures."""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+def extract_role_keywords(*texts: str) -> List[str]:
+    """Mots-clés significatifs (titre, prérequis), du plus fréquent au moins fréquent."""
+    counter = Counter()
+    for text in texts:
+        for word in normalize_text(text).split():
+            if len(word) > 2 and word not in STOPWORDS:
+                counter[word] += 1
+    return [word for word, _ in counter.most_common(MAX_ROLE_KEYWORDS)]
+
+
+def _band_keys(signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [
+        (band, tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+        for band in range(LSH_BANDS)
+    ] if signature else []
+
+
+class QuestionBankIndex:
+    """
+    Index en mémoire de la bibliothèque (LSH + mots-clés).
+    Rechargé depuis la base si d'autres processus y ont ajouté des entrées.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._bands = defaultdict(set)
+        self._keywords = defaultdict(set)
+        self._loaded_marker = None
+
+    def _db_marker(self):
+        aggregate = QuestionBankEntry.objects.aggregate(max_id=Max('id'), total=Count('id'))
+        return aggregate['max_id'], aggregate['total']
+
+    def ensure_loaded(self):
+        marker = self._db_marker()
+        with self._lock:
+            if marker == self._loaded_marker:
+                return
+            self._entries.clear()
+            self._bands.clear()
+            self._keywords.clear()
+            for entry in QuestionBankEntry.objects.values(
+                'id', 'text', 'question_type', 'difficulty', 'role_keywords',
+                'minhash_signature', 'usage_count'
+            ):
+                self._add(entry)
+            self._loaded_marker = marker
+            logger.info(f"📚 Bibliothèque de questions indexée: {len(self._entries)} entrées")
+
+    def _add(self, entry: Dict[str, Any]):
+        entry = dict(entry, role_keywords=set(entry.get('role_keywords') or []))
+        self._entries[entry['id']] = entry
+        for key in _band_keys(entry['minhash_signature']):
+            self._bands[key].add(entry['id'])
+        for keyword in entry['role_keywords']:
+            self._keywords[keyword].add(entry['id'])
+
+    def add(self, entry: QuestionBankEntry):
+        """Ajoute ou met à jour une entrée sans recharger tout l'index."""
+        with self._lock:
+            self._add({
+                'id': entry.id, 'text': entry.text, 'question_type': entry.question_type,
+                'difficulty': entry.difficulty, 'role_keywords': entry.role_keywords,
+                'minhash_signature': entry.minhash_signature, 'usage_count': entry.usage_count,
+            })
+            self._loaded_marker = self._db_marker()
+
+    def find_duplicate(self, signature: List[int]) -> Optional[int]:
+        """ID d'une entrée quasi identique (Jaccard estimé >= seuil), sinon None."""
+        with self._lock:
+            candidates = set()
+            for key in _band_keys(signature):
+                candidates |= self._bands.get(key, set())
+            best_id, best_score = None, 0.0
+            for entry_id in candidates:
+                score = estimated_similarity(signature, self._entries[entry_id]['minhash_signature'])
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+        return best_id if best_score >= DUPLICATE_THRESHOLD else None
+
+    def search(self, keywords: List[str], question_type: Optional[str] = None,
+               difficulty: Optional[str] = None, limit: int = 10,
+               exclude_ids: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Questions classées par recouvrement de mots-clés, puis popularité.
+        Sans mots-clés, renvoie les questions les plus fréquentes du filtre.
+        """
+        self.ensure_loaded()
+        exclude_ids = exclude_ids or set()
+        with self._lock:
+            if keywords:
+                scores = Counter()
+                for keyword in keywords:
+                    for entry_id in self._keywords.get(keyword, ()):
+                        scores[entry_id] += 1
+                candidate_ids = list(scores)
+            else:
+                scores = Counter()
+                candidate_ids = list(self._entries)
+
+            results = []
+            for entry_id in candidate_ids:
+                entry = self._entries[entry_id]
+                if entry_id in exclude_ids:
+                    continue
+                if question_type and entry['question_type'] != question_type:
+                    continue
+                if difficulty and entry['difficulty'] != difficulty:
+                    continue
+                results.append(entry)
+
+            results.sort(key=lambda e: (-scores[e['id']], -e['usage_count'], e['id']))
+            return [
+                {
+                    'id': entry['id'],
+                    'question': entry['text'],
+                    'type': entry['question_type'],
+                    'difficulty': entry['difficulty'],
+                    'keyword_matches': scores[entry['id']],
+                    'usage_count': entry['usage_count'],
+                }
+                for entry in results[:limit]
+            ]
+
+
+_index = QuestionBankIndex()
+
+
+def get_question_bank_index() -> QuestionBankIndex:
+    return _index
+
+
+def ingest_question(text: str, question_type: str = 'generale', difficulty: str = 'medium',
+                    role_keywords: Optional[List[str]] = None, source: str = 'generated',
+                    source_question=None) -> Tuple[Optional[QuestionBankEntry], bool]:
+    """
+    Ajoute une question à la bibliothèque, sauf si elle ou un quasi-doublon y figure déjà
+    (le compteur d'occurrences et les mots-clés du doublon sont alors mis à jour).
+
+    Returns:
+        Tuple (entrée, créée)
+    """
+    if not normalize_text(text):
+        return None, False
+    if question_type not in dict(QuestionBankEntry._meta.get_field('question_type').choices):
+        question_type = 'generale'
+    if difficulty not in dict(QuestionBankEntry.DIFFICULTY_CHOICES):
+        difficulty = 'medium'
+    role_keywords = list(role_keywords or [])
+
+    index = get_question_bank_index()
+    index.ensure_loaded()
+
+    text_hash = content_hash(text)
+    signature = minhash_signature(text)
+
+    existing = QuestionBankEntry.objects.filter(content_hash=text_hash).first()
+    if existing is None:
+        duplicate_id = index.find_duplicate(signature)
+        if duplicate_id:
+            existing = QuestionBankEntry.objects.filter(id=duplicate_id).first()
+
+    if existing is None:
+        try:
+            # Point de sauvegarde: un doublon concurrent n'annule pas la transaction appelante
+            with transaction.atomic():
+                entry = QuestionBankEntry.objects.create(
+                    text=text.strip(),
+                    question_type=question_type,
+                    difficulty=difficulty,
+                    role_keywords=role_keywords,
+                    source=source,
+                    content_hash=text_hash,
+                    minhash_signature=signature,
+                    source_question=source_question,
+                )
+            index.add(entry)
+            return entry, True
+        except IntegrityError:
+            # Insérée entre-temps par une autre requête
+            existing = QuestionBankEntry.objects.get(content_hash=text_hash)
+
+    QuestionBankEntry.objects.filter(id=existing.id).update(usage_count=F('usage_count') + 1)
+    existing.usage_count += 1
+    merged_keywords = list(dict.fromkeys(existing.role_keywords + role_keywords))[:MAX_ROLE_KEYWORDS * 2]
+    if merged_keywords != existing.role_keywords:
+        existing.role_keywords = merged_keywords
+        existing.save(update_fields=['role_keywords', 'updated_at'])
+    index.add(existing)
+    return existing, False
+
+
+def ingest_generated_questions(questions: List[Dict[str, Any]], offer_title: str,
+                               requirements: str = '', difficulty: str = 'medium') -> int:
+    """Ingère une liste de questions générées par l'IA. Renvoie le nombre d'ajouts."""
+    keywords = extract_role_keywords(offer_title, requirements)
+    created_count = 0
+    for question in questions:
+        try:
+            _, created = ingest_question(
+                question.get('question', ''),
+                question_type=question.get('type', 'generale'),
+                difficulty=difficulty,
+                role_keywords=keywords,
+                source='generated'
+            )
+            created_count += int(created)
+        except Exception as e:
+            logger.warning(f"⚠️ Question non ingérée dans la bibliothèque: {e}")
+    return created_count
+
+
+def ingest_saved_questions(questions, job_offer) -> int:
+    """Ingère des InterviewQuestion enregistrées (une fois par texte distinct)."""
+    keywords = extract_role_keywords(job_offer.title, job_offer.prerequisites or '')
+    created_count = 0
+    seen_hashes = set()
+    for question in questions:
+        text_hash = content_hash(question.text)
+        if text_hash in seen_hashes:
+            continue
+        seen_hashes.add(text_hash)
+        try:
+            _, created = ingest_question(
+                question.text,
+                question_type=question.question_type,
+                role_keywords=keywords,
+                source='saved',
+                source_question=question
+            )
+            created_count += int(created)
+        except Exception as e:
+            logger.warning(f"Question {question.pk} non ajoutée à la bibliothèque: {e}")
+    return created_count
@@ -0,0 +1,136 @@
+"""
+Cache des questions générées par l'IA, par empreinte d'offre d'emploi.
+
+L'empreinte est un hash SHA-256 des paramètres normalisés (titre, description,
+prérequis, difficulté, nombre de questions par type). Plusieurs variantes
+peuvent être conservées pour une même empreinte : une « régénération » sert
+d'abord les variantes que le recruteur n'a pas encore vues, avant de
+rappeler le LLM.
+"""
+
+import re
+import json
+import hashlib
+import logging
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'ai_questions'
+DEFAULT_CACHE_TTL = 7 * 24 * 3600  # 7 jours
+DEFAULT_MAX_VARIANTS = 5
+
+
+def _normalize(value: Any) -> str:
+    """Minuscules, sans accents, espaces et ponctuation réduits."""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(sorted(_normalize(item) for item in value))
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    text = re.sub(r'[^\w\s,+#]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def question_fingerprint(offer_title: str, offer_description: str, requirements: Any,
+                         difficulty: str, number_of_questions: int,
+                         behavioral_count: Optional[int] = None,
+                         technical_count: Optional[int] = None) -> str:
+    """
+    Empreinte stable des paramètres de génération.
+
+    Deux offres ne différant que par la casse, les accents ou les espaces
+    partagent la même empreinte.
+    """
+    payload = {
+        'title': _normalize(offer_title),
+        'description': _normalize(offer_description),
+        'requirements': _normalize(requirements),
+        'difficulty': _normalize(difficulty),
+        'count': int(number_of_questions or 0),
+        'behavioral': behavioral_count,
+        'technical': technical_count,
+    }
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=True)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+class QuestionGenerationCache:
+    """
+    Variantes de questions en cache (cache Django) pour une empreinte donnée,
+    et suivi des variantes déjà montrées à chaque utilisateur.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_variants: Optional[int] = None):
+        self.ttl = ttl or getattr(settings, 'AI_QUESTION_CACHE_TTL', DEFAULT_CACHE_TTL)
+        self.max_variants = max_variants or getattr(settings, 'AI_QUESTION_CACHE_MAX_VARIANTS', DEFAULT_MAX_VARIANTS)
+
+    @staticmethod
+    def _variants_key(fingerprint: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:{fingerprint}:variants"
+
+    @staticmethod
+    def _shown_key(fingerprint: str, user_id: Any) -> str:
+        return f"{CACHE_KEY_PREFIX}:{fingerprint}:shown:{user_id}"
+
+    @staticmethod
+    def _variant_id(questions: List[Dict[str, Any]]) -> str:
+        texts = '\n'.join(_normalize(q.get('question', '')) for q in questions)
+        return hashlib.sha256(texts.encode('utf-8')).hexdigest()[:16]
+
+    def get_variants(self, fingerprint: str) -> List[Dict[str, Any]]:
+        """Variantes en cache, de la plus ancienne à la plus récente."""
+        return cache.get(self._variants_key(fingerprint)) or []
+
+    def get_shown(self, fingerprint: str, user_id: Any) -> List[str]:
+        return cache.get(self._shown_key(fingerprint, user_id)) or []
+
+    def get(self, fingerprint: str, user_id: Any, unseen_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Renvoie une variante en cache.
+
+        Args:
+            fingerprint: Empreinte des paramètres de génération
+            user_id: Utilisateur (suivi des variantes déjà vues)
+            unseen_only: Mode « régénérer » : ignorer les variantes déjà vues
+
+        Returns:
+            {'id': ..., 'questions': [...], 'ai_provider': ...} ou None si rien d'utilisable
+        """
+        variants = self.get_variants(fingerprint)
+        if not variants:
+            return None
+        if not unseen_only:
+            # Dernière variante montrée à cet utilisateur, sinon la plus récente
+            shown = self.get_shown(fingerprint, user_id)
+            for variant in reversed(variants):
+                if shown and variant['id'] == shown[-1]:
+                    return variant
+            return variants[-1]
+
+        shown = set(self.get_shown(fingerprint, user_id))
+        for variant in variants:
+            if variant['id'] not in shown:
+                return variant
+        return None
+
+    def store(self, fingerprint: str, questions: List[Dict[str, Any]],
+              ai_provider: Optional[str] = None) -> Dict[str, Any]:
+        """Ajoute une variante (les plus anciennes sont évincées au-delà de max_variants)."""
+        variant = {'id': self._variant_id(questions), 'questions': questions, 'ai_provider': ai_provider}
+        variants = [v for v in self.get_variants(fingerprint) if v['id'] != variant['id']]
+        variants.append(variant)
+        cache.set(self._variants_key(fingerprint), variants[-self.max_variants:], self.ttl)
+        logger.info(f"💾 Variante {variant['id']} mise en cache ({len(variants)} pour {fingerprint[:12]})")
+        return variant
+
+    def mark_shown(self, fingerprint: str, user_id: Any, variant_id: str):
+        """Mémorise qu'une variante a été montrée (la plus récente en dernier)."""
+        shown = [v for v in self.get_shown(fingerprint, user_id) if v != variant_id]
+        shown.append(variant_id)
+        cache.set(self._shown_key(fingerprint, user_id), shown, self.ttl)
@@ -0,0 +1,154 @@
+"""
+Pré-génération des questions IA en arrière-plan.
+
+À la création (ou modification) d'une offre d'emploi, les questions sont
+générées avec les paramètres par défaut du constructeur de campagne et
+déposées dans le cache des questions : le premier clic « Générer » du
+recruteur est alors servi instantanément.
+
+Un budget quotidien par recruteur borne le nombre d'appels au LLM ; une
+offre dont l'empreinte est déjà en cache ou en cours de génération n'en
+consomme pas.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+from ..ai_service import AIInterviewQuestionGenerator
+from .question_bank import ingest_generated_questions
+from .question_cache import QuestionGenerationCache, question_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Paramètres par défaut du constructeur de campagne (CreateOfferWithCampaign)
+DEFAULT_PREGENERATION_PARAMS = {
+    'question_count': 5,
+    'difficulty_level': 'medium',
+    'behavioral_count': 2,
+    'technical_count': 3,
+}
+DEFAULT_DAILY_BUDGET = 20
+# Verrou « génération en cours » pour une empreinte (s)
+IN_FLIGHT_TIMEOUT = 5 * 60
+
+BUDGET_KEY_PREFIX = 'ai_pregeneration_budget'
+IN_FLIGHT_KEY_PREFIX = 'ai_pregeneration_inflight'
+
+# Pool dédié: ne pas occuper les workers de la génération interactive
+_pregeneration_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='question-pregen')
+
+
+def offer_generation_params(job_offer) -> Dict[str, Any]:
+    """
+    Paramètres de génération tels que le constructeur de campagne les envoie
+    pour cette offre (même empreinte de cache que le premier clic).
+    """
+    skills = [s.strip() for s in (job_offer.prerequisites or '').split(',') if s.strip()]
+    return {
+        'job_title': (job_offer.title or '').strip(),
+        'job_description': (job_offer.description or '').strip(),
+        'requirements': ', '.join(skills),
+        **DEFAULT_PREGENERATION_PARAMS,
+    }
+
+
+def _fingerprint(params: Dict[str, Any]) -> str:
+    return question_fingerprint(
+        params['job_title'], params['job_description'], params['requirements'],
+        params['difficulty_level'], params['question_count'],
+        params['behavioral_count'], params['technical_count']
+    )
+
+
+def _budget_key(recruiter_id: Any) -> str:
+    return f"{BUDGET_KEY_PREFIX}:{recruiter_id}:{date.today().isoformat()}"
+
+
+def consume_budget(recruiter_id: Any) -> bool:
+    """Réserve une pré-génération sur le budget du jour ; False si épuisé."""
+    budget = getattr(settings, 'AI_QUESTION_PREGENERATION_DAILY_BUDGET', DEFAULT_DAILY_BUDGET)
+    if budget <= 0:
+        return False
+    key = _budget_key(recruiter_id)
+    cache.add(key, 0, 24 * 3600)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        # Clé expirée entre add() et incr()
+        cache.set(key, 1, 24 * 3600)
+        used = 1
+    return used <= budget
+
+
+def remaining_budget(recruiter_id: Any) -> int:
+    budget = getattr(settings, 'AI_QUESTION_PREGENERATION_DAILY_BUDGET', DEFAULT_DAILY_BUDGET)
+    return max(0, budget - (cache.get(_budget_key(recruiter_id)) or 0))
+
+
+def schedule_question_pregeneration(job_offer) -> Optional[str]:
+    """
+    Planifie la pré-génération des questions d'une offre après le commit.
+
+    Returns:
+        L'empreinte planifiée, ou None si rien n'a été planifié
+        (désactivé, déjà en cache, déjà en cours, budget épuisé)
+    """
+    if not getattr(settings, 'AI_QUESTION_PREGENERATION_ENABLED', True):
+        return None
+
+    params = offer_generation_params(job_offer)
+    if not params['job_title'] or not params['job_description']:
+        return None
+
+    fingerprint = _fingerprint(params)
+    if QuestionGenerationCache().get_variants(fingerprint):
+        logger.debug(f"Pré-génération inutile: questions déjà en cache ({fingerprint[:12]})")
+        return None
+
+    in_flight_key = f"{IN_FLIGHT_KEY_PREFIX}:{fingerprint}"
+    if not cache.add(in_flight_key, job_offer.id, IN_FLIGHT_TIMEOUT):
+        return None
+
+    if not consume_budget(job_offer.recruiter_id):
+        cache.delete(in_flight_key)
+        logger.info(f"⏸️ Budget de pré-génération épuisé pour le recruteur {job_offer.recruiter_id}")
+        return None
+
+    transaction.on_commit(
+        lambda: _pregeneration_executor.submit(_pregenerate, job_offer.id, params, fingerprint)
+    )
+    logger.info(f"🕒 Pré-génération planifiée pour l'offre {job_offer.id} ({fingerprint[:12]})")
+    return fingerprint
+
+
+def _pregenerate(job_offer_id: int, params: Dict[str, Any], fingerprint: str):
+    """Génère et met en cache les questions (exécuté dans le pool dédié)."""
+    try:
+        generator = AIInterviewQuestionGenerator()
+        questions = generator.generate_questions(
+            offer_title=params['job_title'],
+            offer_description=params['job_description'],
+            number_of_questions=params['question_count'],
+            difficulty=params['difficulty_level'],
+            requirements=params['requirements'],
+            behavioral_count=params['behavioral_count'],
+            technical_count=params['technical_count']
+        )
+        ingest_generated_questions(questions, params['job_title'], params['requirements'], params['difficulty_level'])
+        # Un résultat partiel n'est pas mis en cache
+        if questions and not generator.last_generation_errors:
+            QuestionGenerationCache().store(fingerprint, questions, generator.last_generation_provider)
+            logger.info(f"✅ {len(questions)} questions pré-générées pour l'offre {job_offer_id}")
+        else:
+            logger.warning(f"⚠️ Pré-génération partielle pour l'offre {job_offer_id}: {generator.last_generation_errors}")
+    except Exception as e:
+        logger.error(f"❌ Échec de la pré-génération pour l'offre {job_offer_id}: {e}")
+    finally:
+        cache.delete(f"{IN_FLIGHT_KEY_PREFIX}:{fingerprint}")
+        close_old_connections()
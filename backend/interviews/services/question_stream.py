@@ -0,0 +1,93 @@
+"""
+Analyse incrémentale d'une liste JSON reçue fragment par fragment.
+
+Le LLM renvoie une liste d'objets `[{...}, {...}]` sous forme de flux de
+tokens. Le parseur extrait chaque objet dès que son accolade fermante
+arrive, sans attendre la fin de la liste, pour l'envoyer immédiatement
+au navigateur.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONArrayParser:
+    """
+    Extrait les objets de premier niveau d'une liste JSON incomplète.
+
+    Tout texte précédant le '[' (ex: balise ```json) est ignoré. Les
+    accolades et crochets présents dans les chaînes ne sont pas comptés.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._array_started = False
+        self._array_closed = False
+
+    @property
+    def finished(self) -> bool:
+        """La liste a été fermée par son ']'."""
+        return self._array_closed
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Ajoute un fragment et renvoie les objets complétés par ce fragment.
+
+        Args:
+            chunk: Fragment de texte reçu du modèle
+
+        Returns:
+            Liste (éventuellement vide) des nouveaux objets complets
+        """
+        completed = []
+        for char in chunk:
+            if self._array_closed:
+                break
+
+            if not self._array_started:
+                if char == '[':
+                    self._array_started = True
+                    self._depth = 1
+                continue
+
+            if self._depth > 1:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 1:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    completed.extend(self._flush())
+                elif self._depth == 0:
+                    self._array_closed = True
+        return completed
+
+    def _flush(self) -> List[Dict[str, Any]]:
+        raw = ''.join(self._buffer)
+        self._buffer = []
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Objet JSON ignoré dans le flux: {e} ({raw[:80]})")
+            return []
+        return [item] if isinstance(item, dict) else []
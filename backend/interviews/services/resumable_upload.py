@@ -0,0 +1,264 @@
+"""
+Upload reprenable des réponses vidéo (protocole inspiré de tus 1.0).
+
+1. Création d'une session (taille totale, token candidat, question)
+2. Envoi des fragments avec leur offset (PATCH), écrits dans un fichier
+   de transit local ; un fragment interrompu est simplement renvoyé à
+   partir du dernier offset connu (HEAD)
+3. Une fois le fichier complet, envoi au stockage vidéo (Cloudinary :
+   par morceaux avec `upload_large`) et enregistrement sur InterviewAnswer
+
+Une session restée 'uploading' au-delà de VIDEO_UPLOAD_FINALIZE_TIMEOUT
+(worker arrêté pendant l'envoi) peut être reprise par une relance (POST).
+Les sessions abandonnées et leurs fichiers sont supprimés par la commande
+`cleanup_upload_sessions`.
+"""
+
+import os
+import logging
+from datetime import timedelta
+from typing import BinaryIO, Dict, Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import VideoUploadSession
+from .video_storage import get_video_storage
+from .video_thumbnails import schedule_answer_thumbnails
+from .video_uploads import (
+    VideoUploadError, VIDEO_FOLDER, get_upload_target, build_public_id, save_answer_video
+)
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = '1.0.0'
+READ_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_SIZE = 500 * 1024 * 1024
+DEFAULT_SESSION_TTL_HOURS = 24
+# Au-delà, un envoi 'uploading' est considéré comme interrompu (s)
+DEFAULT_FINALIZE_TIMEOUT = 15 * 60
+
+
+def get_staging_dir() -> str:
+    staging_dir = getattr(settings, 'VIDEO_UPLOAD_STAGING_DIR', None) or os.path.join(settings.BASE_DIR, 'upload_staging')
+    os.makedirs(staging_dir, exist_ok=True)
+    return staging_dir
+
+
+def staging_path(session: VideoUploadSession) -> str:
+    """Fichier de transit d'une session."""
+    return os.path.join(get_staging_dir(), f"{session.id}.part")
+
+
+def create_session(candidate_token: str, question_id: Any, upload_length: Any) -> VideoUploadSession:
+    """Ouvre une session d'upload pour la question, liée au token candidat."""
+    link, question, candidate = get_upload_target(candidate_token, question_id)
+    try:
+        upload_length = int(upload_length)
+    except (TypeError, ValueError):
+        raise VideoUploadError("Upload-Length invalide.", 400)
+    max_size = getattr(settings, 'VIDEO_UPLOAD_MAX_SIZE', DEFAULT_MAX_SIZE)
+    if upload_length <= 0:
+        raise VideoUploadError("Upload-Length invalide.", 400)
+    if upload_length > max_size:
+        raise VideoUploadError(f"Vidéo trop volumineuse (maximum {max_size} octets).", 413)
+
+    session = VideoUploadSession.objects.create(
+        link=link, question=question, candidate=candidate, upload_length=upload_length
+    )
+    # Fichier vide: l'offset 0 correspond à sa taille
+    open(staging_path(session), 'wb').close()
+    logger.info(f"📤 Session d'upload {session.id} créée ({upload_length} octets, question {question.id})")
+    return session
+
+
+def get_session(session_id: Any, candidate_token: str) -> VideoUploadSession:
+    """Session appartenant au token candidat, sinon VideoUploadError 404."""
+    session = (
+        VideoUploadSession.objects.select_related('link', 'question', 'candidate')
+        .filter(id=session_id, link__token=candidate_token or '').first()
+        if session_id else None
+    )
+    if session is None:
+        raise VideoUploadError("Session d'upload introuvable.", 404)
+    if session.link.revoked or session.link.is_expired:
+        raise VideoUploadError("Token candidat invalide ou expiré.", 403)
+    return session
+
+
+def append_chunk(session_id: Any, candidate_token: str, offset: Any, stream: BinaryIO) -> VideoUploadSession:
+    """
+    Écrit un fragment à la suite du fichier de transit.
+
+    Args:
+        offset: Offset annoncé par le client (doit être l'offset courant)
+        stream: Corps de la requête, lu par blocs
+
+    Raises:
+        VideoUploadError 409 si l'offset ne correspond pas à l'état du serveur
+    """
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise VideoUploadError("Upload-Offset invalide.", 400)
+
+    with transaction.atomic():
+        # Verrou de la ligne: deux PATCH concurrents ne peuvent pas écrire au même offset
+        session = get_session(session_id, candidate_token)
+        session = VideoUploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != 'active':
+            # Renvoi du dernier fragment pendant ou après l'envoi: état courant, rien n'est écrit
+            if session.is_complete and offset == session.offset:
+                return session
+            raise VideoUploadError("Cette session d'upload n'accepte plus de données.", 409)
+        if offset != session.offset:
+            raise VideoUploadError(f"Offset attendu: {session.offset}.", 409)
+
+        path = staging_path(session)
+        written = 0
+        remaining = session.upload_length - session.offset
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as staged:
+            staged.seek(session.offset)
+            while remaining > 0:
+                data = stream.read(min(READ_CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                staged.write(data)
+                written += len(data)
+                remaining -= len(data)
+            staged.truncate()
+
+        session.offset += written
+        session.save(update_fields=['offset', 'updated_at'])
+    return session
+
+
+def finalize_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'VIDEO_UPLOAD_FINALIZE_TIMEOUT', DEFAULT_FINALIZE_TIMEOUT))
+
+
+def is_stalled(session: VideoUploadSession) -> bool:
+    """Envoi vers le stockage commencé mais jamais terminé (worker arrêté, timeout)."""
+    return session.status == 'uploading' and session.updated_at < timezone.now() - finalize_timeout()
+
+
+def finalize_session(session: VideoUploadSession) -> VideoUploadSession:
+    """
+    Envoie le fichier complet au stockage vidéo et enregistre la réponse.
+    Le fichier de transit est supprimé en cas de succès.
+
+    Une session 'uploading' bloquée depuis plus de finalize_timeout() est reprise.
+    """
+    now = timezone.now()
+    updated = VideoUploadSession.objects.filter(
+        Q(status='active') | Q(status='uploading', updated_at__lt=now - finalize_timeout()),
+        pk=session.pk
+    ).update(status='uploading', updated_at=now)
+    if not updated:
+        session.refresh_from_db()
+        return session
+    session.status = 'uploading'
+
+    path = staging_path(session)
+    try:
+        result = get_video_storage().put(path, build_public_id(session.question_id, session.link.token), VIDEO_FOLDER)
+        session.answer = save_answer_video(session.question, session.candidate, result, file_size=session.upload_length)
+        session.status = 'completed'
+        session.error_message = None
+        # Le fichier de transit est supprimé une fois les vignettes générées
+        schedule_answer_thumbnails(session.answer.id, path, cleanup=True)
+        logger.info(f"✅ Upload reprenable {session.id} terminé: {result.get('public_id')}")
+    except Exception as e:
+        # Le fichier est conservé: la finalisation peut être relancée
+        session.status = 'failed'
+        session.error_message = str(e)
+        logger.error(f"❌ Envoi de la session {session.id} vers le stockage échoué: {e}")
+    session.save(update_fields=['status', 'error_message', 'answer', 'updated_at'])
+    return session
+
+
+def retry_session(session_id: Any, candidate_token: str) -> VideoUploadSession:
+    """
+    Relance l'envoi d'une session complète dont la finalisation a échoué
+    ou s'est interrompue (session 'uploading' bloquée).
+    """
+    session = get_session(session_id, candidate_token)
+    if not session.is_complete or not os.path.exists(staging_path(session)):
+        return session
+    if session.status == 'failed':
+        VideoUploadSession.objects.filter(pk=session.pk, status='failed').update(status='active')
+        session.status = 'active'
+        return finalize_session(session)
+    if is_stalled(session):
+        logger.warning(f"⚠️ Reprise de la session {session.id} bloquée en envoi depuis {session.updated_at}")
+        return finalize_session(session)
+    return session
+
+
+def terminate_session(session_id: Any, candidate_token: str):
+    """Abandon explicite par le client (DELETE)."""
+    session = get_session(session_id, candidate_token)
+    _remove_file(staging_path(session))
+    session.delete()
+
+
+def session_headers(session: VideoUploadSession) -> Dict[str, str]:
+    return {
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Offset': str(session.offset),
+        'Upload-Length': str(session.upload_length),
+        'Cache-Control': 'no-store',
+    }
+
+
+def cleanup_sessions(ttl_hours: int = None, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Supprime les sessions inactives depuis `ttl_hours` (hors sessions terminées)
+    et les fichiers de transit orphelins.
+    """
+    ttl_hours = ttl_hours or getattr(settings, 'VIDEO_UPLOAD_SESSION_TTL_HOURS', DEFAULT_SESSION_TTL_HOURS)
+    cutoff = timezone.now() - timedelta(hours=ttl_hours)
+    stats = {'sessions': 0, 'files': 0, 'bytes': 0}
+
+    stale = VideoUploadSession.objects.filter(updated_at__lt=cutoff).exclude(status='completed')
+    for session in stale:
+        path = staging_path(session)
+        if os.path.exists(path):
+            stats['files'] += 1
+            stats['bytes'] += _file_size(path)
+        stats['sessions'] += 1
+        if not dry_run:
+            _remove_file(path)
+            session.delete()
+
+    # Fichiers sans session (session supprimée, crash pendant la création...)
+    staging_dir = get_staging_dir()
+    known_ids = {str(session_id) for session_id in VideoUploadSession.objects.values_list('id', flat=True)}
+    for name in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, name)
+        if not name.endswith('.part') or name[:-len('.part')] in known_ids:
+            continue
+        if timezone.now().timestamp() - os.path.getmtime(path) < ttl_hours * 3600:
+            continue
+        stats['files'] += 1
+        stats['bytes'] += _file_size(path)
+        if not dry_run:
+            _remove_file(path)
+    return stats
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
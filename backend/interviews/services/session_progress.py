@@ -0,0 +1,167 @@
+"""
+Avancement d'une session d'entretien (reprise après un crash du navigateur).
+
+Une ligne InterviewSessionProgress par lien de campagne. L'enregistrement
+est recalculé à chaque lecture à partir des réponses stockées (une requête)
+et des uploads reprenables en cours ; le navigateur y ajoute la question
+affichée et les états qu'il est seul à connaître (enregistrement, envoi).
+La page d'entretien reprend ainsi à la première question non terminée, sans
+renvoyer les vidéos déjà reçues.
+"""
+
+import logging
+from typing import Dict, Any, Optional
+
+from django.db import transaction
+
+from ..models import CampaignLink, InterviewAnswer, InterviewQuestion, InterviewSessionProgress, VideoUploadSession
+from .video_uploads import VideoUploadError, get_link_candidate
+
+logger = logging.getLogger(__name__)
+
+# États déduits des réponses en base (prioritaires)
+SERVER_STATES = ('completed', 'processing', 'failed')
+# États que seul le navigateur connaît
+CLIENT_STATES = ('recording', 'uploading')
+
+
+def get_resumable_link(candidate_token: Optional[str]) -> CampaignLink:
+    """
+    Lien d'une session qu'on peut reprendre.
+
+    Contrairement à `is_valid`, des réponses déjà enregistrées ne bloquent
+    pas le lien : c'est précisément le cas d'une reprise.
+    """
+    link = CampaignLink.objects.select_related('candidate', 'campaign').filter(token=candidate_token).first()
+    if link is None:
+        raise VideoUploadError("Token invalide.", 404)
+    if link.revoked or link.is_expired:
+        raise VideoUploadError("Lien invalide ou expiré.", 403)
+    if link.status in ('completed', 'abandoned'):
+        raise VideoUploadError("Cet entretien est déjà terminé.", 409)
+    return link
+
+
+def refresh_session_progress(link: CampaignLink) -> InterviewSessionProgress:
+    """Recalcule l'avancement à partir des réponses stockées et l'enregistre si besoin."""
+    progress, _ = InterviewSessionProgress.objects.get_or_create(link=link)
+    candidate = get_link_candidate(link)
+
+    server_states = {}
+    if candidate is not None:
+        server_states = {
+            str(question_id): answer_status
+            for question_id, answer_status in InterviewAnswer.objects.filter(
+                question__campaign_id=link.campaign_id, candidate=candidate
+            ).values_list('question_id', 'status')
+            if answer_status in SERVER_STATES
+        }
+    uploading = {
+        str(question_id)
+        for question_id in VideoUploadSession.objects.filter(
+            link=link, status__in=['active', 'uploading']
+        ).values_list('question_id', flat=True)
+    }
+
+    # Un état navigateur n'est conservé que tant que le serveur n'en sait pas plus
+    upload_states = {
+        question_id: state for question_id, state in progress.upload_states.items()
+        if state in CLIENT_STATES
+    }
+    upload_states.update({question_id: 'uploading' for question_id in uploading})
+    upload_states.update(server_states)
+    completed = sorted(int(question_id) for question_id, state in upload_states.items() if state == 'completed')
+
+    if upload_states != progress.upload_states or completed != progress.completed_question_ids:
+        progress.upload_states = upload_states
+        progress.completed_question_ids = completed
+        progress.save(update_fields=['upload_states', 'completed_question_ids', 'updated_at'])
+    return progress
+
+
+def update_session_progress(link: CampaignLink, current_question_id: Any = None,
+                            upload_states: Optional[Dict[str, str]] = None) -> InterviewSessionProgress:
+    """
+    Enregistre la question affichée et les états signalés par le navigateur.
+
+    Raises:
+        VideoUploadError: question hors campagne ou état inconnu
+    """
+    upload_states = upload_states or {}
+    if not isinstance(upload_states, dict):
+        raise VideoUploadError("'upload_states' doit être un objet {question_id: état}.", 400)
+    invalid_states = {state for state in upload_states.values() if state not in CLIENT_STATES}
+    if invalid_states:
+        raise VideoUploadError(f"États inconnus: {', '.join(map(str, invalid_states))}", 400)
+
+    question_ids = set(upload_states)
+    if current_question_id is not None:
+        question_ids.add(current_question_id)
+    try:
+        question_ids = {int(question_id) for question_id in question_ids}
+    except (TypeError, ValueError):
+        raise VideoUploadError("Identifiant de question invalide.", 400)
+    known = set(
+        InterviewQuestion.objects.filter(campaign_id=link.campaign_id, pk__in=question_ids)
+        .values_list('id', flat=True)
+    )
+    if question_ids - known:
+        raise VideoUploadError("Question introuvable pour cette campagne.", 404)
+
+    with transaction.atomic():
+        progress, _ = InterviewSessionProgress.objects.select_for_update().get_or_create(link=link)
+        if current_question_id is not None:
+            progress.current_question_id = int(current_question_id)
+        for question_id, state in upload_states.items():
+            # Une réponse déjà reçue par le serveur ne repasse pas à un état navigateur
+            if progress.upload_states.get(str(int(question_id))) not in SERVER_STATES:
+                progress.upload_states[str(int(question_id))] = state
+        progress.save()
+    return refresh_session_progress(link)
+
+
+def serialize_progress(progress: InterviewSessionProgress) -> Dict[str, Any]:
+    return {
+        "completed_question_ids": progress.completed_question_ids,
+        "upload_states": progress.upload_states,
+        "current_question_id": progress.current_question_id,
+        "updated_at": progress.updated_at,
+    }
+
+
+def build_resume_payload(link: CampaignLink) -> Dict[str, Any]:
+    """
+    Données de reprise : avancement, question où reprendre, uploads
+    reprenables en cours (offset déjà reçu).
+    """
+    progress = refresh_session_progress(link)
+    questions = list(
+        InterviewQuestion.objects.filter(campaign_id=link.campaign_id)
+        .order_by('order', 'id').values('id', 'order', 'time_limit')
+    )
+    completed = set(progress.completed_question_ids)
+    remaining = [question['id'] for question in questions if question['id'] not in completed]
+
+    # Reprendre à la question affichée si elle n'est pas terminée, sinon à la première restante
+    resume_question_id = progress.current_question_id if progress.current_question_id in remaining else None
+    if resume_question_id is None and remaining:
+        resume_question_id = remaining[0]
+
+    upload_sessions = {
+        str(session.question_id): {
+            "session_id": str(session.id),
+            "offset": session.offset,
+            "upload_length": session.upload_length,
+        }
+        for session in VideoUploadSession.objects.filter(link=link, status='active').order_by('created_at')
+    }
+    return {
+        "token": link.token,
+        "status": link.status,
+        "total_questions": len(questions),
+        "remaining_question_ids": remaining,
+        "resume_question_id": resume_question_id,
+        "finished": not remaining,
+        "upload_sessions": upload_sessions,
+        **serialize_progress(progress),
+    }
@@ -0,0 +1,121 @@
+"""
+Suppression différée des vidéos du stockage (outbox).
+
+Quand une réponse est supprimée (réinitialisation d'entretien, suppression
+de campagne...) ou que sa vidéo est remplacée, le public_id est inscrit dans
+VideoDeletionOutbox dans la même transaction. Un worker vide ensuite l'outbox
+par lots de 100 (`delete_resources` Cloudinary) ; un lot en échec est
+reprogrammé avec un délai croissant. La commande `drain_video_deletions`
+permet de relancer le traitement depuis un cron.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ..models import InterviewAnswer, VideoDeletionOutbox
+from .video_storage import get_video_storage
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100  # maximum de delete_resources
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=6)
+DRAIN_LOCK_KEY = 'video_deletion_drain'
+DRAIN_LOCK_TIMEOUT = 10 * 60
+
+_deletion_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='video-deletion')
+
+
+def enqueue_video_deletions(public_ids: Iterable[str]):
+    """Inscrit des vidéos à supprimer ; le worker démarre après le commit."""
+    public_ids = {public_id for public_id in public_ids if public_id}
+    if not public_ids:
+        return
+    VideoDeletionOutbox.objects.bulk_create(
+        [VideoDeletionOutbox(public_id=public_id) for public_id in public_ids],
+        ignore_conflicts=True
+    )
+    transaction.on_commit(schedule_deletion_drain)
+
+
+def schedule_deletion_drain():
+    """Lance le worker s'il ne tourne pas déjà."""
+    if cache.add(DRAIN_LOCK_KEY, True, DRAIN_LOCK_TIMEOUT):
+        _deletion_executor.submit(_drain_in_background)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+def drain_deletion_outbox(batch_size: int = BATCH_SIZE, limit: int = None) -> Dict[str, int]:
+    """
+    Supprime du stockage les vidéos dues de l'outbox, par lots.
+
+    Une vidéo de nouveau référencée par une réponse est retirée de l'outbox
+    sans être supprimée.
+    """
+    storage = get_video_storage()
+    stats = {'deleted': 0, 'skipped': 0, 'failed': 0}
+    processed = 0
+
+    while limit is None or processed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        entries = list(VideoDeletionOutbox.objects.filter(next_attempt_at__lte=timezone.now())[:size])
+        if not entries:
+            break
+        processed += len(entries)
+
+        public_ids = [entry.public_id for entry in entries]
+        still_used = set(
+            InterviewAnswer.objects.filter(cloudinary_public_id__in=public_ids)
+            .values_list('cloudinary_public_id', flat=True)
+        )
+        if still_used:
+            VideoDeletionOutbox.objects.filter(public_id__in=still_used).delete()
+            stats['skipped'] += len(still_used)
+            entries = [entry for entry in entries if entry.public_id not in still_used]
+            if not entries:
+                continue
+
+        try:
+            done = storage.delete_many([entry.public_id for entry in entries])
+            error = None if done is not None else "Le stockage n'a pas répondu"
+        except Exception as e:
+            done, error = None, str(e)
+        done = set(done or [])
+
+        VideoDeletionOutbox.objects.filter(public_id__in=done).delete()
+        stats['deleted'] += len(done)
+
+        now = timezone.now()
+        failed = [entry for entry in entries if entry.public_id not in done]
+        for entry in failed:
+            entry.attempts += 1
+            entry.last_error = error or "Suppression refusée par le stockage"
+            entry.next_attempt_at = now + retry_delay(entry.attempts)
+        VideoDeletionOutbox.objects.bulk_update(failed, ['attempts', 'last_error', 'next_attempt_at'])
+        stats['failed'] += len(failed)
+
+    if processed:
+        logger.info(
+            f"🗑️ Outbox vidéo: {stats['deleted']} supprimée(s), {stats['skipped']} encore utilisée(s), "
+            f"{stats['failed']} reprogrammée(s)"
+        )
+    return stats
+
+
+def _drain_in_background():
+    try:
+        drain_deletion_outbox()
+    except Exception as e:
+        logger.error(f"❌ Traitement de l'outbox vidéo échoué: {e}")
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
+        close_old_connections()
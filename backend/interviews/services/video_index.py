@@ -0,0 +1,242 @@
+"""
+Index local de l'existence des vidéos (InterviewAnswer.storage_verified_at,
+file_size, duration, video_format).
+
+Les vues recruteur lisent cet index au lieu d'appeler l'Admin API Cloudinary
+pour chaque réponse. La vérification est rafraîchie par lots de public_id
+(`resources_by_ids`, 100 par appel) :
+- en arrière-plan, pour les réponses périmées affichées par une vue
+- via la commande `refresh_video_index` (cron)
+
+`reconcile_storage` (commande `reconcile_video_storage`) compare l'ensemble
+du dossier vidéo avec la base : réponses dont la vidéo a disparu, vidéos
+orphelines sans réponse.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Any, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import InterviewAnswer
+from .video_storage import get_video_storage
+from .video_uploads import VIDEO_FOLDER
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_TTL_HOURS = 24
+BATCH_SIZE = 100  # maximum de resources_by_ids
+# Verrou « vérification en cours » d'une réponse (s)
+IN_FLIGHT_TIMEOUT = 5 * 60
+IN_FLIGHT_KEY_PREFIX = 'video_index_inflight'
+
+# Champs d'une réponse dont la vidéo n'existe plus
+MISSING_VIDEO_FIELDS = {
+    'cloudinary_public_id': None,
+    'cloudinary_url': None,
+    'cloudinary_secure_url': None,
+    'hls_url': None,
+    'preview_url': None,
+    'poster_url': None,
+    'thumbnail_url': None,
+    'sprite_url': None,
+    'status': 'deleted',
+}
+UPDATE_CHUNK_SIZE = 500
+
+_index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='video-index')
+
+
+def stale_answers(queryset=None, ttl_hours: int = None):
+    """Réponses avec vidéo dont la vérification est absente ou plus ancienne que le TTL."""
+    ttl_hours = ttl_hours if ttl_hours is not None else getattr(settings, 'VIDEO_INDEX_TTL_HOURS', DEFAULT_INDEX_TTL_HOURS)
+    cutoff = timezone.now() - timedelta(hours=ttl_hours)
+    queryset = queryset if queryset is not None else InterviewAnswer.objects.all()
+    return queryset.filter(cloudinary_public_id__isnull=False).filter(
+        Q(storage_verified_at__isnull=True) | Q(storage_verified_at__lt=cutoff)
+    )
+
+
+def clear_missing_video(answer: InterviewAnswer) -> bool:
+    """
+    La vidéo n'existe plus dans le stockage: nettoyer l'enregistrement.
+
+    UPDATE conditionné au public_id vérifié : une nouvelle vidéo envoyée
+    entre-temps sur la même réponse n'est pas effacée. Renvoie False dans ce cas.
+    """
+    now = timezone.now()
+    cleared = InterviewAnswer.objects.filter(
+        pk=answer.pk, cloudinary_public_id=answer.cloudinary_public_id
+    ).update(storage_verified_at=now, **MISSING_VIDEO_FIELDS)
+    if not cleared:
+        logger.info(f"Réponse {answer.id} modifiée pendant la vérification, nettoyage ignoré")
+        return False
+    logger.warning(f"Vidéo supprimée du stockage, nettoyage de l'enregistrement {answer.id}")
+    for field, value in MISSING_VIDEO_FIELDS.items():
+        setattr(answer, field, value)
+    answer.storage_verified_at = now
+    return True
+
+
+def _save_verified(answers: List[InterviewAnswer]) -> int:
+    """
+    Enregistre les métadonnées vérifiées, uniquement pour les réponses dont
+    le public_id n'a pas changé depuis leur lecture (lignes verrouillées).
+    """
+    if not answers:
+        return 0
+    with transaction.atomic():
+        current = dict(
+            InterviewAnswer.objects.select_for_update()
+            .filter(pk__in=[answer.pk for answer in answers])
+            .values_list('id', 'cloudinary_public_id')
+        )
+        unchanged = [answer for answer in answers if current.get(answer.pk) == answer.cloudinary_public_id]
+        InterviewAnswer.objects.bulk_update(unchanged, ['storage_verified_at', 'file_size', 'duration', 'video_format'])
+    return len(unchanged)
+
+
+def refresh_video_index(answers: Iterable[InterviewAnswer], batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Vérifie les vidéos des réponses par lots et met à jour l'index.
+    Un lot dont le stockage ne répond pas est ignoré (rien n'est marqué supprimé).
+    """
+    storage = get_video_storage()
+    answers = [answer for answer in answers if answer.cloudinary_public_id]
+    stats = {'verified': 0, 'missing': 0, 'errors': 0}
+
+    for start in range(0, len(answers), batch_size):
+        batch = answers[start:start + batch_size]
+        found = storage.describe_many([answer.cloudinary_public_id for answer in batch])
+        if found is None:
+            stats['errors'] += len(batch)
+            continue
+
+        now = timezone.now()
+        verified = []
+        for answer in batch:
+            info = found.get(answer.cloudinary_public_id)
+            if info is None:
+                if clear_missing_video(answer):
+                    stats['missing'] += 1
+                continue
+            answer.storage_verified_at = now
+            if info.get('bytes') is not None:
+                answer.file_size = info['bytes']
+            if info.get('duration') is not None:
+                answer.duration = int(float(info['duration']))
+            if info.get('format'):
+                answer.video_format = info['format']
+            verified.append(answer)
+        stats['verified'] += _save_verified(verified)
+
+    logger.info(f"🔎 Index vidéo: {stats['verified']} vérifiée(s), {stats['missing']} absente(s), {stats['errors']} en erreur")
+    return stats
+
+
+def schedule_index_refresh(answers: Iterable[InterviewAnswer]) -> List[int]:
+    """
+    Planifie en arrière-plan la vérification des réponses périmées parmi
+    `answers` (celles déjà en cours de vérification sont ignorées).
+    """
+    ttl_hours = getattr(settings, 'VIDEO_INDEX_TTL_HOURS', DEFAULT_INDEX_TTL_HOURS)
+    cutoff = timezone.now() - timedelta(hours=ttl_hours)
+    answer_ids = [
+        answer.id for answer in answers
+        if answer.cloudinary_public_id
+        and (answer.storage_verified_at is None or answer.storage_verified_at < cutoff)
+        and cache.add(f"{IN_FLIGHT_KEY_PREFIX}:{answer.id}", True, IN_FLIGHT_TIMEOUT)
+    ]
+    if answer_ids:
+        _index_executor.submit(_refresh_in_background, answer_ids)
+    return answer_ids
+
+
+def _refresh_in_background(answer_ids: List[int]):
+    try:
+        refresh_video_index(InterviewAnswer.objects.filter(pk__in=answer_ids))
+    except Exception as e:
+        logger.error(f"❌ Rafraîchissement de l'index vidéo échoué: {e}")
+    finally:
+        cache.delete_many([f"{IN_FLIGHT_KEY_PREFIX}:{answer_id}" for answer_id in answer_ids])
+        close_old_connections()
+
+
+def reconcile_storage(folder: str = VIDEO_FOLDER, dry_run: bool = False, force: bool = False) -> Dict[str, Any]:
+    """
+    Compare les vidéos du dossier (listing complet par curseur) aux réponses
+    en base, avec des ensembles en mémoire, puis applique des UPDATE groupés.
+
+    Seules les réponses non modifiées depuis le début du listing sont
+    comparées, pour ne pas marquer supprimée une vidéo envoyée entre-temps.
+
+    Args:
+        folder: Dossier de stockage des vidéos d'entretien
+        dry_run: Calculer le diff sans rien modifier
+        force: Appliquer même si le stockage ne renvoie aucune vidéo
+
+    Returns:
+        dict avec les compteurs et la liste des public_id orphelins
+    """
+    started_at = timezone.now()
+    stored_ids = set(get_video_storage().list_public_ids(folder))
+
+    answer_ids_by_public_id = dict(
+        InterviewAnswer.objects.filter(
+            cloudinary_public_id__startswith=folder.rstrip('/') + '/',
+            updated_at__lt=started_at
+        ).values_list('cloudinary_public_id', 'id')
+    )
+    known_ids = set(answer_ids_by_public_id)
+    # Vidéos encore référencées par une réponse modifiée pendant le listing
+    recent_ids = set(
+        InterviewAnswer.objects.filter(cloudinary_public_id__in=stored_ids - known_ids)
+        .values_list('cloudinary_public_id', flat=True)
+    ) if stored_ids - known_ids else set()
+
+    missing = known_ids - stored_ids
+    present = known_ids & stored_ids
+    orphans = sorted(stored_ids - known_ids - recent_ids)
+    report = {
+        'stored': len(stored_ids),
+        'answers': len(known_ids),
+        'present': len(present),
+        'missing': len(missing),
+        'orphans': orphans,
+        'applied': False,
+    }
+
+    if not stored_ids and known_ids and not force:
+        # Listing vide: dossier erroné ou compte mal configuré, ne rien supprimer
+        logger.error(f"❌ Réconciliation annulée: aucune vidéo sous '{folder}' pour {len(known_ids)} réponse(s)")
+        return report
+    if dry_run:
+        return report
+
+    # UPDATE conditionnés au public_id comparé : une réponse renvoyée entre
+    # la lecture et l'écriture garde sa nouvelle vidéo (cf. clear_missing_video)
+    missing, present = sorted(missing), sorted(present)
+    for start in range(0, len(missing), UPDATE_CHUNK_SIZE):
+        chunk = missing[start:start + UPDATE_CHUNK_SIZE]
+        InterviewAnswer.objects.filter(
+            pk__in=[answer_ids_by_public_id[public_id] for public_id in chunk],
+            cloudinary_public_id__in=chunk
+        ).update(storage_verified_at=started_at, **MISSING_VIDEO_FIELDS)
+    for start in range(0, len(present), UPDATE_CHUNK_SIZE):
+        chunk = present[start:start + UPDATE_CHUNK_SIZE]
+        InterviewAnswer.objects.filter(
+            pk__in=[answer_ids_by_public_id[public_id] for public_id in chunk],
+            cloudinary_public_id__in=chunk
+        ).update(storage_verified_at=started_at)
+    report['applied'] = True
+    logger.info(
+        f"🔄 Réconciliation '{folder}': {len(present)} présente(s), {len(missing)} absente(s), "
+        f"{len(orphans)} orpheline(s)"
+    )
+    return report
@@ -0,0 +1,339 @@
+"""
+Stockage des vidéos d'entretien derrière une interface commune.
+
+- CloudinaryVideoStorage : comportement historique (CloudinaryVideoService)
+- LocalVideoStorage : fichiers sur le disque, servis par `videos/stream/`
+  avec support des requêtes Range (206) — utile hors ligne, en test,
+  pour les benchmarks ou en déploiement on-prem
+
+Le backend est choisi par `VIDEO_STORAGE_BACKEND` ('cloudinary', 'local'
+ou chemin Python d'une classe). Les identifiants renvoyés par `put` sont
+enregistrés dans les champs cloudinary_* d'InterviewAnswer quel que soit
+le backend.
+"""
+
+import os
+import shutil
+import logging
+import mimetypes
+from typing import BinaryIO, Dict, Any, Iterator, List, Optional, Union
+
+import requests
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from ..cloudinary_service import CloudinaryVideoService
+
+logger = logging.getLogger(__name__)
+
+VideoSource = Union[str, BinaryIO]
+
+STREAM_SIGNING_SALT = 'interviews.video-stream'
+LOCAL_VIDEO_EXTENSIONS = ['.mp4', '.webm', '.mov', '.mkv', '.ogg']
+COPY_BUFFER_SIZE = 1024 * 1024
+# Octets lus pour reconnaître le conteneur d'un fichier sans extension vidéo
+CONTAINER_SNIFF_SIZE = 64
+
+
+def sniff_video_extension(header: bytes) -> Optional[str]:
+    """Extension déduite des premiers octets du fichier (None si inconnu)."""
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        # EBML: le DocType distingue WebM de Matroska
+        return '.mkv' if b'matroska' in header else '.webm'
+    if header[4:8] == b'ftyp':
+        return '.mov' if header[8:12] == b'qt  ' else '.mp4'
+    if header.startswith(b'OggS'):
+        return '.ogg'
+    return None
+
+
+def _read_header(source: 'VideoSource') -> bytes:
+    """Premiers octets d'un chemin ou d'un fichier ouvert (rembobiné ensuite)."""
+    if isinstance(source, str):
+        with open(source, 'rb') as handle:
+            return handle.read(CONTAINER_SNIFF_SIZE)
+    if not (hasattr(source, 'seek') and hasattr(source, 'read')):
+        return b''
+    position = source.tell() if hasattr(source, 'tell') else 0
+    header = source.read(CONTAINER_SNIFF_SIZE) or b''
+    source.seek(position)
+    return header
+
+
+class VideoStorage:
+    """
+    Interface d'un stockage vidéo. Les clés sont des public_id
+    (dossier inclus), ex: 'jobgate/interviews/interview_12_abc_20240101_120000'.
+    """
+    name = ''
+
+    def put(self, source: VideoSource, public_id: str, folder: str) -> Dict[str, Any]:
+        """
+        Enregistre la vidéo (chemin local ou fichier ouvert).
+
+        Returns:
+            dict au format d'un résultat d'upload Cloudinary
+            (public_id, url, secure_url, duration, bytes, format)
+        """
+        raise NotImplementedError
+
+    def open(self, public_id: str) -> BinaryIO:
+        """Flux binaire en lecture de la vidéo (à fermer par l'appelant)."""
+        raise NotImplementedError
+
+    def delete(self, public_id: str) -> bool:
+        raise NotImplementedError
+
+    def delete_many(self, public_ids: List[str]) -> Optional[List[str]]:
+        """
+        Supprime plusieurs vidéos ; renvoie celles qui n'existent plus
+        (supprimées ou déjà absentes), None si le stockage n'a pas répondu.
+        """
+        raise NotImplementedError
+
+    def url(self, public_id: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def exists(self, public_id: str) -> bool:
+        raise NotImplementedError
+
+    def describe_many(self, public_ids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Métadonnées (bytes, duration, format) des vidéos existantes parmi
+        `public_ids` ; une vidéo absente du résultat n'existe plus.
+        None si le stockage n'a pas pu répondre.
+        """
+        raise NotImplementedError
+
+    def list_public_ids(self, folder: str) -> Iterator[str]:
+        """Tous les public_id stockés sous `folder` (erreurs propagées)."""
+        raise NotImplementedError
+
+    def rendition_urls(self, public_id: str) -> Dict[str, Optional[str]]:
+        """URLs des rendus de lecture (hls_url, preview_url, poster_url) s'il y en a."""
+        return {}
+
+
+class CloudinaryVideoStorage(VideoStorage):
+    """Vidéos hébergées sur Cloudinary (transcodées en MP4 h264/aac)."""
+    name = 'cloudinary'
+
+    def put(self, source, public_id, folder):
+        if isinstance(source, str):
+            result = CloudinaryVideoService.upload_large_video(source, public_id=public_id, folder=folder)
+        else:
+            result = CloudinaryVideoService.upload_video(source, public_id=public_id, folder=folder)
+        if not result:
+            raise RuntimeError("Upload Cloudinary impossible (configuration manquante ou erreur d'upload).")
+        return result
+
+    def open(self, public_id):
+        response = requests.get(self.url(public_id), stream=True, timeout=60)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response.raw
+
+    def delete(self, public_id):
+        return CloudinaryVideoService.delete_video(public_id)
+
+    def delete_many(self, public_ids):
+        deleted = CloudinaryVideoService.delete_videos(public_ids)
+        if deleted is None:
+            return None
+        return [public_id for public_id, state in deleted.items() if state in ('deleted', 'not_found')]
+
+    def url(self, public_id):
+        return CloudinaryVideoService.build_video_urls(public_id)['secure_url']
+
+    def exists(self, public_id):
+        return CloudinaryVideoService.get_video_info(public_id) is not None
+
+    def describe_many(self, public_ids):
+        resources = CloudinaryVideoService.get_videos_info(public_ids)
+        if resources is None:
+            return None
+        return {
+            public_id: {
+                'bytes': resource.get('bytes'),
+                'duration': resource.get('duration'),
+                'format': resource.get('format'),
+            }
+            for public_id, resource in resources.items()
+        }
+
+    def list_public_ids(self, folder):
+        for resource in CloudinaryVideoService.iter_video_resources(folder.rstrip('/') + '/'):
+            yield resource['public_id']
+
+    def rendition_urls(self, public_id):
+        return CloudinaryVideoService.build_rendition_urls(public_id)
+
+
+class LocalVideoStorage(VideoStorage):
+    """
+    Vidéos stockées telles quelles sous `VIDEO_STORAGE_LOCAL_ROOT`.
+    Les URLs pointent vers la vue de streaming, avec un jeton signé
+    (même niveau d'accès qu'une URL Cloudinary publique).
+    """
+    name = 'local'
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or getattr(settings, 'VIDEO_STORAGE_LOCAL_ROOT', None) or os.path.join(settings.MEDIA_ROOT, 'videos')
+
+    def path(self, public_id: str) -> Optional[str]:
+        """Chemin du fichier de la vidéo, None si absent."""
+        base = self._base_path(public_id)
+        for extension in LOCAL_VIDEO_EXTENSIONS:
+            if os.path.exists(base + extension):
+                return base + extension
+        return None
+
+    def put(self, source, public_id, folder):
+        full_id = f"{folder}/{public_id}" if folder else public_id
+        extension = os.path.splitext(source if isinstance(source, str) else getattr(source, 'name', '') or '')[1].lower()
+        if extension not in LOCAL_VIDEO_EXTENSIONS:
+            # Fichier en transit (.part, .upload) ou blob sans nom: on lit le conteneur
+            content_type = getattr(source, 'content_type', None) or ''
+            extension = (
+                sniff_video_extension(_read_header(source))
+                or mimetypes.guess_extension(content_type.split(';')[0].strip())
+                or '.webm'
+            )
+            if extension not in LOCAL_VIDEO_EXTENSIONS:
+                extension = '.webm'
+        destination = self._base_path(full_id) + extension
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        if isinstance(source, str):
+            shutil.copyfile(source, destination)
+        else:
+            chunks = source.chunks() if hasattr(source, 'chunks') else iter(lambda: source.read(COPY_BUFFER_SIZE), b'')
+            with open(destination, 'wb') as target:
+                for chunk in chunks:
+                    target.write(chunk)
+
+        url = self.url(full_id)
+        logger.info(f"Vidéo enregistrée localement: {destination}")
+        return {
+            'public_id': full_id,
+            'url': url,
+            'secure_url': url,
+            'duration': None,
+            'bytes': os.path.getsize(destination),
+            'format': extension.lstrip('.'),
+            'resource_type': 'video',
+        }
+
+    def open(self, public_id):
+        path = self.path(public_id)
+        if path is None:
+            raise FileNotFoundError(public_id)
+        return open(path, 'rb')
+
+    def delete(self, public_id):
+        path = self.path(public_id)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+    def delete_many(self, public_ids):
+        for public_id in public_ids:
+            self.delete(public_id)
+        return list(public_ids)
+
+    def url(self, public_id):
+        token = signing.dumps(public_id, salt=STREAM_SIGNING_SALT, compress=True)
+        base_url = getattr(settings, 'VIDEO_STORAGE_BASE_URL', '').rstrip('/')
+        return f"{base_url}{reverse('video-stream', args=[token])}"
+
+    def exists(self, public_id):
+        return self.path(public_id) is not None
+
+    def describe_many(self, public_ids):
+        found = {}
+        for public_id in public_ids:
+            path = self.path(public_id)
+            if path is not None:
+                found[public_id] = {
+                    'bytes': os.path.getsize(path),
+                    'duration': None,
+                    'format': os.path.splitext(path)[1].lstrip('.'),
+                }
+        return found
+
+    def list_public_ids(self, folder):
+        folder_path = self._base_path(folder)
+        for directory, _, files in os.walk(folder_path):
+            for name in files:
+                base, extension = os.path.splitext(name)
+                if extension in LOCAL_VIDEO_EXTENSIONS:
+                    yield os.path.relpath(os.path.join(directory, base), self.root).replace(os.sep, '/')
+
+    def _base_path(self, public_id: str) -> str:
+        base = os.path.normpath(os.path.join(self.root, public_id))
+        if not base.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"public_id invalide: {public_id}")
+        return base
+
+
+def content_type_for(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def public_id_from_stream_token(token: str) -> Optional[str]:
+    """public_id encodé dans le jeton d'une URL de streaming locale."""
+    try:
+        return signing.loads(token, salt=STREAM_SIGNING_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def parse_range_header(header: Optional[str], size: int):
+    """
+    Premier intervalle d'un en-tête Range ('bytes=start-end').
+
+    Returns:
+        (start, end) inclusifs, None si absent ou non géré (réponse complète)
+
+    Raises:
+        ValueError si l'intervalle est hors du fichier (416)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, _, end = header[len('bytes='):].strip().partition('-')
+    try:
+        if start:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        elif end:
+            # Suffixe: les N derniers octets
+            start = max(size - int(end), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError(f"Intervalle hors du fichier ({size} octets)")
+    return start, end
+
+
+BACKENDS = {
+    CloudinaryVideoStorage.name: CloudinaryVideoStorage,
+    LocalVideoStorage.name: LocalVideoStorage,
+}
+
+_storage = None
+
+
+def get_video_storage() -> VideoStorage:
+    """Backend configuré par VIDEO_STORAGE_BACKEND (instancié une fois)."""
+    global _storage
+    backend = getattr(settings, 'VIDEO_STORAGE_BACKEND', 'cloudinary')
+    storage_class = BACKENDS.get(backend) or import_string(backend)
+    if not isinstance(_storage, storage_class):
+        _storage = storage_class()
+    return _storage
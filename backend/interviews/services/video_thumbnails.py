@@ -0,0 +1,185 @@
+"""
+Vignette et planche de prévisualisation (sprite) des réponses vidéo.
+
+Générées une seule fois avec FFmpeg, pendant le pipeline d'upload, à partir
+du fichier local (zone de transit), puis enregistrées dans le stockage de
+fichiers Django. Les URLs et dimensions sont stockées sur InterviewAnswer :
+les grilles de campagne s'affichent sans transformation à la demande.
+
+- Vignette : image 320x180 (format 16:9, bandes si nécessaire)
+- Sprite : SPRITE_FRAMES images 160x90 côte à côte, réparties sur la durée,
+  pour le survol ("hover-scrub") ; l'image i correspond à i * sprite_interval s
+
+Sans FFmpeg (FFMPEG_BINARY introuvable), rien n'est généré.
+"""
+
+import os
+import re
+import shutil
+import logging
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ..models import InterviewAnswer
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 180)
+SPRITE_FRAME_SIZE = (160, 90)
+SPRITE_FRAMES = 10
+# Intervalle entre images du sprite quand la durée est inconnue (WebM de MediaRecorder)
+DEFAULT_SPRITE_INTERVAL = 3.0
+FFMPEG_TIMEOUT = 120
+THUMBNAIL_DIR = 'interview_thumbnails'
+
+_DURATION_PATTERN = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+
+_thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='video-thumbnails')
+
+
+def get_ffmpeg_binary() -> Optional[str]:
+    return shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg') or 'ffmpeg')
+
+
+def _fit_filter(width: int, height: int) -> str:
+    """Redimensionne dans width x height en gardant les proportions (bandes noires)."""
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+    )
+
+
+def probe_duration(ffmpeg: str, path: str) -> Optional[float]:
+    """Durée lue dans l'en-tête du fichier (None si absente, ex: WebM sans index)."""
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-i', path],
+        capture_output=True, text=True, timeout=FFMPEG_TIMEOUT
+    )
+    match = _DURATION_PATTERN.search(result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def generate_thumbnails(path: str, output_dir: str, duration: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Extrait la vignette et le sprite d'une vidéo locale dans `output_dir`.
+
+    Returns:
+        dict: chemins produits et paramètres du sprite
+    """
+    ffmpeg = get_ffmpeg_binary()
+    if ffmpeg is None:
+        raise RuntimeError("FFmpeg introuvable")
+
+    duration = duration or probe_duration(ffmpeg, path)
+    interval = duration / SPRITE_FRAMES if duration else DEFAULT_SPRITE_INTERVAL
+    poster_offset = min(1.0, duration / 2) if duration else 1.0
+
+    thumbnail_path = os.path.join(output_dir, 'thumbnail.jpg')
+    sprite_path = os.path.join(output_dir, 'sprite.jpg')
+    subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-ss', f"{poster_offset:.2f}", '-i', path,
+         '-frames:v', '1', '-vf', _fit_filter(*THUMBNAIL_SIZE), '-q:v', '4', thumbnail_path],
+        check=True, capture_output=True, timeout=FFMPEG_TIMEOUT
+    )
+    subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-i', path,
+         '-vf', f"fps=1/{interval:.3f},{_fit_filter(*SPRITE_FRAME_SIZE)},tile={SPRITE_FRAMES}x1",
+         '-frames:v', '1', '-q:v', '5', sprite_path],
+        check=True, capture_output=True, timeout=FFMPEG_TIMEOUT
+    )
+    return {
+        'thumbnail_path': thumbnail_path,
+        'sprite_path': sprite_path,
+        'sprite_interval': round(interval, 3),
+    }
+
+
+def _store_image(local_path: str, name: str) -> str:
+    """Enregistre l'image sous un nom fixe (remplace la précédente) et renvoie son URL."""
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    with open(local_path, 'rb') as image:
+        name = default_storage.save(name, File(image))
+    # Paramètre de version: l'URL change à chaque nouvelle vidéo (cache navigateur)
+    return f"{default_storage.url(name)}?v={int(timezone.now().timestamp())}"
+
+
+def generate_answer_thumbnails(answer_id: int, source_path: str, cleanup: bool = False) -> bool:
+    """
+    Génère et enregistre la vignette et le sprite d'une réponse.
+
+    Args:
+        source_path: Fichier vidéo local
+        cleanup: Supprimer `source_path` une fois terminé
+    """
+    try:
+        if get_ffmpeg_binary() is None:
+            logger.debug("FFmpeg introuvable, vignettes non générées")
+            return False
+        answer = InterviewAnswer.objects.filter(pk=answer_id).only('id', 'duration').first()
+        if answer is None or not os.path.exists(source_path):
+            return False
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            images = generate_thumbnails(source_path, output_dir, duration=answer.duration or None)
+            thumbnail_url = _store_image(images['thumbnail_path'], f"{THUMBNAIL_DIR}/answer_{answer_id}_thumbnail.jpg")
+            sprite_url = _store_image(images['sprite_path'], f"{THUMBNAIL_DIR}/answer_{answer_id}_sprite.jpg")
+
+        InterviewAnswer.objects.filter(pk=answer_id).update(
+            thumbnail_url=thumbnail_url,
+            thumbnail_width=THUMBNAIL_SIZE[0],
+            thumbnail_height=THUMBNAIL_SIZE[1],
+            sprite_url=sprite_url,
+            sprite_frame_width=SPRITE_FRAME_SIZE[0],
+            sprite_frame_height=SPRITE_FRAME_SIZE[1],
+            sprite_frame_count=SPRITE_FRAMES,
+            sprite_interval=images['sprite_interval'],
+        )
+        logger.info(f"🖼️ Vignette et sprite générés pour la réponse {answer_id}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Vignettes non générées pour la réponse {answer_id}: {e}")
+        return False
+    finally:
+        if cleanup and os.path.exists(source_path):
+            os.remove(source_path)
+
+
+def schedule_answer_thumbnails(answer_id: int, source_path: str, cleanup: bool = False):
+    """Génère les vignettes en arrière-plan, après le commit de la réponse."""
+    transaction.on_commit(
+        lambda: _thumbnail_executor.submit(_generate_in_background, answer_id, source_path, cleanup)
+    )
+
+
+def schedule_uploaded_file_thumbnails(answer_id: int, video_file):
+    """
+    Variante pour un fichier reçu en mémoire/temporaire (upload synchrone) :
+    copie locale puis génération en arrière-plan.
+    """
+    if get_ffmpeg_binary() is None:
+        return
+    video_file.seek(0)
+    extension = os.path.splitext(getattr(video_file, 'name', '') or '')[1] or '.webm'
+    with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as copy:
+        for chunk in video_file.chunks():
+            copy.write(chunk)
+    schedule_answer_thumbnails(answer_id, copy.name, cleanup=True)
+
+
+def _generate_in_background(answer_id: int, source_path: str, cleanup: bool):
+    try:
+        generate_answer_thumbnails(answer_id, source_path, cleanup=cleanup)
+    finally:
+        close_old_connections()
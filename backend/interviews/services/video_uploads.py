@@ -0,0 +1,205 @@
+"""
+Outils communs aux différents modes d'upload des réponses vidéo.
+
+- Validation du token candidat (CampaignLink) et de la question visée
+- Identifiant Cloudinary déterministe d'une réponse
+- Détection des renvois d'une même vidéo (hash du contenu, clé d'idempotence)
+- Enregistrement du résultat d'upload sur InterviewAnswer
+"""
+
+import re
+import hashlib
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+from django.utils import timezone
+
+from users.models import CustomUser
+from ..models import CampaignLink, InterviewQuestion, InterviewAnswer
+from .video_deletion import enqueue_video_deletions
+from .video_storage import get_video_storage
+
+logger = logging.getLogger(__name__)
+
+VIDEO_FOLDER = 'jobgate/interviews'
+_PUBLIC_ID_PATTERN = re.compile(r'(?:^|/)interview_(\d+)_([0-9A-Za-z-]+)_(\d{8}_\d{6})$')
+
+
+class VideoUploadError(Exception):
+    """Upload refusé (token invalide, question inconnue...) avec le statut HTTP à renvoyer."""
+
+    def __init__(self, message: str, status_code: int = 400, errors: Optional[Dict[Any, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Détail par élément (envoi groupé)
+        self.errors = errors or {}
+
+
+def get_valid_link(candidate_token: Optional[str]) -> CampaignLink:
+    """
+    Lien de campagne utilisable pour un upload.
+
+    Pour l'upload vidéo on vérifie seulement l'expiration et la révocation,
+    pas la validation complète : le candidat peut être en train de passer l'entretien.
+    """
+    if not candidate_token:
+        raise VideoUploadError("Token candidat requis.", 400)
+    link = CampaignLink.objects.select_related('candidate', 'campaign').filter(token=candidate_token).first()
+    if link is None or link.revoked or link.is_expired:
+        raise VideoUploadError("Token candidat invalide ou expiré.", 403)
+    return link
+
+
+def get_link_candidate(link: CampaignLink) -> Optional[CustomUser]:
+    """Candidat associé au lien (compte lié, sinon recherche par email)."""
+    if link.candidate:
+        return link.candidate
+    if link.email:
+        candidate = CustomUser.objects.filter(email=link.email).first()
+        if candidate is None:
+            logger.warning(f"Candidat introuvable pour email: {link.email}")
+        return candidate
+    return None
+
+
+def get_upload_target(candidate_token: Optional[str], question_id: Any) -> Tuple[CampaignLink, InterviewQuestion, CustomUser]:
+    """
+    Lien, question et candidat d'un upload, en vérifiant que la question
+    appartient bien à la campagne du lien.
+    """
+    link = get_valid_link(candidate_token)
+    try:
+        question = InterviewQuestion.objects.get(pk=int(question_id), campaign_id=link.campaign_id)
+    except (TypeError, ValueError, InterviewQuestion.DoesNotExist):
+        raise VideoUploadError("Question introuvable pour cette campagne.", 404)
+    candidate = get_link_candidate(link)
+    if candidate is None:
+        raise VideoUploadError("Aucun compte candidat n'est associé à ce lien.", 400)
+    return link, question, candidate
+
+
+def build_public_id(question_id: Any, candidate_token: str) -> str:
+    """Identifiant Cloudinary unique d'une réponse (question, token, horodatage)."""
+    return f"interview_{question_id}_{candidate_token}_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def parse_public_id(public_id: str) -> Optional[Tuple[int, str]]:
+    """(question_id, token) encodés dans un public_id généré par build_public_id."""
+    match = _PUBLIC_ID_PATTERN.search(public_id or '')
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+def is_newer_public_id(public_id: str, current_public_id: Optional[str]) -> bool:
+    """
+    La vidéo `public_id` peut remplacer celle de la réponse : réponse sans
+    vidéo, même vidéo, ou horodatage (build_public_id) plus récent.
+    """
+    if not current_public_id or public_id == current_public_id:
+        return True
+    new_match = _PUBLIC_ID_PATTERN.search(public_id or '')
+    current_match = _PUBLIC_ID_PATTERN.search(current_public_id)
+    if not (new_match and current_match):
+        return False
+    return new_match.group(3) > current_match.group(3)
+
+
+def parse_duration(value: Any) -> Optional[int]:
+    """Durée en secondes (None si absente) ; ValueError si invalide ou négative."""
+    if value in (None, ''):
+        return None
+    duration = int(float(value))
+    if duration < 0:
+        raise ValueError(value)
+    return duration
+
+
+def compute_content_sha256(video_file) -> str:
+    """SHA-256 du fichier reçu, calculé par blocs ; le fichier est rembobiné."""
+    digest = hashlib.sha256()
+    for chunk in video_file.chunks():
+        digest.update(chunk)
+    video_file.seek(0)
+    return digest.hexdigest()
+
+
+def find_duplicate_answer(question_id: Any, candidate: Optional[CustomUser], content_sha256: Optional[str] = None,
+                          idempotency_key: Optional[str] = None) -> Optional[InterviewAnswer]:
+    """
+    Réponse déjà enregistrée (ou en cours d'envoi) pour le même contenu ou la
+    même clé d'idempotence : un renvoi du frontend ne repart pas vers le stockage.
+    """
+    if candidate is None or not question_id or not (content_sha256 or idempotency_key):
+        return None
+    try:
+        question_id = int(question_id)
+    except (TypeError, ValueError):
+        # Identifiant brut du formulaire invalide: aucun doublon possible
+        return None
+    answer = InterviewAnswer.objects.filter(
+        question_id=question_id, candidate=candidate, status__in=['processing', 'completed']
+    ).first()
+    if answer is None:
+        return None
+    if idempotency_key and answer.upload_idempotency_key == idempotency_key:
+        return answer
+    if content_sha256 and answer.content_sha256 == content_sha256:
+        return answer
+    return None
+
+
+def save_answer_video(question: InterviewQuestion, candidate: CustomUser, result: Dict[str, Any],
+                      file_size: Optional[int] = None, content_sha256: Optional[str] = None,
+                      idempotency_key: Optional[str] = None, verified: bool = True) -> InterviewAnswer:
+    """
+    Crée ou met à jour la réponse du candidat avec le résultat d'un upload Cloudinary.
+
+    Args:
+        verified: Résultat fourni par le stockage lui-même ; sinon la réponse
+            reste à vérifier et l'index (video_index) complétera les métadonnées
+    """
+    answer = InterviewAnswer.objects.filter(question=question, candidate=candidate).first()
+    if answer is None:
+        answer = InterviewAnswer(question=question, candidate=candidate)
+    # Nouvelle vidéo: l'empreinte et la clé précédentes ne la décrivent plus
+    answer.content_sha256 = content_sha256
+    answer.upload_idempotency_key = idempotency_key
+
+    previous_public_id = answer.cloudinary_public_id
+    answer.cloudinary_public_id = result.get('public_id')
+    answer.cloudinary_url = result.get('url')
+    answer.cloudinary_secure_url = result.get('secure_url')
+    # Rendus eager demandés à l'upload (HLS, aperçu, affiche)
+    renditions = get_video_storage().rendition_urls(answer.cloudinary_public_id) if answer.cloudinary_public_id else {}
+    answer.hls_url = renditions.get('hls_url')
+    answer.preview_url = renditions.get('preview_url')
+    answer.poster_url = renditions.get('poster_url')
+    # Vignette et sprite de l'ancienne vidéo: regénérés par les uploads passant par le serveur
+    answer.thumbnail_url = None
+    answer.thumbnail_width = None
+    answer.thumbnail_height = None
+    answer.sprite_url = None
+    answer.sprite_frame_width = None
+    answer.sprite_frame_height = None
+    answer.sprite_frame_count = None
+    answer.sprite_interval = None
+    try:
+        answer.duration = parse_duration(result.get('duration')) or 0
+    except (TypeError, ValueError, OverflowError):
+        logger.warning(f"Durée invalide ignorée pour {answer.cloudinary_public_id}: {result.get('duration')!r}")
+        answer.duration = 0
+    size = file_size if file_size is not None else result.get('bytes')
+    if isinstance(size, int):
+        answer.file_size = size
+    if result.get('format'):
+        answer.video_format = result['format']
+    # Le stockage vient de confirmer la vidéo: index à jour
+    answer.storage_verified_at = timezone.now() if verified else None
+    answer.status = 'completed'
+    answer.save()
+    if previous_public_id and previous_public_id != answer.cloudinary_public_id:
+        # Vidéo remplacée (nouvel enregistrement): l'ancienne part à la suppression
+        enqueue_video_deletions([previous_public_id])
+    logger.info(f"Réponse vidéo enregistrée: ID {answer.id} ({answer.cloudinary_public_id})")
+    return answer
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
 from django.dispatch import receiver
-from .models import JobApplication, CampaignLink
+from .models import JobApplication, CampaignLink, InterviewQuestion, InterviewAnswer
 from .notification_service import NotificationService
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(pre_save, sender=JobApplication)
 def track_application_status_change(sender, instance, **kwargs):
@@ -33,3 +37,37 @@ def create_interview_invitation_notification(sender, instance, created, **kwargs
     """Créer une notification lors de l'envoi d'une invitation d'entretien"""
     if created:
         NotificationService.create_interview_invitation_notification(instance)
+
+
+@receiver(pre_save, sender=InterviewQuestion)
+def track_question_text_change(sender, instance, **kwargs):
+    """Mémoriser le texte précédent d'une question modifiée"""
+    update_fields = kwargs.get('update_fields')
+    if not instance.pk or (update_fields and 'text' not in update_fields):
+        instance._old_text = None
+        return
+    instance._old_text = InterviewQuestion.objects.filter(pk=instance.pk).values_list('text', flat=True).first()
+
+
+@receiver(post_save, sender=InterviewQuestion)
+def add_question_to_bank(sender, instance, created, **kwargs):
+    """Ajouter à la bibliothèque les questions créées ou dont le texte a changé"""
+    from .services.question_bank import ingest_saved_questions
+
+    if not created and getattr(instance, '_old_text', None) in (None, instance.text):
+        return
+
+    try:
+        with transaction.atomic():
+            ingest_saved_questions([instance], instance.campaign.job_offer)
+    except Exception as e:
+        logger.warning(f"Question {instance.pk} non ajoutée à la bibliothèque: {e}")
+
+
+@receiver(post_delete, sender=InterviewAnswer)
+def enqueue_answer_video_deletion(sender, instance, **kwargs):
+    """Supprimer du stockage la vidéo d'une réponse supprimée (via l'outbox)"""
+    from .services.video_deletion import enqueue_video_deletions
+
+    if instance.cloudinary_public_id:
+        enqueue_video_deletions([instance.cloudinary_public_id])
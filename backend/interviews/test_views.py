@@ -16,7 +16,7 @@ def test_env_vars(request):
     # Test de l'initialisation du service
     try:
         generator = AIInterviewQuestionGenerator()
-        model_initialized = generator.model is not None
+        model_initialized = generator.gemini_available
         api_key_present = generator.api_key is not None
     except Exception as e:
         model_initialized = False
@@ -4,7 +4,10 @@ from .views import (
     JobOfferViewSet, InterviewCampaignViewSet, InterviewQuestionViewSet,
     CampaignLinkViewSet, InterviewAnswerViewSet, JobApplicationViewSet,
     RecruiterEvaluationViewSet, GlobalInterviewEvaluationViewSet,
-    CloudinaryVideoUploadView, AIQuestionGeneratorView, AIQuestionAnalysisView,
+    CloudinaryVideoUploadView, VideoUploadStatusView, DirectVideoUploadSignatureView, DirectVideoUploadConfirmView,
+    CloudinaryUploadWebhookView, VideoStreamView, ResumableVideoUploadView, ResumableVideoUploadDetailView,
+    AIQuestionGeneratorView, AIQuestionStreamView, AIQuestionAnalysisView,
+    AIQuestionTemplatesView, AIQuestionSuggestionsView,
     AiEvaluationViewSet
 )
 from .hiring_manager_views import HiringManagerAccessView
@@ -40,11 +43,21 @@ urlpatterns = [
     
     # ========== URLs IA pour Génération de Questions ==========
     path('generate-questions/', AIQuestionGeneratorView.as_view(), name='ai-generate-questions'),
+    path('generate-questions/stream/', AIQuestionStreamView.as_view(), name='ai-generate-questions-stream'),
     path('ai/analyze-question/', AIQuestionAnalysisView.as_view(), name='ai-analyze-question'),
+    path('ai/question-templates/', AIQuestionTemplatesView.as_view(), name='ai-question-templates'),
+    path('ai/question-suggestions/', AIQuestionSuggestionsView.as_view(), name='ai-question-suggestions'),
     path('test-env/', test_env_vars, name='test-env-vars'),
     
     # ========== URLs Cloudinary pour Upload Vidéo ==========
     path('videos/upload/', CloudinaryVideoUploadView.as_view(), name='cloudinary-video-upload'),
+    path('videos/upload/status/<int:answer_id>/', VideoUploadStatusView.as_view(), name='video-upload-status'),
+    path('videos/upload/signature/', DirectVideoUploadSignatureView.as_view(), name='direct-video-upload-signature'),
+    path('videos/upload/confirm/', DirectVideoUploadConfirmView.as_view(), name='direct-video-upload-confirm'),
+    path('videos/upload/webhook/', CloudinaryUploadWebhookView.as_view(), name='cloudinary-upload-webhook'),
+    path('videos/stream/<str:token>/', VideoStreamView.as_view(), name='video-stream'),
+    path('videos/upload/resumable/', ResumableVideoUploadView.as_view(), name='resumable-video-upload'),
+    path('videos/upload/resumable/<uuid:session_id>/', ResumableVideoUploadDetailView.as_view(), name='resumable-video-upload-detail'),
     
     
     # ========== URL pour les détails candidat ==========
@@ -9,29 +9,55 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import get_user_model
 from users.models import CustomUser
 from django.utils import timezone
-from django.http import JsonResponse
-from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse, HttpResponse, Http404
+from django.db.models import Q, Sum, Avg, Count, Max, F
+from django.db import transaction
 from .models import (
     JobOffer, InterviewCampaign, InterviewQuestion, CampaignLink, 
     InterviewAnswer, JobApplication, RecruiterEvaluation, GlobalInterviewEvaluation,
-    AiEvaluation
+    AiEvaluation, InterviewSessionProgress
 )
 from .serializers import (
     JobOfferSerializer, InterviewCampaignSerializer, InterviewCampaignCreateSerializer,
     InterviewQuestionSerializer, CampaignLinkSerializer, InterviewAnswerSerializer,
     JobApplicationSerializer, RecruiterEvaluationSerializer, 
     GlobalInterviewEvaluationSerializer, AiEvaluationSerializer,
-    AiEvaluationCreateSerializer, AiEvaluationBulkSerializer
+    AiEvaluationCreateSerializer, AiEvaluationBulkSerializer,
+    CampaignBulkCreateSerializer, CampaignCloneSerializer, CampaignQuestionsBulkUpdateSerializer
 )
 from .ai_service import AIInterviewQuestionGenerator, analyze_question_quality
 from django.core.mail import send_mail
 from .cloudinary_service import CloudinaryVideoService
 from .services.ai_video_evaluation_service import AIVideoEvaluationService
+from .services.evaluation_versioning import is_stale, stale_fields
+from .services.question_cache import QuestionGenerationCache, question_fingerprint
+from .services.question_bank import (
+    get_question_bank_index, ingest_generated_questions, extract_role_keywords, ingest_saved_questions
+)
+from .services.question_pregeneration import schedule_question_pregeneration
+from .services.video_uploads import (
+    VideoUploadError, VIDEO_FOLDER, get_valid_link, get_link_candidate, get_upload_target,
+    build_public_id, parse_public_id, is_newer_public_id, save_answer_video, compute_content_sha256, find_duplicate_answer
+)
+from .services import background_upload, resumable_upload
+from .services.video_index import schedule_index_refresh
+from .services.video_thumbnails import schedule_uploaded_file_thumbnails
+from .services.answer_batch import submit_answer_batch
+from .services.session_progress import (
+    build_resume_payload, get_resumable_link, refresh_session_progress, serialize_progress, update_session_progress
+)
+from .services.video_storage import (
+    CloudinaryVideoStorage, LocalVideoStorage, get_video_storage, content_type_for, parse_range_header, public_id_from_stream_token
+)
+from .services.campaign_bulk import clone_campaign, create_campaigns_for_offers, normalize_questions
 from django.conf import settings
 import logging
+import os
+import json
 import jwt
 from datetime import datetime, timedelta
 from django.core.mail import send_mail
@@ -53,106 +79,73 @@ class CloudinaryVideoUploadView(APIView):
         {
             "video_file": "fichier vidéo",
             "question_id": "ID de la question",
-            "candidate_token": "token du candidat"
+            "candidate_token": "token du candidat",
+            "async": "true pour un envoi en arrière-plan (optionnel, VIDEO_UPLOAD_MODE par défaut)"
         }
+        En-tête optionnel `Idempotency-Key` : un renvoi avec la même clé (ou le
+        même contenu) renvoie la réponse existante sans nouvel upload.
         """
         video_file = request.FILES.get('video_file')
         question_id = request.data.get('question_id')
         candidate_token = request.data.get('candidate_token')
+        idempotency_key = request.headers.get('Idempotency-Key')
         
         if not video_file:
             return Response({
                 "error": "Le fichier vidéo est obligatoire."
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Vérifier que le token candidat est valide
-        if not candidate_token:
-            return Response({
-                "error": "Token candidat requis."
-            }, status=status.HTTP_400_BAD_REQUEST)
+        content_sha256 = compute_content_sha256(video_file)
+        
+        async_flag = str(request.data.get('async', '')).lower()
+        if async_flag in ('1', 'true', 'yes') or (async_flag == '' and background_upload.is_async_upload_enabled()):
+            return self._accept_async(video_file, question_id, candidate_token, content_sha256, idempotency_key)
         
         # Vérifier que le token correspond à un lien valide
         try:
-            link = CampaignLink.objects.get(token=candidate_token)
-            # Pour l'upload vidéo, on vérifie seulement l'expiration et la révocation
-            # Pas la validation complète car le candidat peut être en train de passer l'entretien
-            if link.revoked or link.is_expired:
-                return Response({
-                    "error": "Token candidat invalide ou expiré."
-                }, status=status.HTTP_403_FORBIDDEN)
-        except CampaignLink.DoesNotExist:
+            link = get_valid_link(candidate_token)
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        
+        # Renvoi d'une vidéo déjà reçue (retry réseau du frontend)
+        candidate = get_link_candidate(link)
+        duplicate = find_duplicate_answer(question_id, candidate, content_sha256, idempotency_key)
+        if duplicate:
+            logger.info(f"♻️ Upload identique ignoré pour la réponse {duplicate.id}")
             return Response({
-                "error": "Token candidat invalide ou expiré."
-            }, status=status.HTTP_403_FORBIDDEN)
+                "success": True,
+                "duplicate": True,
+                "answer_id": duplicate.id,
+                "status": duplicate.status,
+                "cloudinary_public_id": duplicate.cloudinary_public_id,
+                "cloudinary_url": duplicate.cloudinary_url,
+                "cloudinary_secure_url": duplicate.cloudinary_secure_url,
+                "duration": duplicate.duration,
+                "answer_saved_to_db": True
+            }, status=status.HTTP_200_OK)
         
         try:
             # Générer un public_id unique pour la vidéo
-            public_id = f"interview_{question_id}_{candidate_token}_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+            public_id = build_public_id(question_id, candidate_token)
             
             logger.info(f"Tentative d'upload vidéo - Token: {candidate_token}, Question: {question_id}")
             
-            # Utiliser le service Cloudinary pour uploader la vidéo
-            result = CloudinaryVideoService.upload_video(
-                video_file, 
-                public_id=public_id,
-                folder="jobgate/interviews"
-            )
-            
-            if not result:
-                logger.error("CloudinaryVideoService.upload_video a retourné None")
-                return Response({
-                    "error": "Erreur lors de l'upload sur Cloudinary."
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Envoyer la vidéo au stockage configuré (Cloudinary par défaut)
+            result = get_video_storage().put(video_file, public_id, VIDEO_FOLDER)
             
-            logger.info(f"Upload Cloudinary réussi: {result.get('public_id')}")
-            
-            # Identifier le candidat via le token pour sauvegarder dans InterviewAnswer
-            candidate = None
-            if link.candidate:
-                candidate = link.candidate
-            elif link.email:
-                try:
-                    candidate = CustomUser.objects.get(email=link.email)
-                except CustomUser.DoesNotExist:
-                    logger.warning(f"Candidat introuvable pour email: {link.email}")
+            logger.info(f"Upload vidéo réussi: {result.get('public_id')}")
             
             # Sauvegarder dans le modèle InterviewAnswer si candidat et question_id disponibles
             answer_saved = False
             if candidate and question_id:
                 try:
                     question = InterviewQuestion.objects.get(pk=question_id)
-                    
-                    # Vérifier si une réponse existe déjà
-                    existing_answer = InterviewAnswer.objects.filter(
-                        question=question, 
-                        candidate=candidate
-                    ).first()
-                    
-                    if existing_answer:
-                        # Mettre à jour la réponse existante
-                        existing_answer.cloudinary_public_id = result.get('public_id')
-                        existing_answer.cloudinary_url = result.get('url')
-                        existing_answer.cloudinary_secure_url = result.get('secure_url')
-                        existing_answer.duration = result.get('duration', 0)
-                        existing_answer.status = 'completed'
-                        existing_answer.save()
-                        logger.info(f"Réponse mise à jour: ID {existing_answer.id}")
-                        answer_saved = True
-                    else:
-                        # Créer une nouvelle réponse
-                        new_answer = InterviewAnswer.objects.create(
-                            question=question,
-                            candidate=candidate,
-                            cloudinary_public_id=result.get('public_id'),
-                            cloudinary_url=result.get('url'),
-                            cloudinary_secure_url=result.get('secure_url'),
-                            duration=result.get('duration', 0),
-                            file_size=video_file.size,
-                            status='completed'
-                        )
-                        logger.info(f"Nouvelle réponse créée: ID {new_answer.id}")
-                        answer_saved = True
-                        
+                    answer = save_answer_video(
+                        question, candidate, result, file_size=video_file.size,
+                        content_sha256=content_sha256, idempotency_key=idempotency_key
+                    )
+                    answer_saved = True
+                    schedule_uploaded_file_thumbnails(answer.id, video_file)
                 except InterviewQuestion.DoesNotExist:
                     logger.warning(f"Question {question_id} introuvable pour sauvegarde")
                 except Exception as e:
@@ -177,6 +170,409 @@ class CloudinaryVideoUploadView(APIView):
                 "details": str(e) if settings.DEBUG else None
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _accept_async(self, video_file, question_id, candidate_token, content_sha256=None, idempotency_key=None):
+        """
+        Mode asynchrone: la vidéo est écrite dans la zone de transit, la réponse
+        passe à 'processing' et l'envoi vers Cloudinary se fait en arrière-plan.
+        """
+        try:
+            link, question, candidate = get_upload_target(candidate_token, question_id)
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+
+        duplicate = find_duplicate_answer(question.id, candidate, content_sha256, idempotency_key)
+        if duplicate:
+            logger.info(f"♻️ Upload identique ignoré pour la réponse {duplicate.id}")
+            return Response({
+                "success": True,
+                "duplicate": True,
+                "answer_id": duplicate.id,
+                "status": duplicate.status,
+                "status_url": reverse('video-upload-status', args=[duplicate.id]),
+            }, status=status.HTTP_200_OK)
+
+        with transaction.atomic():
+            answer, _ = InterviewAnswer.objects.update_or_create(
+                question=question,
+                candidate=candidate,
+                defaults={
+                    'status': 'processing',
+                    'file_size': video_file.size,
+                    'content_sha256': content_sha256,
+                    'upload_idempotency_key': idempotency_key,
+                    # Nouvelle tentative: les envois différés précédents deviennent obsolètes
+                    'staged_upload_id': background_upload.new_staged_upload_id(),
+                }
+            )
+            background_upload.stage_answer_upload(answer, link.token, video_file)
+            background_upload.schedule_answer_upload(answer.id, link.token, answer.staged_upload_id)
+
+        logger.info(f"⏳ Vidéo de la question {question.id} mise en file d'envoi (réponse {answer.id})")
+        return Response({
+            "success": True,
+            "answer_id": answer.id,
+            "status": answer.status,
+            "status_url": reverse('video-upload-status', args=[answer.id]),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class VideoUploadStatusView(APIView):
+    """
+    Statut d'une réponse envoyée en mode asynchrone (processing, completed, failed).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, answer_id):
+        candidate_token = request.query_params.get('candidate_token')
+        try:
+            link = get_valid_link(candidate_token)
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+
+        answer = InterviewAnswer.objects.filter(
+            pk=answer_id,
+            question__campaign_id=link.campaign_id,
+            candidate=get_link_candidate(link)
+        ).first()
+        if answer is None:
+            return Response({"error": "Réponse introuvable."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "answer_id": answer.id,
+            "status": answer.status,
+            "cloudinary_public_id": answer.cloudinary_public_id if answer.status == 'completed' else None,
+            "cloudinary_secure_url": answer.cloudinary_secure_url if answer.status == 'completed' else None,
+        })
+
+
+class DirectVideoUploadSignatureView(APIView):
+    """
+    Paramètres signés pour un upload direct du navigateur vers Cloudinary.
+    POST /api/interviews/videos/upload/signature/
+    
+    Body: {"candidate_token": "...", "question_id": 12}
+    Le navigateur envoie ensuite `fields` + le fichier (champ "file") à
+    `upload_url`, puis appelle /videos/upload/confirm/ avec la réponse.
+    """
+    permission_classes = [AllowAny]  # Permet l'accès avec token candidat
+    
+    def post(self, request):
+        candidate_token = request.data.get('candidate_token')
+        question_id = request.data.get('question_id')
+        try:
+            link, question, candidate = get_upload_target(candidate_token, question_id)
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        
+        if not isinstance(get_video_storage(), CloudinaryVideoStorage):
+            return Response({
+                "error": "L'upload direct n'est disponible qu'avec le stockage Cloudinary."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        public_id = build_public_id(question.id, link.token)
+        params = CloudinaryVideoService.get_signed_upload_params(
+            public_id,
+            folder=VIDEO_FOLDER,
+            context={'question_id': question.id, 'candidate_id': candidate.id},
+            notification_url=getattr(settings, 'CLOUDINARY_UPLOAD_NOTIFICATION_URL', None)
+        )
+        if not params:
+            return Response({
+                "error": "Cloudinary n'est pas configuré."
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        logger.info(f"Upload direct autorisé - Question: {question.id}, public_id: {public_id}")
+        return Response({
+            "success": True,
+            "upload_url": params['upload_url'],
+            "fields": params['fields'],
+            "public_id": f"{VIDEO_FOLDER}/{public_id}",
+        }, status=status.HTTP_200_OK)
+
+
+class DirectVideoUploadConfirmView(APIView):
+    """
+    Enregistre sur InterviewAnswer le résultat d'un upload direct.
+    POST /api/interviews/videos/upload/confirm/
+    
+    Body: {"candidate_token", "question_id", "public_id", "version", "signature"}
+    (champs de la réponse Cloudinary ; les métadonnées sont relues chez Cloudinary)
+    """
+    permission_classes = [AllowAny]  # Permet l'accès avec token candidat
+    
+    def post(self, request):
+        candidate_token = request.data.get('candidate_token')
+        try:
+            link, question, candidate = get_upload_target(candidate_token, request.data.get('question_id'))
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        
+        public_id = request.data.get('public_id', '')
+        if parse_public_id(public_id) != (question.id, link.token):
+            return Response({
+                "error": "Cette vidéo ne correspond pas à la question ou au token."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Durée, taille et format viennent de Cloudinary, jamais du navigateur
+        result = CloudinaryVideoService.get_video_info(public_id)
+        verified = bool(result)
+        if not result:
+            version = request.data.get('version')
+            if not CloudinaryVideoService.verify_upload_signature(public_id, version, request.data.get('signature')):
+                return Response({
+                    "error": "Vidéo introuvable sur Cloudinary."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            # Signature valide mais Admin API indisponible: l'index complétera les métadonnées
+            result = {'public_id': public_id, **CloudinaryVideoService.build_video_urls(public_id, version)}
+        
+        answer = save_answer_video(question, candidate, result, verified=verified)
+        return Response({
+            "success": True,
+            "answer_id": answer.id,
+            "cloudinary_public_id": answer.cloudinary_public_id,
+            "cloudinary_secure_url": answer.cloudinary_secure_url,
+            "duration": answer.duration,
+        }, status=status.HTTP_201_CREATED)
+
+
+class CloudinaryUploadWebhookView(APIView):
+    """
+    Notification envoyée par Cloudinary à la fin d'un upload direct
+    (filet de sécurité si le navigateur n'a pas pu appeler /confirm/).
+    POST /api/interviews/videos/upload/webhook/
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    def post(self, request):
+        body = request.body.decode('utf-8')
+        if not CloudinaryVideoService.verify_notification(
+            body, request.headers.get('X-Cld-Timestamp'), request.headers.get('X-Cld-Signature')
+        ):
+            return Response({"error": "Signature invalide."}, status=status.HTTP_403_FORBIDDEN)
+        
+        payload = json.loads(body or '{}')
+        if payload.get('notification_type') != 'upload' or payload.get('resource_type') != 'video':
+            return Response({"ignored": True}, status=status.HTTP_200_OK)
+        
+        parsed = parse_public_id(payload.get('public_id', ''))
+        link = CampaignLink.objects.filter(token=parsed[1]).first() if parsed else None
+        question = InterviewQuestion.objects.filter(pk=parsed[0], campaign_id=link.campaign_id).first() if link else None
+        candidate = get_link_candidate(link) if link else None
+        if not (question and candidate):
+            logger.warning(f"Notification Cloudinary sans réponse associée: {payload.get('public_id')}")
+            return Response({"ignored": True}, status=status.HTTP_200_OK)
+        
+        with transaction.atomic():
+            # Cloudinary rejoue ses notifications : une vidéo plus ancienne que
+            # celle déjà confirmée par le navigateur est ignorée
+            current = InterviewAnswer.objects.select_for_update().filter(
+                question=question, candidate=candidate
+            ).values_list('cloudinary_public_id', flat=True).first()
+            if not is_newer_public_id(payload.get('public_id'), current):
+                logger.info(f"Notification Cloudinary obsolète ignorée: {payload.get('public_id')} (réponse sur {current})")
+                return Response({"ignored": True}, status=status.HTTP_200_OK)
+            answer = save_answer_video(question, candidate, payload)
+        return Response({"success": True, "answer_id": answer.id}, status=status.HTTP_200_OK)
+
+class VideoStreamView(APIView):
+    """
+    Lecture des vidéos du stockage local (VIDEO_STORAGE_BACKEND='local').
+
+    L'URL contient un jeton signé (voir LocalVideoStorage.url). Les requêtes
+    Range sont servies en 206 ; derrière nginx, VIDEO_STORAGE_ACCEL_REDIRECT
+    délègue l'envoi du fichier (X-Accel-Redirect).
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, token):
+        storage = get_video_storage()
+        public_id = public_id_from_stream_token(token)
+        path = storage.path(public_id) if public_id and isinstance(storage, LocalVideoStorage) else None
+        if path is None:
+            raise Http404("Vidéo introuvable.")
+
+        content_type = content_type_for(path)
+        accel_prefix = getattr(settings, 'VIDEO_STORAGE_ACCEL_REDIRECT', None)
+        if accel_prefix:
+            # nginx gère lui-même Range/206 et sendfile
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + os.path.relpath(path, storage.root)
+            return response
+
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range_header(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+
+        video = open(path, 'rb')
+        if byte_range is None:
+            response = FileResponse(video, content_type=content_type)
+        else:
+            start, end = byte_range
+            video.seek(start)
+            if end == size - 1:
+                # Jusqu'à la fin du fichier: FileResponse (sendfile via wsgi.file_wrapper)
+                response = FileResponse(video, content_type=content_type, status=status.HTTP_206_PARTIAL_CONTENT)
+            else:
+                response = StreamingHttpResponse(
+                    _read_file_range(video, end - start + 1),
+                    content_type=content_type,
+                    status=status.HTTP_206_PARTIAL_CONTENT
+                )
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+
+def _read_file_range(video, length, block_size=64 * 1024):
+    """Lit `length` octets à partir de la position courante, puis ferme le fichier."""
+    try:
+        while length > 0:
+            data = video.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        video.close()
+
+
+class ResumableVideoUploadView(APIView):
+    """
+    Création d'un upload vidéo reprenable (protocole inspiré de tus 1.0).
+    POST /api/interviews/videos/upload/resumable/
+    
+    En-tête: Upload-Length (taille totale en octets)
+    Body: {"candidate_token": "...", "question_id": 12}
+    Réponse 201 avec l'en-tête Location de la session.
+    """
+    permission_classes = [AllowAny]  # Permet l'accès avec token candidat
+    
+    def post(self, request):
+        upload_length = request.headers.get('Upload-Length') or request.data.get('upload_length')
+        try:
+            session = resumable_upload.create_session(
+                request.data.get('candidate_token'), request.data.get('question_id'), upload_length
+            )
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        
+        location = request.build_absolute_uri(
+            reverse('resumable-video-upload-detail', kwargs={'session_id': session.id})
+        )
+        response = Response({
+            "upload_id": str(session.id),
+            "location": location,
+            "offset": session.offset,
+            "upload_length": session.upload_length,
+        }, status=status.HTTP_201_CREATED)
+        response['Location'] = location
+        for header, value in resumable_upload.session_headers(session).items():
+            response[header] = value
+        return response
+
+
+class ResumableVideoUploadDetailView(APIView):
+    """
+    Progression et envoi des fragments d'un upload reprenable.
+    /api/interviews/videos/upload/resumable/<session_id>/
+    
+    Le token candidat est passé dans l'en-tête Candidate-Token (ou ?candidate_token=).
+    - HEAD: offset courant (Upload-Offset)
+    - PATCH: fragment brut (Content-Type: application/offset+octet-stream)
+      avec l'en-tête Upload-Offset ; 409 si l'offset ne correspond pas
+    - POST: relance l'envoi vers Cloudinary après un échec (ou un envoi interrompu)
+    Une fois le fichier complet: 200 (terminé), 202 (envoi en cours), 502 (échec)
+    - DELETE: abandon de l'upload
+    """
+    permission_classes = [AllowAny]  # Permet l'accès avec token candidat
+    
+    @staticmethod
+    def _candidate_token(request):
+        return request.headers.get('Candidate-Token') or request.query_params.get('candidate_token')
+    
+    @staticmethod
+    def _with_headers(response, session):
+        for header, value in resumable_upload.session_headers(session).items():
+            response[header] = value
+        return response
+    
+    @staticmethod
+    def _finalize_status(session):
+        if session.status == 'completed':
+            return status.HTTP_200_OK
+        if session.status == 'uploading':
+            return status.HTTP_202_ACCEPTED
+        return status.HTTP_502_BAD_GATEWAY
+    
+    @staticmethod
+    def _session_payload(session):
+        return {
+            "upload_id": str(session.id),
+            "status": session.status,
+            "offset": session.offset,
+            "upload_length": session.upload_length,
+            "answer_id": session.answer_id,
+            "error": session.error_message,
+        }
+    
+    def head(self, request, session_id):
+        try:
+            session = resumable_upload.get_session(session_id, self._candidate_token(request))
+        except VideoUploadError as e:
+            return Response(status=e.status_code)
+        return self._with_headers(Response(status=status.HTTP_200_OK), session)
+    
+    def get(self, request, session_id):
+        try:
+            session = resumable_upload.get_session(session_id, self._candidate_token(request))
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        return self._with_headers(Response(self._session_payload(session)), session)
+    
+    def patch(self, request, session_id):
+        if request.content_type != 'application/offset+octet-stream':
+            return Response({
+                "error": "Content-Type attendu: application/offset+octet-stream."
+            }, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        try:
+            session = resumable_upload.append_chunk(
+                session_id, self._candidate_token(request),
+                request.headers.get('Upload-Offset'), request.stream
+            )
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        
+        if not session.is_complete:
+            return self._with_headers(Response(status=status.HTTP_204_NO_CONTENT), session)
+        
+        if session.status == 'active':
+            session = resumable_upload.finalize_session(session)
+        return self._with_headers(Response(self._session_payload(session), status=self._finalize_status(session)), session)
+    
+    def post(self, request, session_id):
+        try:
+            session = resumable_upload.retry_session(session_id, self._candidate_token(request))
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        response_status = self._finalize_status(session) if session.is_complete else status.HTTP_200_OK
+        return self._with_headers(Response(self._session_payload(session), status=response_status), session)
+    
+    def delete(self, request, session_id):
+        try:
+            resumable_upload.terminate_session(session_id, self._candidate_token(request))
+        except VideoUploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response['Tus-Resumable'] = resumable_upload.TUS_VERSION
+        return response
+
 # Ajouter une vue API simple pour les candidatures
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -255,6 +651,13 @@ class JobOfferViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         logger.error(f'Données validées: {serializer.validated_data}')
         job_offer = serializer.save(recruiter=self.request.user)
+        # Questions IA préparées en arrière-plan pour le constructeur de campagne
+        schedule_question_pregeneration(job_offer)
+    
+    def perform_update(self, serializer):
+        job_offer = serializer.save()
+        # Nouvelle empreinte si le titre, la description ou les prérequis ont changé
+        schedule_question_pregeneration(job_offer)
     
     
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
@@ -383,13 +786,136 @@ class InterviewCampaignViewSet(viewsets.ModelViewSet):
         serializer = InterviewQuestionSerializer(data=request.data)
         
         if serializer.is_valid():
-            # Définir l'ordre comme le dernier + 1
-            order = campaign.questions.count() + 1
-            serializer.save(campaign=campaign, order=order)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            with transaction.atomic():
+                # Définir l'ordre comme le dernier + 1 (les trous laissés par une suppression sont ignorés)
+                last_order = campaign.questions.aggregate(last=Max('order'))['last'] or 0
+                serializer.save(campaign=campaign, order=last_order + 1)
+                campaign_version = InterviewCampaign.bump_version(campaign.pk)
+            return Response({**serializer.data, 'campaign_version': campaign_version}, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['put'], url_path='questions/bulk')
+    def bulk_update_questions(self, request, pk=None):
+        """
+        Réordonne (et modifie) toutes les questions de la campagne en un appel.
+        Body: {"version": 3, "questions": [{"id": 12, "text": "...", "time_limit": 90}, ...]}
+        La liste doit contenir toutes les questions, dans le nouvel ordre.
+        Répond 409 si la campagne a été modifiée depuis la lecture de `version`.
+        """
+        campaign = self.get_object()
+        serializer = CampaignQuestionsBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['questions']
+        expected_version = serializer.validated_data['version']
+        
+        with transaction.atomic():
+            # Verrou optimiste: un seul client peut passer de la version N à N+1
+            updated = InterviewCampaign.objects.filter(
+                pk=campaign.pk, version=expected_version
+            ).update(version=F('version') + 1)
+            if not updated:
+                current_version = InterviewCampaign.objects.filter(pk=campaign.pk).values_list('version', flat=True).first()
+                return Response({
+                    'detail': "La campagne a été modifiée entre-temps. Rechargez les questions.",
+                    'current_version': current_version
+                }, status=status.HTTP_409_CONFLICT)
+            
+            questions = {question.id: question for question in campaign.questions.select_for_update()}
+            if set(questions) != {item['id'] for item in items}:
+                transaction.set_rollback(True)
+                return Response({
+                    'detail': "La liste doit contenir exactement les questions de la campagne.",
+                    'missing': sorted(set(questions) - {item['id'] for item in items}),
+                    'unknown': sorted({item['id'] for item in items} - set(questions))
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            edited_texts = []
+            for order, item in enumerate(items, start=1):
+                question = questions[item['id']]
+                question.order = order
+                if 'text' in item and item['text'] != question.text:
+                    question.text = item['text']
+                    edited_texts.append(question)
+                if 'time_limit' in item:
+                    question.time_limit = item['time_limit']
+            
+            # Un seul UPDATE ... CASE pour toutes les questions
+            InterviewQuestion.objects.bulk_update(questions.values(), ['order', 'text', 'time_limit'])
+        
+        # bulk_update n'émet pas post_save: les textes modifiés alimentent la bibliothèque ici
+        if edited_texts:
+            ingest_saved_questions(edited_texts, campaign.job_offer)
+        
+        ordered = sorted(questions.values(), key=lambda question: question.order)
+        return Response({
+            'version': expected_version + 1,
+            'questions': InterviewQuestionSerializer(ordered, many=True).data
+        })
+    
+    def _get_target_offers(self, job_offer_ids):
+        """Offres cibles d'une création en lot, limitées à celles du recruteur"""
+        job_offer_ids = list(dict.fromkeys(job_offer_ids))
+        offers = JobOffer.objects.filter(id__in=job_offer_ids)
+        if not self.request.user.is_staff:
+            offers = offers.filter(recruiter=self.request.user)
+        offers_by_id = {offer.id: offer for offer in offers}
+        missing = [offer_id for offer_id in job_offer_ids if offer_id not in offers_by_id]
+        if missing:
+            return None, Response(
+                {"detail": "Offres introuvables ou non autorisées.", "job_offer_ids": missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return [offers_by_id[offer_id] for offer_id in job_offer_ids], None
+    
+    @staticmethod
+    def _bulk_response(campaigns, question_count):
+        return Response({
+            'created_count': len(campaigns),
+            'questions_per_campaign': question_count,
+            'campaigns': [
+                {'id': campaign.id, 'job_offer': campaign.job_offer_id, 'title': campaign.title}
+                for campaign in campaigns
+            ]
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """
+        Copie la campagne et ses questions vers une ou plusieurs offres.
+        Body: {"job_offer_ids": [1, 2], "title": "optionnel", "active": true}
+        """
+        source = self.get_object()
+        serializer = CampaignCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        offers, error_response = self._get_target_offers(serializer.validated_data['job_offer_ids'])
+        if error_response:
+            return error_response
+        
+        overrides = {key: serializer.validated_data[key] for key in ('title', 'active') if key in serializer.validated_data}
+        campaigns = clone_campaign(source, offers, overrides)
+        logger.info(f"Campagne {source.id} clonée vers {len(campaigns)} offre(s)")
+        return self._bulk_response(campaigns, source.questions.count())
+    
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        """
+        Crée la même campagne (avec ses questions) pour plusieurs offres.
+        Body: champs de la campagne + "questions" + "job_offer_ids"
+        """
+        serializer = CampaignBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        
+        offers, error_response = self._get_target_offers(data.pop('job_offer_ids'))
+        if error_response:
+            return error_response
+        
+        questions = normalize_questions(data.pop('questions', []))
+        campaigns = create_campaigns_for_offers(data, questions, offers)
+        return self._bulk_response(campaigns, len(questions))
+    
     @action(detail=True, methods=['post'])
     def invite_hiring_manager(self, request, pk=None):
         """Invite un Hiring Manager à accéder aux résultats de la campagne"""
@@ -573,6 +1099,35 @@ class InterviewQuestionViewSet(viewsets.ModelViewSet):
         if user.is_staff:
             return InterviewQuestion.objects.all()
         return InterviewQuestion.objects.filter(campaign__job_offer__recruiter=user)
+    
+    # Toute écriture d'une question incrémente la version de sa campagne dans la
+    # même transaction, pour que le verrou optimiste de questions/bulk la détecte
+    
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().create(request, *args, **kwargs)
+            response.data['campaign_version'] = InterviewCampaign.bump_version(response.data['campaign'])
+        return response
+    
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            previous_campaign_id = self.get_object().campaign_id
+            response = super().update(request, *args, **kwargs)
+            if response.data['campaign'] != previous_campaign_id:
+                InterviewCampaign.bump_version(previous_campaign_id)
+            response.data['campaign_version'] = InterviewCampaign.bump_version(response.data['campaign'])
+        return response
+    
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            question = self.get_object()
+            campaign_id = question.campaign_id
+            question.delete()
+            campaign_version = InterviewCampaign.bump_version(campaign_id)
+        # 204 sans corps (contrat DRF) : la nouvelle version passe par un en-tête
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response['X-Campaign-Version'] = str(campaign_version)
+        return response
 
 
 class JobApplicationViewSet(viewsets.ModelViewSet):
@@ -900,7 +1455,7 @@ class CampaignLinkViewSet(viewsets.ViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'progress', 'resume'):
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -927,6 +1482,39 @@ class CampaignLinkViewSet(viewsets.ViewSet):
         }
         return Response(data)
     
+    @action(detail=True, methods=['get', 'patch'])
+    def progress(self, request, pk=None):
+        """
+        Avancement de la session (pk est le token).
+        GET: questions terminées et états d'envoi par question
+        PATCH: {"current_question_id": 12, "upload_states": {"12": "uploading"}}
+        """
+        try:
+            link = get_resumable_link(pk)
+            if request.method == 'PATCH':
+                progress = update_session_progress(
+                    link,
+                    current_question_id=request.data.get('current_question_id'),
+                    upload_states=request.data.get('upload_states')
+                )
+            else:
+                progress = refresh_session_progress(link)
+        except VideoUploadError as e:
+            return Response({"detail": str(e)}, status=e.status_code)
+        return Response(serialize_progress(progress))
+    
+    @action(detail=True, methods=['get'])
+    def resume(self, request, pk=None):
+        """
+        Reprise d'une session interrompue (pk est le token) : question où
+        reprendre et réponses déjà stockées à ne pas renvoyer.
+        """
+        try:
+            link = get_resumable_link(pk)
+        except VideoUploadError as e:
+            return Response({"valid": False, "detail": str(e)}, status=e.status_code)
+        return Response({"valid": True, **build_resume_payload(link)})
+    
     @action(detail=True, methods=['post'])
     def send_invite(self, request, pk=None):
         """Envoie un email d'invitation au candidat pour ce lien."""
@@ -1098,6 +1686,7 @@ L'équipe JobGate
             question__campaign=link.campaign,
             candidate=link.candidate
         ).delete()[0]
+        InterviewSessionProgress.objects.filter(link=link).delete()
         
         # Réinitialiser le statut du lien
         link.status = 'active'
@@ -1149,7 +1738,7 @@ class InterviewAnswerViewSet(viewsets.ModelViewSet):
         """
         Gestion des permissions selon l'action.
         """
-        if self.action == 'create':
+        if self.action in ('create', 'batch'):
             # Seuls les candidats authentifiés peuvent soumettre des réponses
             permission_classes = [permissions.AllowAny]  # Temporaire pour les liens publics
         else:
@@ -1324,6 +1913,35 @@ class InterviewAnswerViewSet(viewsets.ModelViewSet):
                     "detail": f"Erreur lors de la sauvegarde: {str(e)}"
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    def batch(self, request):
+        """
+        Enregistre plusieurs réponses d'une session en une requête.
+        POST /api/interviews/answers/batch/
+        
+        Body (JSON ou multipart, "answers" pouvant être une chaîne JSON):
+        {
+            "candidate_token": "token du lien",
+            "answers": [
+                {"question_id": 1, "file": "video_1", "duration": 42},   # fichier joint "video_1"
+                {"question_id": 2, "public_id": "jobgate/interviews/..."}  # vidéo déjà envoyée
+            ]
+        }
+        """
+        entries = request.data.get('answers')
+        if isinstance(entries, str):
+            try:
+                entries = json.loads(entries)
+            except ValueError:
+                return Response({"detail": "'answers' doit être une liste JSON."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = submit_answer_batch(request.data.get('candidate_token'), entries, request.FILES)
+        except VideoUploadError as e:
+            return Response({"detail": str(e), "errors": e.errors}, status=e.status_code)
+        
+        return Response({"success": True, **result}, status=status.HTTP_200_OK)
+    
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def by_campaign(self, request):
         """
@@ -1352,34 +1970,12 @@ class InterviewAnswerViewSet(viewsets.ModelViewSet):
             question__campaign=campaign
         ).select_related('candidate', 'question').order_by('-created_at')
         
-        # Filtrer les réponses qui ont des URLs Cloudinary valides
-        valid_answers = []
-        for answer in answers:
-            if answer.cloudinary_secure_url or answer.cloudinary_url:
-                # Vérifier si la vidéo existe encore sur Cloudinary
-                try:
-                    from .cloudinary_service import CloudinaryVideoService
-                    if answer.cloudinary_public_id:
-                        video_info = CloudinaryVideoService.get_video_info(answer.cloudinary_public_id)
-                        if video_info:
-                            valid_answers.append(answer)
-                        else:
-                            # Vidéo supprimée de Cloudinary, nettoyer l'enregistrement
-                            logger.warning(f"Vidéo supprimée de Cloudinary, nettoyage de l'enregistrement {answer.id}")
-                            answer.cloudinary_public_id = None
-                            answer.cloudinary_url = None
-                            answer.cloudinary_secure_url = None
-                            answer.status = 'deleted'
-                            answer.save()
-                    else:
-                        valid_answers.append(answer)
-                except Exception as e:
-                    logger.error(f"Erreur vérification Cloudinary pour réponse {answer.id}: {e}")
-                    valid_answers.append(answer)  # Garder en cas d'erreur de vérification
-            else:
-                valid_answers.append(answer)
+        # Existence des vidéos lue dans l'index local ; les entrées périmées
+        # sont revérifiées par lots en arrière-plan
+        answers = list(answers)
+        schedule_index_refresh(answers)
         
-        serializer = self.get_serializer(valid_answers, many=True)
+        serializer = self.get_serializer(answers, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
@@ -1423,35 +2019,22 @@ class InterviewAnswerViewSet(viewsets.ModelViewSet):
         
         # Formater les données selon le format demandé
         evaluation_data = []
+        answers = list(answers)
+        schedule_index_refresh(answers)
         for answer in answers:
-            # Vérifier que la vidéo existe sur Cloudinary
-            video_url = None
-            if answer.cloudinary_secure_url:
-                try:
-                    from .cloudinary_service import CloudinaryVideoService
-                    if answer.cloudinary_public_id:
-                        video_info = CloudinaryVideoService.get_video_info(answer.cloudinary_public_id)
-                        if video_info:
-                            video_url = answer.cloudinary_secure_url
-                        else:
-                            # Nettoyer l'enregistrement si la vidéo n'existe plus
-                            answer.cloudinary_public_id = None
-                            answer.cloudinary_url = None
-                            answer.cloudinary_secure_url = None
-                            answer.status = 'deleted'
-                            answer.save()
-                            continue
-                    else:
-                        video_url = answer.cloudinary_secure_url
-                except Exception as e:
-                    logger.error(f"Erreur vérification Cloudinary pour réponse {answer.id}: {e}")
-                    video_url = answer.cloudinary_secure_url
+            # Existence de la vidéo lue dans l'index local (voir services/video_index.py)
+            video_url = answer.cloudinary_secure_url
             
             if video_url:
                 evaluation_data.append({
                     "id": answer.id,
                     "question": answer.question.text,
                     "video_url": video_url,
+                    "hls_url": answer.hls_url,
+                    "poster_url": answer.poster_url,
+                    "thumbnail_url": answer.thumbnail_url,
+                    "sprite_url": answer.sprite_url,
+                    "sprite_interval": answer.sprite_interval,
                     "score": answer.score,
                     "recruiter_notes": answer.recruiter_notes or "",
                     "duration": answer.duration,
@@ -1523,7 +2106,10 @@ class AIQuestionGeneratorView(APIView):
             "required_skills": ["skill1", "skill2"],
             "experience_level": "junior|intermediate|senior",
             "question_count": 5,
-            "difficulty_level": "easy|medium|hard"
+            "difficulty_level": "easy|medium|hard",
+            "fresh": false,       // ignorer le cache et rappeler l'IA
+            "regenerate": false,  // servir d'abord une variante en cache non encore vue
+            "generation_mode": "parallel|single"  // optionnel
         }
         """
         # Sécurité: Seuls les recruteurs ou staff
@@ -1532,57 +2118,63 @@ class AIQuestionGeneratorView(APIView):
                 'error': 'Seuls les recruteurs peuvent générer des questions IA.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        # Récupération des données
-        job_title = request.data.get('job_title', '').strip()
-        job_description = request.data.get('job_description', '').strip()
-        required_skills = request.data.get('required_skills', [])
-        experience_level = request.data.get('experience_level', 'intermediate')
-        try:
-            question_count = int(request.data.get('question_count', 5))
-        except (ValueError, TypeError):
-            question_count = 5
-        difficulty_level = request.data.get('difficulty_level', 'medium')
-
-        # Validation
-        if not job_title or not job_description:
-            return Response({'error': 'Le titre et la description du poste sont obligatoires.'}, status=status.HTTP_400_BAD_REQUEST)
-        if question_count < 1 or question_count > 20:
-            return Response({'error': 'Le nombre de questions doit être entre 1 et 20.'}, status=status.HTTP_400_BAD_REQUEST)
-        if experience_level not in ['junior', 'intermediate', 'senior']:
-            return Response({'error': 'Niveau d\'expérience invalide.'}, status=status.HTTP_400_BAD_REQUEST)
-        if difficulty_level not in ['easy', 'medium', 'hard']:
-            return Response({'error': 'Niveau de difficulté invalide.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Extraction des prérequis depuis les données reçues
-        requirements_list = request.data.get('required_skills', [])
-        if isinstance(requirements_list, list):
-            requirements = ', '.join(requirements_list)
-        else:
-            requirements = str(requirements_list) if requirements_list else ''
-
-        # Extraction des compteurs de questions spécifiques
-        behavioral_count = request.data.get('behavioral_count')
-        technical_count = request.data.get('technical_count')
-
-        # Récupérer les questions statiques existantes de la campagne
-        existing_questions_count = request.data.get('existing_questions_count', 0)
-
-        # Calculer le nombre de questions IA à générer
-        # Si on veut 5 questions au total et qu'il y en a déjà 1 statique, générer seulement 4
-        ai_questions_needed = max(0, question_count - existing_questions_count)
+        params, error_response = self._parse_generation_request(request)
+        if error_response:
+            return error_response
+        job_title = params['job_title']
+        job_description = params['job_description']
+        experience_level = params['experience_level']
+        difficulty_level = params['difficulty_level']
+        requirements = params['requirements']
+        behavioral_count = params['behavioral_count']
+        technical_count = params['technical_count']
+        ai_questions_needed = params['ai_questions_needed']
+
+        fresh = str(request.data.get('fresh', False)).lower() in ('true', '1')
+        regenerate = str(request.data.get('regenerate', False)).lower() in ('true', '1')
+        generation_mode = request.data.get('generation_mode')
+        if generation_mode not in (None, 'parallel', 'single'):
+            return Response({'error': 'Mode de génération invalide.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Appel au service IA pour générer les questions (uniquement dynamique)
-            ai_generator = AIInterviewQuestionGenerator()
-            questions = ai_generator.generate_questions(
-                offer_title=job_title,
-                offer_description=job_description,
-                number_of_questions=ai_questions_needed,
-                difficulty=difficulty_level,
-                requirements=requirements,
-                behavioral_count=behavioral_count,
-                technical_count=technical_count
+            # Cache par empreinte de l'offre: évite de rappeler l'IA pour les mêmes paramètres
+            question_cache = QuestionGenerationCache()
+            fingerprint = question_fingerprint(
+                job_title, job_description, requirements, difficulty_level,
+                ai_questions_needed, behavioral_count, technical_count
+            )
+            variant = None if fresh else question_cache.get(
+                fingerprint, request.user.id, unseen_only=regenerate
             )
+            from_cache = variant is not None
+            generation_errors = []
+
+            if not from_cache:
+                # Appel au service IA pour générer les questions (uniquement dynamique)
+                ai_generator = AIInterviewQuestionGenerator()
+                generated = ai_generator.generate_questions(
+                    offer_title=job_title,
+                    offer_description=job_description,
+                    number_of_questions=ai_questions_needed,
+                    difficulty=difficulty_level,
+                    requirements=requirements,
+                    behavioral_count=behavioral_count,
+                    technical_count=technical_count,
+                    mode=generation_mode
+                )
+                generation_errors = ai_generator.last_generation_errors
+                ai_provider = ai_generator.last_generation_provider
+                # Toutes les questions générées alimentent la bibliothèque
+                ingest_generated_questions(generated, job_title, requirements, difficulty_level)
+                # Un résultat partiel n'est pas mis en cache
+                if generated and not generation_errors:
+                    variant = question_cache.store(fingerprint, generated, ai_provider)
+                else:
+                    variant = {'id': None, 'questions': generated, 'ai_provider': ai_provider}
+
+            questions = variant['questions']
+            if variant['id']:
+                question_cache.mark_shown(fingerprint, request.user.id, variant['id'])
 
             # Analyser la qualité des questions générées
             quality_analysis = analyze_question_quality(questions, job_title, requirements)
@@ -1604,7 +2196,12 @@ class AIQuestionGeneratorView(APIView):
                     'experience_level': experience_level,
                     'difficulty_level': difficulty_level,
                     'generated_count': len(analyzed_questions),
-                    'ai_provider': 'google_gemini'
+                    'ai_provider': variant.get('ai_provider'),
+                    'from_cache': from_cache,
+                    'fingerprint': fingerprint,
+                    'variant_id': variant['id'],
+                    'partial': bool(generation_errors),
+                    'warnings': generation_errors
                 }
             }, status=status.HTTP_200_OK)
 
@@ -1623,6 +2220,148 @@ class AIQuestionGeneratorView(APIView):
                 'type': 'technical_error'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _parse_generation_request(self, request):
+        """
+        Extrait et valide les paramètres de génération communs.
+
+        Returns:
+            Tuple (paramètres, None) ou (None, Response d'erreur 400)
+        """
+        # Récupération des données
+        job_title = request.data.get('job_title', '').strip()
+        job_description = request.data.get('job_description', '').strip()
+        required_skills = request.data.get('required_skills', [])
+        experience_level = request.data.get('experience_level', 'intermediate')
+        try:
+            question_count = int(request.data.get('question_count', 5))
+        except (ValueError, TypeError):
+            question_count = 5
+        difficulty_level = request.data.get('difficulty_level', 'medium')
+
+        # Validation
+        if not job_title or not job_description:
+            return None, Response({'error': 'Le titre et la description du poste sont obligatoires.'}, status=status.HTTP_400_BAD_REQUEST)
+        if question_count < 1 or question_count > 20:
+            return None, Response({'error': 'Le nombre de questions doit être entre 1 et 20.'}, status=status.HTTP_400_BAD_REQUEST)
+        if experience_level not in ['junior', 'intermediate', 'senior']:
+            return None, Response({'error': 'Niveau d\'expérience invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+        if difficulty_level not in ['easy', 'medium', 'hard']:
+            return None, Response({'error': 'Niveau de difficulté invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Extraction des prérequis depuis les données reçues
+        requirements_list = request.data.get('required_skills', [])
+        if isinstance(requirements_list, list):
+            requirements = ', '.join(requirements_list)
+        else:
+            requirements = str(requirements_list) if requirements_list else ''
+
+        # Extraction des compteurs de questions spécifiques
+        behavioral_count = request.data.get('behavioral_count')
+        technical_count = request.data.get('technical_count')
+
+        # Récupérer les questions statiques existantes de la campagne
+        existing_questions_count = request.data.get('existing_questions_count', 0)
+
+        # Calculer le nombre de questions IA à générer
+        # Si on veut 5 questions au total et qu'il y en a déjà 1 statique, générer seulement 4
+        ai_questions_needed = max(0, question_count - existing_questions_count)
+
+        return {
+            'job_title': job_title,
+            'job_description': job_description,
+            'experience_level': experience_level,
+            'difficulty_level': difficulty_level,
+            'requirements': requirements,
+            'behavioral_count': behavioral_count,
+            'technical_count': technical_count,
+            'ai_questions_needed': ai_questions_needed,
+        }, None
+
+
+class AIQuestionStreamView(AIQuestionGeneratorView):
+    """
+    Génération de questions en streaming (Server-Sent Events).
+    POST /api/interviews/generate-questions/stream/
+
+    Même body que /generate-questions/. Chaque question est poussée dès que
+    son objet JSON est complet dans le flux du modèle:
+        event: question  data: {...}
+        event: done      data: {"generated_count": N, "ai_provider": "..."}
+        event: error     data: {"error": "..."}
+    Le jeu complet est ensuite mis en cache comme pour /generate-questions/
+    (un flux partiel ou incomplet n'est pas mis en cache).
+    """
+
+    def post(self, request):
+        if not hasattr(request.user, 'role') or (request.user.role != 'RECRUTEUR' and not request.user.is_staff):
+            return Response({
+                'error': 'Seuls les recruteurs peuvent générer des questions IA.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        params, error_response = self._parse_generation_request(request)
+        if error_response:
+            return error_response
+
+        response = StreamingHttpResponse(
+            self._event_stream(params, request.user.id),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Désactive la mise en tampon côté proxy (nginx)
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def _sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def _event_stream(self, params, user_id):
+        questions = []
+        ai_generator = AIInterviewQuestionGenerator()
+        try:
+            for question in ai_generator.stream_questions(
+                offer_title=params['job_title'],
+                offer_description=params['job_description'],
+                number_of_questions=params['ai_questions_needed'],
+                difficulty=params['difficulty_level'],
+                requirements=params['requirements'],
+                behavioral_count=params['behavioral_count'],
+                technical_count=params['technical_count']
+            ):
+                questions.append(question)
+                yield self._sse('question', question)
+        except Exception as e:
+            logger.error(f"Erreur streaming des questions IA: {str(e)}")
+            yield self._sse('error', {
+                'error': str(e) if isinstance(e, ValueError) else 'Erreur technique lors de la génération des questions.',
+                'generated_count': len(questions)
+            })
+            return
+
+        variant_id = None
+        generation_errors = ai_generator.last_generation_errors
+        if questions:
+            ingest_generated_questions(
+                questions, params['job_title'], params['requirements'], params['difficulty_level']
+            )
+        # Un résultat partiel n'est pas mis en cache
+        if questions and not generation_errors and len(questions) == params['ai_questions_needed']:
+            question_cache = QuestionGenerationCache()
+            fingerprint = question_fingerprint(
+                params['job_title'], params['job_description'], params['requirements'],
+                params['difficulty_level'], params['ai_questions_needed'],
+                params['behavioral_count'], params['technical_count']
+            )
+            variant_id = question_cache.store(fingerprint, questions, ai_generator.last_stream_provider)['id']
+            question_cache.mark_shown(fingerprint, user_id, variant_id)
+
+        yield self._sse('done', {
+            'generated_count': len(questions),
+            'ai_provider': ai_generator.last_stream_provider,
+            'variant_id': variant_id,
+            'errors': generation_errors
+        })
+
 
 class AIQuestionAnalysisView(APIView):
     """
@@ -1681,17 +2420,24 @@ class AIQuestionAnalysisView(APIView):
 class AIQuestionTemplatesView(APIView):
     """
     Vue pour obtenir des modèles de questions prédéfinies par catégorie.
-    GET /api/ai/question-templates/
+    GET /api/interviews/ai/question-templates/
+    
+    Les modèles proviennent de la bibliothèque de questions (sans appel IA).
     """
     permission_classes = [IsAuthenticated]
     
+    # Niveaux d'expérience acceptés comme alias de difficulté
+    EXPERIENCE_TO_DIFFICULTY = {'junior': 'easy', 'intermediate': 'medium', 'senior': 'hard'}
+    
     def get(self, request):
         """
         Retourne des modèles de questions organisés par catégorie.
         
         Query params:
-        - category: (optionnel) Filtrer par catégorie spécifique
-        - experience_level: (optionnel) Filtrer par niveau d'expérience
+        - category: (optionnel) Filtrer par catégorie (technique, comportementale, generale)
+        - experience_level: (optionnel) Filtrer par niveau (junior|intermediate|senior ou easy|medium|hard)
+        - keywords: (optionnel) Mots-clés du poste, séparés par des virgules
+        - limit: (optionnel) Nombre maximal de questions (50 par défaut)
         """
         # Vérifier que l'utilisateur est un recruteur
         if request.user.role != 'RECRUTEUR' and not request.user.is_staff:
@@ -1701,35 +2447,25 @@ class AIQuestionTemplatesView(APIView):
         
         category_filter = request.query_params.get('category')
         experience_filter = request.query_params.get('experience_level')
+        difficulty_filter = self.EXPERIENCE_TO_DIFFICULTY.get(experience_filter, experience_filter)
+        keywords = extract_role_keywords(request.query_params.get('keywords', ''))
+        try:
+            limit = min(200, max(1, int(request.query_params.get('limit', 50))))
+        except (TypeError, ValueError):
+            limit = 50
         
         try:
-            # Obtenir les modèles de questions prédéfinies
-            templates = ai_generator._get_fallback_questions()
-            
-            # Appliquer les filtres si spécifiés
-            if category_filter or experience_filter:
-                filtered_templates = []
-                for question in templates:
-                    include_question = True
-                    
-                    if category_filter and question.get('category', '').lower() != category_filter.lower():
-                        include_question = False
-                    
-                    if experience_filter and question.get('difficulty', '').lower() != experience_filter.lower():
-                        include_question = False
-                    
-                    if include_question:
-                        filtered_templates.append(question)
-                        
-                templates = filtered_templates
+            templates = get_question_bank_index().search(
+                keywords,
+                question_type=category_filter.lower() if category_filter else None,
+                difficulty=difficulty_filter,
+                limit=limit
+            )
             
             # Organiser par catégories
             categories = {}
             for question in templates:
-                category = question.get('category', 'General')
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(question)
+                categories.setdefault(question['type'], []).append(question)
             
             logger.info(f"Modèles de questions récupérés pour l'utilisateur {request.user.id}")
             
@@ -1748,6 +2484,104 @@ class AIQuestionTemplatesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AIQuestionSuggestionsView(APIView):
+    """
+    Suggestions de questions pour une offre, servies par la bibliothèque.
+    POST /api/interviews/ai/question-suggestions/
+    
+    L'IA n'est appelée que si la bibliothèque contient trop peu de questions
+    correspondant aux mots-clés du poste.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """
+        Body attendu:
+        {
+            "job_title": "string",
+            "job_description": "string",       // requis seulement si l'IA doit compléter
+            "required_skills": ["skill1"],
+            "question_type": "technique|comportementale|generale",  // optionnel
+            "difficulty_level": "easy|medium|hard",                 // optionnel
+            "count": 5,
+            "allow_ai": true
+        }
+        """
+        if not hasattr(request.user, 'role') or (request.user.role != 'RECRUTEUR' and not request.user.is_staff):
+            return Response({
+                'error': 'Seuls les recruteurs peuvent obtenir des suggestions de questions.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        job_title = request.data.get('job_title', '').strip()
+        job_description = request.data.get('job_description', '').strip()
+        required_skills = request.data.get('required_skills', [])
+        requirements = ', '.join(required_skills) if isinstance(required_skills, list) else str(required_skills or '')
+        question_type = request.data.get('question_type')
+        difficulty_level = request.data.get('difficulty_level')
+        allow_ai = str(request.data.get('allow_ai', True)).lower() in ('true', '1')
+        try:
+            count = int(request.data.get('count', 5))
+        except (TypeError, ValueError):
+            count = 5
+        
+        if not job_title:
+            return Response({'error': 'Le titre du poste est obligatoire.'}, status=status.HTTP_400_BAD_REQUEST)
+        if count < 1 or count > 20:
+            return Response({'error': 'Le nombre de questions doit être entre 1 et 20.'}, status=status.HTTP_400_BAD_REQUEST)
+        if question_type not in (None, 'technique', 'comportementale', 'generale'):
+            return Response({'error': 'Type de question invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+        if difficulty_level not in (None, 'easy', 'medium', 'hard'):
+            return Response({'error': 'Niveau de difficulté invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        keywords = extract_role_keywords(job_title, requirements)
+        bank_matches = [
+            dict(question, source='bank')
+            for question in get_question_bank_index().search(
+                keywords, question_type=question_type, difficulty=difficulty_level, limit=count
+            )
+            if question['keyword_matches'] > 0
+        ]
+        
+        suggestions = list(bank_matches)
+        missing = count - len(suggestions)
+        llm_called = False
+        warnings = []
+        
+        if missing > 0 and allow_ai and question_type != 'generale':
+            try:
+                ai_generator = AIInterviewQuestionGenerator()
+                behavioral_count = technical_count = None
+                if question_type == 'technique':
+                    behavioral_count, technical_count = 0, missing
+                elif question_type == 'comportementale':
+                    behavioral_count, technical_count = missing, 0
+                generated = ai_generator.generate_questions(
+                    offer_title=job_title,
+                    offer_description=job_description,
+                    number_of_questions=missing,
+                    difficulty=difficulty_level or 'medium',
+                    requirements=requirements,
+                    behavioral_count=behavioral_count,
+                    technical_count=technical_count
+                )
+                llm_called = True
+                ingest_generated_questions(generated, job_title, requirements, difficulty_level or 'medium')
+                suggestions.extend(dict(question, source='ai') for question in generated)
+            except ValueError as e:
+                warnings.append(str(e))
+        
+        return Response({
+            'success': True,
+            'suggestions': suggestions,
+            'metadata': {
+                'requested_count': count,
+                'bank_hits': len(bank_matches),
+                'ai_generated': len(suggestions) - len(bank_matches),
+                'llm_called': llm_called,
+                'keywords': keywords,
+                'warnings': warnings
+            }
+        }, status=status.HTTP_200_OK)
 
 
 class RecruiterEvaluationViewSet(ModelViewSet):
@@ -2383,8 +3217,14 @@ class AiEvaluationViewSet(ModelViewSet):
         {
             "campaign_id": 123,
             "candidate_ids": [1, 2, 3],  // optionnel, tous si vide
-            "force_reevaluation": false
+            "force_reevaluation": false,
+            "rerun_mode": "missing" | "stale" | "all",  // optionnel
+            "dry_run": false  // compter sans évaluer
         }
+        
+        En mode 'stale', seules les réponses dont l'évaluation a été produite
+        avec un autre moteur/modèle de transcription, une autre version de
+        prompt ou une autre version de la vidéo sont recalculées.
         """
         serializer = AiEvaluationBulkSerializer(data=request.data)
         if not serializer.is_valid():
@@ -2395,7 +3235,8 @@ class AiEvaluationViewSet(ModelViewSet):
         
         campaign_id = serializer.validated_data['campaign_id']
         candidate_ids = serializer.validated_data.get('candidate_ids', [])
-        force_reevaluation = serializer.validated_data.get('force_reevaluation', False)
+        rerun_mode = serializer.validated_data['rerun_mode']
+        dry_run = serializer.validated_data.get('dry_run', False)
         
         try:
             campaign = InterviewCampaign.objects.select_related('job_offer').get(id=campaign_id)
@@ -2417,35 +3258,49 @@ class AiEvaluationViewSet(ModelViewSet):
             if candidate_ids:
                 answers_query = answers_query.filter(candidate_id__in=candidate_ids)
             
-            answers = answers_query.select_related('candidate', 'question')
+            answers = list(answers_query.select_related('candidate', 'question', 'ai_evaluation'))
             
-            if not answers.exists():
+            if not answers:
                 return Response({
                     'error': 'Aucune réponse vidéo trouvée pour cette campagne'
                 }, status=status.HTTP_404_NOT_FOUND)
             
+            # Sélection des réponses à (re)calculer selon le mode
+            to_evaluate = []
+            stale_reasons = {}
+            for answer in answers:
+                existing_evaluation = getattr(answer, 'ai_evaluation', None)
+                if existing_evaluation is None or rerun_mode == 'all':
+                    to_evaluate.append(answer)
+                elif rerun_mode == 'stale' and is_stale(existing_evaluation, answer):
+                    to_evaluate.append(answer)
+                    for field in stale_fields(existing_evaluation, answer) or ['status']:
+                        stale_reasons[field] = stale_reasons.get(field, 0) + 1
+            
             # Statistiques de traitement
             stats = {
-                'total_answers': answers.count(),
+                'total_answers': len(answers),
+                'to_evaluate': len(to_evaluate),
+                'stale_reasons': stale_reasons,
                 'evaluations_created': 0,
                 'evaluations_updated': 0,
-                'evaluations_skipped': 0,
+                'evaluations_skipped': len(answers) - len(to_evaluate),
                 'errors': []
             }
             
+            if dry_run:
+                return Response({
+                    'message': 'Simulation: aucune évaluation lancée',
+                    'campaign_id': campaign_id,
+                    'rerun_mode': rerun_mode,
+                    'dry_run': True,
+                    'statistics': stats
+                }, status=status.HTTP_200_OK)
+            
             ai_service = AIVideoEvaluationService()
             
-            for answer in answers:
+            for answer in to_evaluate:
                 try:
-                    # Vérifier si une évaluation existe déjà
-                    existing_evaluation = AiEvaluation.objects.filter(
-                        interview_answer=answer
-                    ).first()
-                    
-                    if existing_evaluation and not force_reevaluation:
-                        stats['evaluations_skipped'] += 1
-                        continue
-                    
                     # Créer ou mettre à jour l'évaluation
                     ai_evaluation, created = AiEvaluation.objects.get_or_create(
                         interview_answer=answer,
@@ -2478,6 +3333,7 @@ class AiEvaluationViewSet(ModelViewSet):
             return Response({
                 'message': 'Évaluation IA en lot démarrée',
                 'campaign_id': campaign_id,
+                'rerun_mode': rerun_mode,
                 'statistics': stats
             }, status=status.HTTP_202_ACCEPTED)
         
@@ -2515,11 +3371,19 @@ class AiEvaluationViewSet(ModelViewSet):
             
             serializer = self.get_serializer(evaluations, many=True)
             
+            # Consommation de tokens et latence pour suivre le coût par campagne
+            token_usage = evaluations.filter(status='completed').aggregate(
+                total_prompt_tokens=Sum('prompt_tokens'),
+                average_prompt_tokens=Avg('prompt_tokens'),
+                average_processing_time=Avg('processing_time')
+            )
+            
             return Response({
                 'campaign_id': campaign_id,
                 'campaign_title': campaign.title,
                 'evaluations': serializer.data,
-                'total_count': evaluations.count()
+                'total_count': evaluations.count(),
+                'token_usage': token_usage
             }, status=status.HTTP_200_OK)
         
         except InterviewCampaign.DoesNotExist:
@@ -2527,6 +3391,56 @@ class AiEvaluationViewSet(ModelViewSet):
                 'error': 'Campagne d\'entretien introuvable'
             }, status=status.HTTP_404_NOT_FOUND)
     
+    @action(detail=False, methods=['get'])
+    def parse_stats(self, request):
+        """
+        Taux d'échec de parsing de la sortie du modèle, par version de prompt.
+        
+        Query params:
+        - campaign_id: (optionnel) Restreindre à une campagne
+        """
+        evaluations = self.get_queryset().exclude(parse_outcome__isnull=True).exclude(parse_outcome='no_audio')
+        
+        campaign_id = request.query_params.get('campaign_id')
+        if campaign_id:
+            evaluations = evaluations.filter(interview_answer__question__campaign_id=campaign_id)
+        
+        rows = evaluations.order_by().values('scoring_prompt_version').annotate(
+            total=Count('id'),
+            repaired=Count('id', filter=Q(parse_outcome='repaired')),
+            failed=Count('id', filter=Q(parse_outcome='failed'))
+        ).order_by('scoring_prompt_version')
+        
+        stats = []
+        for row in rows:
+            total = row['total']
+            stats.append({
+                'scoring_prompt_version': row['scoring_prompt_version'],
+                'total': total,
+                'repaired': row['repaired'],
+                'failed': row['failed'],
+                'repair_rate': round(row['repaired'] / total, 4) if total else 0,
+                'failure_rate': round(row['failed'] / total, 4) if total else 0,
+            })
+        
+        return Response({'parse_stats': stats}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def provider_health(self, request):
+        """
+        Latence p95 et taux d'erreur glissants de chaque fournisseur IA,
+        dans l'ordre de préférence courant du routeur.
+        """
+        from .services.llm_client_pool import get_client_pool
+        from .services.llm_router import get_llm_router
+
+        router = get_llm_router()
+        return Response({
+            'providers': router.health(),
+            'hedge_after_seconds': router.hedge_after,
+            'client_pool': get_client_pool().stats(),
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def by_candidate(self, request):
         """Récupère les évaluations IA pour un candidat spécifique"""
@@ -178,6 +178,9 @@ CORS_ALLOW_CREDENTIALS = True
 # Autoriser tous les en-têtes
 CORS_ALLOW_ALL_HEADERS = True
 
+# En-têtes de réponse lisibles par le frontend (version de campagne après suppression d'une question)
+CORS_EXPOSE_HEADERS = ['X-Campaign-Version']
+
 # --- FRONTEND URL for absolute links (used in emails) ---
 FRONTEND_BASE_URL = os.environ.get('FRONTEND_BASE_URL', 'http://localhost:3000')
 
@@ -209,16 +212,68 @@ USE_GOOGLE_GEMINI = os.environ.get('USE_GOOGLE_GEMINI', 'true').lower() == 'true
 GOOGLE_GEMINI_API_KEY = os.environ.get('GOOGLE_GEMINI_API_KEY')
 AI_PROVIDER = os.environ.get('AI_PROVIDER', 'google_gemini')
 ENABLE_AI_FEATURES = os.environ.get('ENABLE_AI_FEATURES', 'True').lower() == 'true'
+# Budget maximal (tokens estimés) d'un prompt d'évaluation vidéo
+AI_EVALUATION_PROMPT_TOKEN_BUDGET = int(os.environ.get('AI_EVALUATION_PROMPT_TOKEN_BUDGET', '1500'))
+# Taille du modèle Whisper (changer la valeur rend les évaluations existantes périmées)
+AI_WHISPER_MODEL = os.environ.get('AI_WHISPER_MODEL', 'base')
 
 # Configuration Hugging Face (fallback)
 HUGGINGFACE_API_TOKEN = os.environ.get('HUGGINGFACE_API_TOKEN')
 HUGGINGFACE_MODEL = os.environ.get('HUGGINGFACE_MODEL', 'gpt2')
 
+# Configuration OpenAI (fournisseur alternatif)
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
+
+# Routeur multi-fournisseurs (ordre de préférence initial, 'local' = stub hors ligne)
+AI_PROVIDER_ORDER = os.environ.get('AI_PROVIDER_ORDER', 'gemini,openai,huggingface')
+# Délai (s) avant de solliciter un second fournisseur ; vide = hedging désactivé
+AI_HEDGE_AFTER_SECONDS = os.environ.get('AI_HEDGE_AFTER_SECONDS') or None
+AI_PROVIDER_TIMEOUT_SECONDS = int(os.environ.get('AI_PROVIDER_TIMEOUT_SECONDS', '30'))
+# Les erreurs plus anciennes (secondes) ne pénalisent plus un fournisseur
+AI_PROVIDER_ERROR_WINDOW_SECONDS = int(os.environ.get('AI_PROVIDER_ERROR_WINDOW_SECONDS', '300'))
+
+# Cache des questions générées (par empreinte d'offre)
+AI_QUESTION_CACHE_TTL = int(os.environ.get('AI_QUESTION_CACHE_TTL', str(7 * 24 * 3600)))
+AI_QUESTION_CACHE_MAX_VARIANTS = int(os.environ.get('AI_QUESTION_CACHE_MAX_VARIANTS', '5'))
+# Génération des questions: 'parallel' (deux appels concurrents) ou 'single' (un appel mixte)
+AI_QUESTION_GENERATION_MODE = os.environ.get('AI_QUESTION_GENERATION_MODE', 'parallel')
+AI_QUESTION_GENERATION_TIMEOUT = int(os.environ.get('AI_QUESTION_GENERATION_TIMEOUT', '45'))
+# Pré-génération en arrière-plan à la création/modification d'une offre
+AI_QUESTION_PREGENERATION_ENABLED = os.environ.get('AI_QUESTION_PREGENERATION_ENABLED', 'True').lower() == 'true'
+# Nombre maximal de pré-générations par recruteur et par jour
+AI_QUESTION_PREGENERATION_DAILY_BUDGET = int(os.environ.get('AI_QUESTION_PREGENERATION_DAILY_BUDGET', '20'))
+
 # --- Configuration Cloudinary ---
 CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME')
 CLOUDINARY_API_KEY = os.environ.get('CLOUDINARY_API_KEY')
 CLOUDINARY_API_SECRET = os.environ.get('CLOUDINARY_API_SECRET')
 USE_CLOUDINARY_STORAGE = os.environ.get('USE_CLOUDINARY_STORAGE', 'False').lower() == 'true'
+# URL publique du webhook appelé par Cloudinary après un upload direct (optionnelle)
+CLOUDINARY_UPLOAD_NOTIFICATION_URL = os.environ.get('CLOUDINARY_UPLOAD_NOTIFICATION_URL')
+
+# Uploads vidéo reprenables: fichiers de transit locaux avant l'envoi vers Cloudinary
+VIDEO_UPLOAD_STAGING_DIR = os.environ.get('VIDEO_UPLOAD_STAGING_DIR', os.path.join(BASE_DIR, 'upload_staging'))
+VIDEO_UPLOAD_MAX_SIZE = int(os.environ.get('VIDEO_UPLOAD_MAX_SIZE', str(500 * 1024 * 1024)))
+# Sessions sans activité depuis ce délai (heures) supprimées par cleanup_upload_sessions
+VIDEO_UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('VIDEO_UPLOAD_SESSION_TTL_HOURS', '24'))
+# Envoi vers le stockage sans nouvelles depuis ce délai (secondes): la session peut être relancée
+VIDEO_UPLOAD_FINALIZE_TIMEOUT = int(os.environ.get('VIDEO_UPLOAD_FINALIZE_TIMEOUT', str(15 * 60)))
+# Stockage des vidéos: 'cloudinary' (défaut), 'local' ou chemin d'une classe VideoStorage
+VIDEO_STORAGE_BACKEND = os.environ.get('VIDEO_STORAGE_BACKEND', 'cloudinary')
+VIDEO_STORAGE_LOCAL_ROOT = os.environ.get('VIDEO_STORAGE_LOCAL_ROOT', os.path.join(MEDIA_ROOT, 'videos'))
+# Préfixe des URLs de streaming locales (ex: http://localhost:8000), nécessaire pour l'évaluation IA
+VIDEO_STORAGE_BASE_URL = os.environ.get('VIDEO_STORAGE_BASE_URL', '')
+# Location nginx "internal" pointant sur VIDEO_STORAGE_LOCAL_ROOT (ex: /protected-videos/), optionnel
+VIDEO_STORAGE_ACCEL_REDIRECT = os.environ.get('VIDEO_STORAGE_ACCEL_REDIRECT')
+
+# Durée de validité (heures) de la vérification d'existence des vidéos (refresh_video_index)
+VIDEO_INDEX_TTL_HOURS = int(os.environ.get('VIDEO_INDEX_TTL_HOURS', '24'))
+# Binaire FFmpeg pour les vignettes et sprites des réponses vidéo (optionnel)
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+# 'async': videos/upload/ répond 202 et envoie la vidéo à Cloudinary en arrière-plan
+VIDEO_UPLOAD_MODE = os.environ.get('VIDEO_UPLOAD_MODE', 'sync')
+VIDEO_UPLOAD_MAX_ATTEMPTS = int(os.environ.get('VIDEO_UPLOAD_MAX_ATTEMPTS', '3'))
 
 # Configuration Cloudinary
 import cloudinary